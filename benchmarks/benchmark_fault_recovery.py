@@ -0,0 +1,115 @@
+"""
+Measure the time the IntegrationManager takes to detect and to recover from faults of the backend, writer and
+detector injected during an acquisition. The real clients are run against the simulated backend, writer and detector.
+Hanging calls block for the client timeouts in config.py by default.
+
+Usage: python benchmarks/benchmark_fault_recovery.py [--faults backend_hang writer_restart] [--hang_time 1]
+       [--output results.json]
+"""
+import argparse
+import json
+import os
+import tempfile
+from threading import Thread
+
+from detector_integration_api import default_manager
+from detector_integration_api.client.backend_rest_client import BackendClient
+from detector_integration_api.client.cpp_writer_client import CppWriterClient
+from detector_integration_api.client.detector_client import DetectorClient
+from detector_integration_api.simulation import writer_simulator
+from detector_integration_api.simulation.backend_simulator import BackendSimulator
+from detector_integration_api.simulation.detector_simulator import DetectorSimulator
+from detector_integration_api.simulation.fault_injection import Fault, measure_recovery, format_results_table, \
+    HANG_TIMEOUTS
+from detector_integration_api.simulation.simulated_service import make_simulator_server
+
+
+def get_faults(hang_time=None):
+    """
+    :param hang_time: Time the hanging calls block, by default the timeout of each component client.
+    """
+    return [Fault("backend_exception", "backend", "exception"),
+            Fault("backend_hang", "backend", "hang", value=hang_time),
+            Fault("backend_garbage", "backend", "garbage"),
+            Fault("backend_wrong_state", "backend", "wrong_state", value="INITIALIZED"),
+            Fault("backend_restart", "backend", "restart", start_time=0.1),
+            Fault("backend_slow", "backend", "delay", value=0.5),
+            Fault("writer_exception", "writer", "exception"),
+            Fault("writer_hang", "writer", "hang", value=hang_time),
+            Fault("writer_garbage", "writer", "garbage"),
+            Fault("writer_wrong_state", "writer", "wrong_state", value="stopped"),
+            Fault("writer_restart", "writer", "restart", start_time=0.1),
+            Fault("writer_slow", "writer", "delay", value=0.5),
+            Fault("detector_exception", "detector", "exception"),
+            Fault("detector_hang", "detector", "hang", value=hang_time),
+            Fault("detector_wrong_state", "detector", "wrong_state", value="error"),
+            Fault("detector_restart", "detector", "restart", start_time=0.1),
+            Fault("detector_slow", "detector", "delay", value=0.5)]
+
+
+def get_simulated_clients_function(backend_port, writer_port):
+    """
+    :return: Function returning the real backend, writer and detector clients, connected to the simulators.
+    """
+    backend_simulator = BackendSimulator()
+    backend_server = make_simulator_server(backend_simulator.get_app(), "localhost", backend_port)
+    Thread(target=backend_server.serve_forever, daemon=True).start()
+
+    log_folder = tempfile.mkdtemp()
+
+    def get_clients():
+        backend_simulator.restart()
+
+        return {"backend": BackendClient("http://localhost:%d" % backend_port),
+                "writer": CppWriterClient(stream_url="tcp://localhost:40000",
+                                          writer_executable=os.path.abspath(writer_simulator.__file__),
+                                          writer_port=writer_port, log_folder=log_folder),
+                "detector": DetectorClient(detector=DetectorSimulator())}
+
+    return get_clients
+
+
+def main():
+    faults = get_faults()
+
+    parser = argparse.ArgumentParser(description="Benchmark the detection of and the recovery from faults.")
+    parser.add_argument("--faults", nargs="+", choices=[fault.name for fault in faults],
+                        help="Faults to inject, by default all.")
+    parser.add_argument("--hang_time", type=float, default=None,
+                        help="Time the hanging calls block, by default the client timeouts.")
+    parser.add_argument("--detection_timeout", type=float, default=None,
+                        help="Maximum time to detect a fault, by default 5 seconds more than the longest hang.")
+    parser.add_argument("--recovery_timeout", type=float, default=60, help="Maximum time to recover from a fault.")
+    parser.add_argument("--backend_port", type=int, default=10090, help="Port of the simulated backend.")
+    parser.add_argument("--writer_port", type=int, default=10091, help="Port of the simulated writer.")
+    parser.add_argument("--output", help="File to write the results to, as JSON.")
+    arguments = parser.parse_args()
+
+    faults = get_faults(arguments.hang_time)
+    if arguments.faults:
+        faults = [fault for fault in faults if fault.name in arguments.faults]
+
+    # A fault not detected within the longest client timeout is reported as not detected.
+    detection_timeout = arguments.detection_timeout
+    if detection_timeout is None:
+        detection_timeout = (arguments.hang_time if arguments.hang_time is not None
+                             else max(HANG_TIMEOUTS.values())) + 5
+
+    get_clients = get_simulated_clients_function(arguments.backend_port, arguments.writer_port)
+
+    results = []
+    for fault in faults:
+        results.append(measure_recovery(default_manager, fault, get_clients,
+                                        detection_timeout=detection_timeout,
+                                        recovery_timeout=arguments.recovery_timeout))
+
+    print("Fault recovery, simulated components")
+    print(format_results_table(results))
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare the JSON and MessagePack encoding and decoding of the control_panel REST response.
+
+Usage: python benchmarks/benchmark_response_encoding.py [--n_iterations 10000] [--n_shards 4]
+"""
+import argparse
+import json
+from timeit import timeit
+
+from detector_integration_api.rest_api import encoding
+
+
+def get_control_panel_response(n_shards):
+    writer_statistics = {"n_received_frames": 120000, "n_written_frames": 119872, "average_write_time": 0.0023,
+                         "average_receive_time": 0.0011, "writing_rate": 199.8, "receiving_rate": 200.1}
+
+    return {"state": "ok",
+            "status": "IntegrationStatus.RUNNING",
+            "details": {"writer": "writing",
+                        "backend": "OPEN",
+                        "detector": "running",
+                        "writer_shards": {"shard_%d" % index: {"status": "writing",
+                                                               "error": None,
+                                                               "process_url": "http://localhost:%d" % (10001 + index),
+                                                               "output_file": "/sls/data/run_0001_%d.h5" % index}
+                                          for index in range(n_shards)}},
+            "clients_enabled": {"backend": True, "writer": True, "detector": True},
+            "config": {"writer": {"output_file": "/sls/data/run_0001.h5", "n_frames": 120000, "user_id": 16371},
+                       "backend": {"bit_depth": 16, "n_frames": 120000},
+                       "detector": {"period": 0.005, "frames": 120000, "exptime": 0.00001, "dr": 16,
+                                    "timing": "auto", "cycles": 1}},
+            "metrics": {"writer": dict(writer_statistics,
+                                       shards={"shard_%d" % index: writer_statistics for index in range(n_shards)}),
+                        "backend": {"received_frames": 120000, "sent_frames": 119990},
+                        "detector": {}}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the REST response encodings.")
+    parser.add_argument("--n_iterations", type=int, default=10000, help="Number of encodings to time.")
+    parser.add_argument("--n_shards", type=int, default=4, help="Number of writer shards in the response.")
+    arguments = parser.parse_args()
+
+    if not encoding.is_msgpack_available():
+        raise RuntimeError("The msgpack package is needed to run this benchmark.")
+
+    control_panel_response = get_control_panel_response(arguments.n_shards)
+
+    json_data = json.dumps(control_panel_response).encode()
+    msgpack_data = encoding.encode_msgpack(control_panel_response)
+
+    if encoding.decode_msgpack(msgpack_data) != json.loads(json_data.decode()):
+        raise ValueError("MessagePack and JSON decoded responses are not equal.")
+
+    results = [("json", len(json_data),
+                timeit(lambda: json.dumps(control_panel_response).encode(), number=arguments.n_iterations),
+                timeit(lambda: json.loads(json_data.decode()), number=arguments.n_iterations)),
+               ("msgpack", len(msgpack_data),
+                timeit(lambda: encoding.encode_msgpack(control_panel_response), number=arguments.n_iterations),
+                timeit(lambda: encoding.decode_msgpack(msgpack_data), number=arguments.n_iterations))]
+
+    print("control_panel response, %d iterations" % arguments.n_iterations)
+    print("%-10s %12s %16s %16s" % ("encoding", "size [bytes]", "encode [us/op]", "decode [us/op]"))
+
+    for name, size, encode_time, decode_time in results:
+        print("%-10s %12d %16.2f %16.2f" % (name, size,
+                                            encode_time / arguments.n_iterations * 1e6,
+                                            decode_time / arguments.n_iterations * 1e6))
+
+    json_result, msgpack_result = results
+    print("msgpack saves %.0f%% size, %.0f%% encode time, %.0f%% decode time." %
+          ((1 - msgpack_result[1] / json_result[1]) * 100,
+           (1 - msgpack_result[2] / json_result[2]) * 100,
+           (1 - msgpack_result[3] / json_result[3]) * 100))
+
+
+if __name__ == "__main__":
+    main()
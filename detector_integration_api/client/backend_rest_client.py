@@ -1,21 +1,36 @@
 from logging import getLogger
+from threading import Lock
 
 import requests
 
 from detector_integration_api import config
+from detector_integration_api.common.logging_pipeline import DEDUPLICATE
+from detector_integration_api.common.tracing import get_trace_headers
+from detector_integration_api.common.value_cache import ValueCache
 
 _logger = getLogger(__name__)
 
+# Metrics returned when no selection is requested.
+DEFAULT_METRICS = ["received_frames", "sent_frames"]
+# Cache key of the complete metrics document.
+ALL_METRICS = None
+
 
 class BackendClient(object):
     def __init__(self, backend_url):
         self.backend_url = backend_url.rstrip("/") + config.BACKEND_URL_SUFFIX
 
+        # Metrics are shared between all requests for a short time, and fetched by one request at a time.
+        self.metrics_cache = ValueCache(default_time_to_live=config.BACKEND_METRICS_CACHE_TIME)
+        self.metrics_lock = Lock()
+
     def open(self):
+        self.metrics_cache.invalidate()
+
         response_text = requests.post(self.backend_url + "/state/open", json={},
-                                      timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
+                                      headers=get_trace_headers(), timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
 
-        _logger.debug("Opening backend got %s" % response_text)
+        _logger.debug("Opening backend got %s", response_text)
 
         if response_text != "OPEN":
             raise ValueError("Cannot start backend, aborting: %s" % response_text)
@@ -23,53 +38,105 @@ class BackendClient(object):
         return response_text
 
     def close(self):
+        self.metrics_cache.invalidate()
+
         _logger.debug("Stopping backend.")
 
         response_text = requests.post(self.backend_url + "/state/close", json={},
-                                      timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
+                                      headers=get_trace_headers(), timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
 
-        _logger.debug("Response from backend: %s" % response_text)
+        _logger.debug("Response from backend: %s", response_text)
 
         if response_text not in ("CLOSED", "CLOSING"):
             raise ValueError("Cannot stop backend, aborting: %s" % response_text)
 
     def get_status(self):
-        return requests.get(self.backend_url + "/state",
+        return requests.get(self.backend_url + "/state", headers=get_trace_headers(),
                             timeout=config.BACKEND_COMMUNICATION_TIMEOUT).json()["global_state"]
 
     def reset(self):
+        self.metrics_cache.invalidate()
+
         _logger.debug("Resetting backend.")
 
         response_text = requests.post(self.backend_url + "/state/reset", json={},
-                                      timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
+                                      headers=get_trace_headers(), timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
 
-        _logger.debug("Response from backend: %s" % response_text)
+        _logger.debug("Response from backend: %s", response_text)
 
     def set_config(self, configuration):
+        self.metrics_cache.invalidate()
+
         _logger.debug("Configuring backend.")
 
         response_text = requests.post(self.backend_url + "/state/configure", json={"settings": configuration},
-                                      timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
+                                      headers=get_trace_headers(), timeout=config.BACKEND_COMMUNICATION_TIMEOUT).text
 
-        _logger.debug("Response from backend %s" % response_text)
+        _logger.debug("Response from backend %s", response_text)
 
         if response_text != "CONFIGURED":
             raise ValueError("Cannot setup backend parameters, aborting: %s" % response_text)
 
-    def get_metrics(self, metrics=None):
+    def _get_cached_metrics(self, metrics):
+        if not metrics:
+            cached, answer = self.metrics_cache.lookup(ALL_METRICS)
+            return answer if cached else None
+
+        selected_metrics = {}
+
+        for name in metrics:
+            cached, value = self.metrics_cache.lookup(name)
+
+            if not cached:
+                return None
+
+            selected_metrics[name] = value
 
+        return selected_metrics
+
+    def _request_metrics(self, metrics):
+        params = None
+        if metrics and config.BACKEND_METRICS_SELECTION_PARAMETER:
+            params = {config.BACKEND_METRICS_SELECTION_PARAMETER: ",".join(metrics)}
+
+        return requests.get(self.backend_url + "/metrics", params=params, headers=get_trace_headers(),
+                            timeout=config.BACKEND_COMMUNICATION_TIMEOUT).json()["value"]["backend"]
+
+    def get_metrics(self, metrics=None):
+        """
+        :param metrics: Names of the metrics to return, by default the received and sent frames. An empty list
+        returns all metrics.
+        """
         if metrics is None:
-            metrics = ["received_frames", "sent_frames"]
+            metrics = DEFAULT_METRICS
+
+        selected_metrics = self._get_cached_metrics(metrics)
+        if selected_metrics is not None:
+            return selected_metrics
+
+        with self.metrics_lock:
+
+            # The metrics might have been fetched by another request in the meantime.
+            selected_metrics = self._get_cached_metrics(metrics)
+            if selected_metrics is not None:
+                return selected_metrics
+
+            _logger.debug("Getting backend metrics.", extra=DEDUPLICATE)
+            answer = self._request_metrics(metrics)
+
+            for name, value in answer.items():
+                self.metrics_cache.set(name, value)
+
+            # Without a selection parameter, the backend always answers with all metrics.
+            if not metrics or not config.BACKEND_METRICS_SELECTION_PARAMETER:
+                self.metrics_cache.set(ALL_METRICS, answer)
 
-        _logger.debug("Getting backend metrics.")
-        # TODO: do a default selection here
-        answer = requests.get(self.backend_url + "/metrics",
-                              timeout=config.BACKEND_COMMUNICATION_TIMEOUT).json()["value"]["backend"]
+            if metrics:
+                selected_metrics = {name: answer.get(name, None) for name in metrics}
 
-        # selecting answers
-        if metrics:
-            ret = {k: answer.get(k, None) for k in metrics}
-        else:
-            ret = answer
+                for name, value in selected_metrics.items():
+                    self.metrics_cache.set(name, value)
+            else:
+                selected_metrics = answer
 
-        return ret
+            return selected_metrics
@@ -1,16 +1,16 @@
-from detector_integration_api.client.external_process_client import ExternalProcessClient
+from detector_integration_api.client.external_process_client import ExternalProcessClient, get_executable_command
 
 
 class CppWriterClient(ExternalProcessClient):
     PROCESS_STARTUP_PARAMETERS = ("output_file", "n_frames", "user_id")
     PROCESS_NAME = "writer"
 
-    def get_execution_command(self):
-        writer_command_format = "sh " + self.process_executable + " %s %s %s %s %s"
-        writer_command = writer_command_format % (self.stream_url,
-                                                  self.process_parameters["output_file"],
-                                                  self.process_parameters.get("n_frames", 0),
-                                                  self.process_port,
-                                                  self.process_parameters.get("user_id", -1))
+    def get_process_arguments(self):
+        return [str(self.stream_url),
+                str(self.process_parameters["output_file"]),
+                str(self.process_parameters.get("n_frames", 0)),
+                str(self.process_port),
+                str(self.process_parameters.get("user_id", -1))]
 
-        return writer_command
+    def get_execution_command(self):
+        return get_executable_command(self.process_executable) + self.get_process_arguments()
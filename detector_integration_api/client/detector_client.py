@@ -1,24 +1,72 @@
 import subprocess
 
+from hashlib import sha256
 from logging import getLogger
 from numbers import Number
+from time import time
 
-from sls_detector import Eiger, Jungfrau
+from detector_integration_api import config
+from detector_integration_api.common.value_cache import ValueCache
 
 _logger = getLogger(__name__)
 
+# Detector attributes of the parameters that can be read with get_value.
+PARAMETER_ATTRIBUTES = {"exptime": "exposure_time",
+                        "frames": "n_frames",
+                        "cycles": "n_cycles",
+                        "timing": "timing_mode",
+                        "period": "period",
+                        "status": "status",
+                        "dr": "dynamic_range",
+                        "vhighvoltage": "high_voltage"}
+
+# Detector attributes of the parameters that can be set with set_value, and read back after setting them.
+SETTABLE_PARAMETER_ATTRIBUTES = {"exptime": "exposure_time",
+                                 "frames": "n_frames",
+                                 "cycles": "n_cycles",
+                                 "timing": "timing_mode",
+                                 "period": "period",
+                                 "dr": "dynamic_range",
+                                 "settings": "settings"}
+
+
+def get_file_fingerprint(filename):
+    with open(filename, "rb") as input_file:
+        return sha256(input_file.read()).hexdigest()
+
 
 class DetectorClient(object):
 
-    def __init__(self, id=0, detector_type = "Jungfrau"):
-        if detector_type == "Eiger":
-            self.detector = Eiger(id)
+    def __init__(self, id=0, detector_type = "Jungfrau", detector=None):
+        """
+        :param detector: sls_detector detector to use, by default an Eiger or Jungfrau with the given id.
+        """
+        if detector is not None:
+            self.detector = detector
         else:
-            self.detector = Jungfrau(id)
+            # Imported here, so that the module can be imported on machines without sls_detector.
+            from sls_detector import Eiger, Jungfrau
+
+            if detector_type == "Eiger":
+                self.detector = Eiger(id)
+            else:
+                self.detector = Jungfrau(id)
 
         self.detector_id = "" if id == 0 else str(id)+"-"
         self.detector_type = detector_type
 
+        # Parameter values read from or set on the detector.
+        self.value_cache = ValueCache(config.DETECTOR_VALUE_CACHE_TIMES)
+
+        # Fingerprint of the config file loaded on the detector, cleared by every parameter write, and the last
+        # duration of each initialise step.
+        self.loaded_config_fingerprint = None
+        self.initialise_step_times = {}
+
+    def arm(self):
+        # Ping all modules, so that the start command is not the first command after silence.
+        self.detector.online = True
+
     def start(self):
  
         self.detector.start_detector() 
@@ -35,62 +83,104 @@ class DetectorClient(object):
 
     def get_status(self):
  
-        #Workaround, see below
-        self.detector.online = True
+        try:
+            #Workaround, see below
+            self.detector.online = True
+
+            raw_status = self.detector.status
+        except Exception:
+            # The detector might have been restarted, the cached values and loaded config cannot be trusted.
+            self.value_cache.invalidate()
+            self.loaded_config_fingerprint = None
+            raise
 
-        raw_status = self.detector.status
         return raw_status
 
-    def get_value(self, parameter_name):
-#TODO: replace by enumarate
-        if parameter_name == "exptime":
-            return self.detector.exposure_time
-        elif parameter_name == "frames":
-            return self.detector.n_frames
-        elif parameter_name == "cycles":
-            return self.detector.n_cycles
-        elif parameter_name == "timing":
-            return self.detector.timing_mode
-        elif parameter_name == "period":
-            return self.detector.period
-        elif parameter_name == "status":
-            return self.detector.status
-        elif parameter_name == "dr":
-            return self.detector.dynamic_range
-        elif parameter_name == "vhighvoltage":
-            return self.detector.high_voltage
-        else:
+    def _lookup_value(self, parameter_name, fresh):
+        if parameter_name not in PARAMETER_ATTRIBUTES:
             raise RuntimeError("get_value called with deprecated name : %s " % parameter_name)
 
-    def set_value(self, parameter_name, value, no_verification=False):
+        # The status changes on its own, so it is always read from the detector.
+        if fresh or parameter_name == "status":
+            return False, None
+
+        return self.value_cache.lookup(parameter_name)
+
+    def _read_value(self, parameter_name):
+        try:
+            value = getattr(self.detector, PARAMETER_ATTRIBUTES[parameter_name])
+        except Exception:
+            self.value_cache.invalidate()
+            raise
+
+        if parameter_name != "status":
+            self.value_cache.set(parameter_name, value)
+
+        return value
+
+    def get_value(self, parameter_name, fresh=False):
+        """
+        :param parameter_name: Name of the parameter to read.
+        :param fresh: Read the value from the detector even if it is cached.
+        """
+        cached, value = self._lookup_value(parameter_name, fresh)
+
+        if cached:
+            return value
+
+        return self._read_value(parameter_name)
+
+    def get_values(self, parameter_names, fresh=False):
+        """
+        Read multiple parameters, pinging the detector only once.
+        :param parameter_names: Names of the parameters to read.
+        :param fresh: Read the values from the detector even if they are cached.
+        :return: Tuple (values, errors), with the value or the error message for each parameter.
+        """
+        values = {}
+        errors = {}
+        names_to_read = []
+
+        for name in parameter_names:
+            try:
+                cached, value = self._lookup_value(name, fresh)
+            except Exception as e:
+                errors[name] = str(e)
+                continue
+
+            if cached:
+                values[name] = value
+            else:
+                names_to_read.append(name)
+
+        if names_to_read:
+            try:
+                self.detector.online = True
+            except Exception as e:
+                self.value_cache.invalidate()
+                errors.update({name: str(e) for name in names_to_read})
+                names_to_read = []
+
+        for name in names_to_read:
+            try:
+                values[name] = self._read_value(name)
+            except Exception as e:
+                errors[name] = str(e)
+
+        return values, errors
+
+    def _write_value(self, parameter_name, value):
+        _logger.debug("Will set parameter %s to %s for detector %s.", parameter_name, value, self.detector_id)
+
+        # Any write can override a value set by the loaded config file, so the next initialise loads it again.
+        self.loaded_config_fingerprint = None
+
+        if parameter_name in SETTABLE_PARAMETER_ATTRIBUTES:
+            if parameter_name == "settings":
+                _logger.debug("Switching detector %s to %s.", self.detector_id, value)
+
+            setattr(self.detector, SETTABLE_PARAMETER_ATTRIBUTES[parameter_name], value)
 
-        _logger.debug("Will set parameter %s to %s for detector %s." % (parameter_name, value, self.detector_id))
-        # as workaround for the problem of first command sent after silence, ping all modules
-        # with parallel command
-        self.detector.online = True
-#TODO: replace by enumarate
-        if parameter_name == "exptime":
-            self.detector.exposure_time = value
-            return self.detector.exposure_time
-        elif parameter_name == "frames":
-            self.detector.n_frames = value
-            return self.detector.n_frames
-        elif parameter_name == "cycles":
-            self.detector.n_cycles = value
-            return self.detector.n_cycles
-        elif parameter_name == "timing":
-            self.detector.timing_mode = value
-            return self.detector.timing_mode
-        elif parameter_name == "period":
-            self.detector.period = value
-            return self.detector.period
-        elif parameter_name == "dr":
-            self.detector.dynamic_range = value # fobid to change dr?
-            return self.detector.dynamic_range
-        elif parameter_name == "settings":
-            _logger.debug("Switching detector %s to %s." % (self.detector_id, value))
-            self.detector.settings = value # 
-            return self.detector.settings
         elif parameter_name == "clearbit":
 #TODO remove completely possibility to manipulate with bits, instead Detector.settings=
             if len(value.split()) == 2:
@@ -105,33 +195,151 @@ class DetectorClient(object):
                 raise RuntimeError("Wrong parameters for setbit (%s) : %s." % (parameter_name, value))
         elif parameter_name == "highG0":
             if value:
-                self.set_value("setbit","0x5d 0")
+                self._write_value("setbit","0x5d 0")
             else:
-                self.set_value("clearbit","0x5d 0")
+                self._write_value("clearbit","0x5d 0")
         else:
             raise RuntimeError("set_value called with deprecated name : %s (value: %s)." % (parameter_name, value))
 
+    def _read_back_value(self, parameter_name):
+        if parameter_name not in SETTABLE_PARAMETER_ATTRIBUTES:
+            # Settings and register bits can change any other parameter.
+            self.value_cache.invalidate()
+            return None
+
+        value = getattr(self.detector, SETTABLE_PARAMETER_ATTRIBUTES[parameter_name])
+
+        if parameter_name == "settings":
+            self.value_cache.invalidate()
+        else:
+            self.value_cache.set(parameter_name, value)
+
+        return value
+
+    def set_value(self, parameter_name, value, no_verification=False):
+        try:
+            # as workaround for the problem of first command sent after silence, ping all modules
+            # with parallel command
+            self.detector.online = True
+
+            self._write_value(parameter_name, value)
+            return self._read_back_value(parameter_name)
+
+        except Exception:
+            self.value_cache.invalidate()
+            raise
+
+    def set_values(self, parameters):
+        """
+        Set multiple parameters, pinging the detector only once and reading back the values after setting all of them.
+        :param parameters: Dictionary with the value for each parameter.
+        :return: Tuple (values, errors), with the read back value or the error message for each parameter.
+        """
+        values = {}
+        errors = {}
+
+        try:
+            self.detector.online = True
+        except Exception as e:
+            self.value_cache.invalidate()
+            return values, {name: str(e) for name in parameters}
+
+        for name, value in parameters.items():
+            try:
+                self._write_value(name, value)
+            except Exception as e:
+                errors[name] = str(e)
+
+        for name in parameters:
+            if name in errors:
+                continue
+
+            try:
+                values[name] = self._read_back_value(name)
+            except Exception as e:
+                errors[name] = str(e)
+
+        if errors:
+            self.value_cache.invalidate()
+
+        return values, errors
 
     def set_config(self, configuration):
+        self.value_cache.invalidate()
+
         for name, value in configuration.items():
             self.set_value(name, value)
 
-    def initialise(self, config_file=None, n_modules=0):
+    def _is_chip_powered(self):
+        return bool(self.detector.power_chip)
 
-        self.detector.stop_detector()
-        self.detector.free_shared_memory()
+    def _is_high_voltage_set(self):
+        return self.detector.high_voltage == config.DETECTOR_HIGH_VOLTAGE
+
+    def _power_chip(self):
+        # powerchip function makes delay between each module (implemented in version 4.0.2)
+        self.detector.power_chip = True
+
+    def _set_high_voltage(self):
+        self.detector.high_voltage = config.DETECTOR_HIGH_VOLTAGE
+
+    def initialise(self, config_file=None, n_modules=0, force=False):
+        """
+        Initialise the detector, skipping the steps the detector already satisfies: the same config file content
+        already loaded, chips already powered and high voltage already at the target value.
+        :param force: Execute all the steps.
+        :return: Action ("executed" or "skipped") of each step, and the time saved by skipping steps, based on the
+        last time each step was executed.
+        """
+        self.value_cache.invalidate()
+
+        config_fingerprint = get_file_fingerprint(config_file) if config_file is not None else None
+        config_loaded = config_fingerprint is not None and config_fingerprint == self.loaded_config_fingerprint
+
+        # Each step: name, function, function returning True if the step is already satisfied.
+        steps = [("stop_detector", self.detector.stop_detector, None),
+                 # Freeing the shared memory would lose the loaded config.
+                 ("free_shared_memory", self.detector.free_shared_memory, lambda: config_loaded)]
 
         if config_file != None:
-            _logger.info("Load detector configuration")
-            self.detector.load_config(config_file)
+            steps.append(("load_config", lambda: self.detector.load_config(config_file), lambda: config_loaded))
 
-# powerchip function makes delay between each module (implemented in version 4.0.2)
             if self.detector_type == "Jungfrau":
-                _logger.info("Powerchip-ing detector")
-                self.detector.power_chip = True
+                steps.append(("power_chip", self._power_chip, self._is_chip_powered))
+
+            steps.append(("high_voltage", self._set_high_voltage, self._is_high_voltage_set))
+
+        report = {"steps": {}, "time_saved": 0}
+
+        for step_name, step_function, is_satisfied in steps:
+
+            if not force and is_satisfied is not None and is_satisfied():
+                _logger.info("Detector %s initialise step '%s' already satisfied.", self.detector_id, step_name)
+
+                report["steps"][step_name] = "skipped"
+                report["time_saved"] += self.initialise_step_times.get(step_name, 0)
+                continue
+
+            _logger.info("Executing detector %s initialise step '%s'.", self.detector_id, step_name)
+
+            if step_name == "free_shared_memory":
+                self.loaded_config_fingerprint = None
+
+            step_start_time = time()
+
+            try:
+                step_function()
+            except Exception:
+                self.loaded_config_fingerprint = None
+                raise
+
+            self.initialise_step_times[step_name] = time() - step_start_time
+            report["steps"][step_name] = "executed"
+
+            if step_name == "load_config":
+                self.loaded_config_fingerprint = config_fingerprint
 
-            _logger.info("Setting HV of the Detector")
-            self.detector.high_voltage = 120
+        return report
 
     @staticmethod
     def interpret_response(output_bytes, parameter_name):
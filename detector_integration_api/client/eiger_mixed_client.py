@@ -1,9 +1,11 @@
 from detector_integration_api.client.detector_cli_client import DetectorClient
-from sls_detector import Eiger
 
 
 class EigerClientWrapper(object):
     def __init__(self):
+        # Imported here, so that the module can be imported on machines without sls_detector.
+        from sls_detector import Eiger
+
         self.new_client = Eiger()
         self.old_client = DetectorClient()
 
@@ -1,22 +1,52 @@
 import os.path
+import shlex
 import requests
 import json
+from glob import glob
 
-from subprocess import Popen
+from subprocess import Popen, TimeoutExpired
 from datetime import datetime
 from logging import getLogger
-from time import sleep
+from time import sleep, time
 
 from detector_integration_api import config
+from detector_integration_api.common.log_reader import read_log_range, follow_log_range
+from detector_integration_api.common.process_supervisor import ProcessSupervisor
+from detector_integration_api.common.tracing import get_trace_headers
 
 _logger = getLogger(__name__)
 
+# Executables starting with these bytes are executed directly, other files are passed to sh.
+DIRECT_EXECUTABLE_HEADERS = (b"#!", b"\x7fELF")
+
+
+def get_executable_command(executable):
+    """
+    Return the arguments needed to execute a file without an intermediate shell.
+    Files without the executable bit, or shell scripts without a shebang, are executed with sh.
+    An executable that is not a file is a command line, for example "python writer.py", and is split into arguments.
+    """
+    if not os.path.isfile(executable):
+        return shlex.split(executable)
+
+    with open(executable, "rb") as executable_file:
+        header = executable_file.read(4)
+
+    if os.access(executable, os.X_OK) and header.startswith(DIRECT_EXECUTABLE_HEADERS):
+        return [executable]
+
+    return ["sh", executable]
+
 
 class ExternalProcessClient(object):
     PROCESS_STARTUP_PARAMETERS = ()
     PROCESS_NAME = "unknown"
 
-    def __init__(self, stream_url, writer_executable, writer_port, log_folder=None):
+    def __init__(self, stream_url, writer_executable, writer_port, log_folder=None, callback_url=None):
+        """
+        :param callback_url: URL the process can push its status and statistics to. The process gets it, with
+        its port appended, in the config.WRITER_CALLBACK_URL_ENV_VARIABLE environment variable.
+        """
 
         self.stream_url = stream_url
         self.process_executable = writer_executable
@@ -36,6 +66,15 @@ class ExternalProcessClient(object):
 
         self.process = None
         self.process_log_file = None
+        self.process_log_filename = None
+
+        self.process_supervisor = None
+        self.last_exit_info = None
+        self.exit_callbacks = []
+
+        self.callback_url = callback_url
+        self.pushed_values = {}
+        self.last_push_time = None
 
     def _sanitize_parameters(self, parameters):
         return {key: parameters[key] for key in parameters if key not in self.PROCESS_STARTUP_PARAMETERS}
@@ -44,12 +83,12 @@ class ExternalProcessClient(object):
         for _ in range(config.EXTERNAL_PROCESS_RETRY_N):
 
             try:
-                response = requests_method(url=url, json=request_json,
+                response = requests_method(url=url, json=request_json, headers=get_trace_headers(),
                                            timeout=config.EXTERNAL_PROCESS_COMMUNICATION_TIMEOUT)
 
                 if response.status_code != 200:
-                    _logger.debug("Error while trying to communicate with the %s process. Retrying." %
-                                  self.PROCESS_NAME, response)
+                    _logger.debug("Error while trying to communicate with the %s process (status code %s). Retrying.",
+                                  self.PROCESS_NAME, response.status_code)
 
                     sleep(config.EXTERNAL_PROCESS_RETRY_DELAY)
                     continue
@@ -65,16 +104,74 @@ class ExternalProcessClient(object):
         return False
 
     def get_execution_command(self):
-        return self.process_executable
+        return get_executable_command(self.process_executable)
+
+    def add_exit_callback(self, callback):
+        """
+        :param callback: Function called with the exit info each time the process exits.
+        """
+        self.exit_callbacks.append(callback)
+
+    def _on_process_exit(self, exit_info):
+        self.last_exit_info = exit_info
+
+        for callback in self.exit_callbacks:
+            callback(exit_info)
+
+    def _set_exit_expected(self):
+        if self.process_supervisor is not None:
+            self.process_supervisor.set_exit_expected()
+
+    def push_values(self, writer_port, values):
+        """
+        Record the status and statistics pushed by the process.
+        :param writer_port: Port of the process that pushed the values.
+        :param values: Dictionary with "status" and/or "statistics".
+        :return: True if the pushed status changed.
+        """
+        if writer_port != self.process_port:
+            raise ValueError("Values pushed by the process on port %s, but process %s uses port %s." %
+                             (writer_port, self.PROCESS_NAME, self.process_port))
+
+        unknown_values = set(values) - {"status", "statistics"}
+        if unknown_values:
+            raise ValueError("Unknown values %s pushed by process %s." % (sorted(unknown_values), self.PROCESS_NAME))
+
+        status_changed = "status" in values and values["status"] != self.pushed_values.get("status")
+
+        self.pushed_values.update(values)
+        self.last_push_time = time()
+
+        return status_changed
+
+    def _get_pushed_value(self, name):
+        """
+        Return the last value pushed by the process, or None if the process does not push or stopped pushing.
+        """
+        if self.last_push_time is None or time() - self.last_push_time > config.WRITER_PUSH_TIMEOUT:
+            return None
+
+        return self.pushed_values.get(name)
+
+    def get_last_exit(self):
+        return self.last_exit_info
+
+    def has_crashed(self):
+        if self.process_supervisor is None or self.is_running():
+            return False
+
+        # The process can already be reaped, while the supervisor is still recording the exit.
+        self.process_supervisor.thread.join(timeout=config.EXTERNAL_PROCESS_COMMUNICATION_TIMEOUT)
+
+        return self.process_supervisor.exit_info is not None and self.process_supervisor.exit_info["crashed"]
 
     def start(self):
 
         itry=0
         while itry <= config.EXTERNAL_PROCESS_PREVIOUS_WAIT_N and self.is_running():
             itry += 1
-            _logger.info("Process %s is still running, sleep for %d seconds (attempt %d from %d)" 
-                          % (self.PROCESS_NAME, 
-                             config.EXTERNAL_PROCESS_SLEEP_PREVIOUS, itry, config.EXTERNAL_PROCESS_PREVIOUS_WAIT_N))
+            _logger.info("Process %s is still running, sleep for %d seconds (attempt %d from %d)", self.PROCESS_NAME,
+                         config.EXTERNAL_PROCESS_SLEEP_PREVIOUS, itry, config.EXTERNAL_PROCESS_PREVIOUS_WAIT_N)
             sleep(config.EXTERNAL_PROCESS_SLEEP_PREVIOUS)   
 
         if self.is_running():
@@ -84,6 +181,10 @@ class ExternalProcessClient(object):
         if not self.process_parameters:
             raise ValueError("Process %s parameters not set." % self.PROCESS_NAME)
 
+        # The log of a process that exited by itself is still open, if the client was not reset since.
+        if self.process_log_file:
+            self.process_log_file.close()
+
         timestamp = datetime.now().strftime(config.EXTERNAL_PROCESS_LOG_FILENAME_TIME_FORMAT)
 
         # If the log folder is not specified, redirect the logs to /dev/null.
@@ -94,14 +195,33 @@ class ExternalProcessClient(object):
             log_filename = os.devnull
 
         _logger.debug("Creating log file '%s'.", log_filename)
+        self.process_log_filename = log_filename if self.log_folder is not None else None
         self.process_log_file = open(log_filename, 'w')
         self.process_log_file.write("Parameters:\n%s\n" % json.dumps(self.process_parameters, indent=4))
         self.process_log_file.flush()
 
         process_command = self.get_execution_command()
 
-        _logger.debug("Starting process %s with command '%s'.", self.PROCESS_NAME, process_command)
-        self.process = Popen(process_command, shell=True, stdout=self.process_log_file, stderr=self.process_log_file)
+        # The process is executed directly, without an intermediate shell.
+        if isinstance(process_command, str):
+            process_command = shlex.split(process_command)
+
+        process_environment = None
+        if self.callback_url is not None:
+            process_callback_url = "%s/%d" % (self.callback_url.rstrip("/"), self.process_port)
+            process_environment = dict(os.environ, **{config.WRITER_CALLBACK_URL_ENV_VARIABLE: process_callback_url})
+
+        # Values pushed by the previous process are not valid anymore.
+        self.pushed_values = {}
+        self.last_push_time = None
+
+        _logger.debug("Starting process %s with command %s.", self.PROCESS_NAME, process_command)
+        self.process = Popen(process_command, stdout=self.process_log_file, stderr=self.process_log_file,
+                             env=process_environment)
+
+        self.last_exit_info = None
+        self.process_supervisor = ProcessSupervisor(self.process, self.PROCESS_NAME, self.process_log_filename,
+                                                    on_exit=self._on_process_exit)
 
         sleep(config.EXTERNAL_PROCESS_STARTUP_WAIT_TIME)
 
@@ -110,15 +230,16 @@ class ExternalProcessClient(object):
 
         if not self._send_request_to_process(requests.post, self.process_url + "/parameters",
                                              request_json=process_parameters):
-            _logger.warning("Terminating %s process because it did not respond in the specified time." %
+            _logger.warning("Terminating %s process because it did not respond in the specified time.",
                             self.PROCESS_NAME)
             self._kill()
 
             raise RuntimeError("Could not start %s process in time. Check writer logs." % self.PROCESS_NAME)
 
     def _kill(self):
-        _logger.warning("Terminating process %s. Data files might be corrupted." % self.PROCESS_NAME)
+        _logger.warning("Terminating process %s. Data files might be corrupted.", self.PROCESS_NAME)
 
+        self._set_exit_expected()
         self._send_request_to_process(requests.get, self.process_url + "/kill")
 
         try:
@@ -132,11 +253,12 @@ class ExternalProcessClient(object):
 
     def stop(self):
 
-        _logger.debug("Stopping process %s." % self.PROCESS_NAME)
+        _logger.debug("Stopping process %s.", self.PROCESS_NAME)
 
         if self.is_running():
-            _logger.debug("Sending stop command to the process %s." % self.PROCESS_NAME)
+            _logger.debug("Sending stop command to the process %s.", self.PROCESS_NAME)
 
+            self._set_exit_expected()
             if not self._send_request_to_process(requests.get, self.process_url + "/stop"):
                 if self.is_running():
                     raise ValueError("Process %s is running but cannot send stop command." % self.PROCESS_NAME)
@@ -159,6 +281,7 @@ class ExternalProcessClient(object):
 
         self.process = None
         self.process_log_file = None
+        self.process_supervisor = None
 
     def is_running(self):
         return self.process is not None and self.process.poll() is None
@@ -168,6 +291,10 @@ class ExternalProcessClient(object):
         status = False
 
         if self.is_running():
+            pushed_status = self._get_pushed_value("status")
+            if pushed_status is not None:
+                return pushed_status
+
             status = self._send_request_to_process(requests.get,
                                                    self.process_url + "/status",
                                                    return_response=True)
@@ -175,6 +302,9 @@ class ExternalProcessClient(object):
         if status is False:
             if self.is_running():
                 raise ValueError("Process %s is running but cannot get status." % self.PROCESS_NAME)
+            # The error is reported until the process is stopped or reset.
+            elif self.has_crashed():
+                return "error"
             else:
                 return "stopped"
 
@@ -196,6 +326,10 @@ class ExternalProcessClient(object):
         if not self.is_running():
             return {}
 
+        pushed_statistics = self._get_pushed_value("statistics")
+        if pushed_statistics is not None:
+            return pushed_statistics
+
         statistics = self._send_request_to_process(requests.get,
                                                    self.process_url + "/statistics",
                                                    return_response=True)
@@ -209,9 +343,92 @@ class ExternalProcessClient(object):
         statistics = statistics.json()
         return statistics
 
-    def kill(self):
+    def _wait_for_exit(self, timeout):
+        try:
+            self.process.wait(timeout=timeout)
+            return True
+        except TimeoutExpired:
+            return False
+
+    def kill(self, step_timeout=None):
+        """
+        Kill the process, escalating from the kill request to SIGTERM and SIGKILL if the process does not exit.
+        :param step_timeout: Time the process has to exit after each step, by default
+        config.EXTERNAL_PROCESS_KILL_STEP_TIMEOUT.
+        :return: The step that stopped the process: "not_running", "kill_request", "sigterm" or "sigkill".
+        """
+        if step_timeout is None:
+            step_timeout = config.EXTERNAL_PROCESS_KILL_STEP_TIMEOUT
 
         if not self.is_running():
-            return
+            return "not_running"
 
-        self._send_request_to_process(requests.get, self.process_url + "/kill")
+        self._set_exit_expected()
+
+        # A single attempt, the retries would exceed the kill deadline.
+        try:
+            requests.get(self.process_url + "/kill", headers=get_trace_headers(), timeout=step_timeout)
+        except Exception as e:
+            _logger.warning("Kill request to process %s failed: %s", self.PROCESS_NAME, e)
+
+        if self._wait_for_exit(step_timeout):
+            return "kill_request"
+
+        _logger.warning("Process %s did not exit after the kill request. Sending SIGTERM.", self.PROCESS_NAME)
+        self.process.terminate()
+
+        if self._wait_for_exit(step_timeout):
+            return "sigterm"
+
+        _logger.warning("Process %s did not exit after SIGTERM. Sending SIGKILL.", self.PROCESS_NAME)
+        self.process.kill()
+
+        if not self._wait_for_exit(step_timeout):
+            raise RuntimeError("Process %s did not exit after SIGKILL." % self.PROCESS_NAME)
+
+        return "sigkill"
+
+    def get_log_names(self):
+        if self.log_folder is None:
+            return []
+
+        log_filename_pattern = config.EXTERNAL_PROCESS_LOG_FILENAME_FORMAT % (self.PROCESS_NAME, "*")
+        log_filenames = glob(os.path.join(self.log_folder, log_filename_pattern))
+
+        # The timestamp in the filename sorts the logs from the oldest to the newest.
+        return sorted(os.path.basename(log_filename) for log_filename in log_filenames)
+
+    def read_log(self, log_name=None, offset=0, length=None, follow=False, timeout=None):
+        """
+        Read a byte range of the current or a past process log.
+        :param log_name: Name of the log, as returned by get_log_names. Defaults to the current (or latest) log.
+        :param offset: Byte offset to start reading from. Negative offsets are counted from the end of the log.
+        :param follow: If there is no data at offset, wait up to timeout seconds for new data.
+        """
+        log_names = self.get_log_names()
+
+        if not log_names:
+            raise ValueError("No logs available for process %s." % self.PROCESS_NAME)
+
+        if log_name is None:
+            if self.process_log_filename is not None:
+                log_name = os.path.basename(self.process_log_filename)
+            else:
+                log_name = log_names[-1]
+
+        # Only the logs of this process can be read.
+        if log_name not in log_names:
+            raise ValueError("Log '%s' not available for process %s." % (log_name, self.PROCESS_NAME))
+
+        log_filename = os.path.join(self.log_folder, log_name)
+
+        if follow:
+            data, offset, log_size = follow_log_range(log_filename, offset, length, timeout)
+        else:
+            data, offset, log_size = read_log_range(log_filename, offset, length)
+
+        return {"log_name": log_name,
+                "offset": offset,
+                "next_offset": offset + len(data),
+                "size": log_size,
+                "data": data.decode("utf-8", errors="replace")}
@@ -0,0 +1,204 @@
+from logging import getLogger
+from threading import Barrier, BrokenBarrierError
+from time import time
+
+from detector_integration_api import config
+from detector_integration_api.utils import execute_in_parallel
+
+_logger = getLogger(__name__)
+
+# Statuses in which at least one detector is still acquiring.
+DETECTOR_ACTIVE_STATUSES = ("running", "waiting", "transmitting")
+# Statuses in which a detector is not acquiring anymore.
+DETECTOR_IDLE_STATUSES = ("idle", "stopped", "finished")
+
+
+def aggregate_detector_status(statuses):
+    """
+    Combine the statuses of multiple detectors into a single detector status.
+    :param statuses: Dictionary {detector_name: status}.
+    :return: Common status if all detectors agree, otherwise the most relevant one.
+    """
+    unique_statuses = set(statuses.values())
+
+    if len(unique_statuses) == 1:
+        return unique_statuses.pop()
+
+    if "error" in unique_statuses:
+        return "error"
+
+    # The acquisition is not over until every detector is done.
+    if any(status in DETECTOR_ACTIVE_STATUSES for status in unique_statuses):
+        return "running"
+
+    if all(status in DETECTOR_IDLE_STATUSES for status in unique_statuses):
+        return "idle"
+
+    return "error"
+
+
+class MultiDetectorClient(object):
+    """
+    Drive a named set of detector clients as if they were a single detector.
+    """
+
+    def __init__(self, detector_clients):
+        if not detector_clients:
+            raise ValueError("At least one detector client must be provided.")
+
+        self.detector_clients = dict(detector_clients)
+
+        self.last_statuses = {name: None for name in self.detector_clients}
+        self.timing = {name: {} for name in self.detector_clients}
+        self.last_start_times = {}
+        self.last_start_skew = None
+
+    def _execute(self, operation_name, function):
+        def timed_function(name, client):
+            def wrapped():
+                start_time = time()
+
+                try:
+                    return function(name, client)
+                finally:
+                    self.timing[name][operation_name] = time() - start_time
+
+            return wrapped
+
+        results, errors = execute_in_parallel({name: timed_function(name, client)
+                                               for name, client in self.detector_clients.items()})
+
+        if errors:
+            error_text = ", ".join("%s: %s" % (name, error) for name, error in sorted(errors.items()))
+            _logger.error("Operation '%s' failed on detectors: %s", operation_name, error_text)
+
+            raise RuntimeError("Operation '%s' failed on detectors %s." % (operation_name, error_text))
+
+        return results
+
+    @staticmethod
+    def _aggregate_values(values):
+        unique_values = set(str(value) for value in values.values())
+
+        if len(unique_values) == 1:
+            return next(iter(values.values()))
+
+        return values
+
+    def get_detector_names(self):
+        return sorted(self.detector_clients)
+
+    def start(self):
+        barrier = Barrier(len(self.detector_clients), timeout=config.DETECTOR_START_BARRIER_TIMEOUT)
+
+        def arm_and_start(name, client):
+            try:
+                if hasattr(client, "arm"):
+                    client.arm()
+
+                barrier.wait()
+            except BrokenBarrierError:
+                raise RuntimeError("Start aborted because another detector could not be armed.")
+            except Exception:
+                # Release the other detectors waiting on the barrier.
+                barrier.abort()
+                raise
+
+            self.last_start_times[name] = time()
+            client.start()
+
+        self.last_start_times = {}
+        self._execute("start", arm_and_start)
+
+        self.last_start_skew = max(self.last_start_times.values()) - min(self.last_start_times.values())
+        _logger.debug("Detectors %s started with skew %f.", self.get_detector_names(), self.last_start_skew)
+
+    def stop(self):
+        self._execute("stop", lambda name, client: client.stop())
+
+    def get_status(self):
+        statuses = self._execute("get_status", lambda name, client: client.get_status())
+        self.last_statuses = statuses
+
+        return aggregate_detector_status(statuses)
+
+    def get_detectors_details(self):
+        return {name: {"status": self.last_statuses[name],
+                       "timing": dict(self.timing[name]),
+                       "last_start_time": self.last_start_times.get(name)}
+                for name in self.detector_clients}
+
+    def get_value(self, parameter_name, fresh=False):
+        values = self._execute("get_value", lambda name, client: client.get_value(parameter_name, fresh=fresh))
+
+        return self._aggregate_values(values)
+
+    def set_value(self, parameter_name, value, no_verification=False):
+        values = self._execute("set_value",
+                               lambda name, client: client.set_value(parameter_name, value,
+                                                                     no_verification=no_verification))
+
+        return self._aggregate_values(values)
+
+    def _aggregate_parameter_results(self, results):
+        """
+        :param results: Tuple (values, errors) for each detector.
+        :return: Tuple (values, errors) for each parameter.
+        """
+        parameter_names = set()
+        for detector_values, detector_errors in results.values():
+            parameter_names.update(detector_values)
+            parameter_names.update(detector_errors)
+
+        values = {}
+        errors = {}
+
+        for parameter_name in sorted(parameter_names):
+            parameter_errors = {name: detector_errors[parameter_name]
+                                for name, (_, detector_errors) in results.items() if parameter_name in detector_errors}
+
+            if parameter_errors:
+                errors[parameter_name] = ", ".join("%s: %s" % (name, error)
+                                                   for name, error in sorted(parameter_errors.items()))
+            else:
+                values[parameter_name] = self._aggregate_values({name: detector_values[parameter_name]
+                                                                 for name, (detector_values, _) in results.items()})
+
+        return values, errors
+
+    def get_values(self, parameter_names, fresh=False):
+        results = self._execute("get_values", lambda name, client: client.get_values(parameter_names, fresh=fresh))
+
+        return self._aggregate_parameter_results(results)
+
+    def set_values(self, parameters):
+        results = self._execute("set_values", lambda name, client: client.set_values(parameters))
+
+        return self._aggregate_parameter_results(results)
+
+    def set_config(self, configuration):
+        # Values in "detectors" override the common configuration for the named detector.
+        detectors_overrides = configuration.get("detectors", {})
+
+        unknown_detectors = set(detectors_overrides) - set(self.detector_clients)
+        if unknown_detectors:
+            raise ValueError("Config provided for unknown detectors %s. Available detectors: %s."
+                             % (sorted(unknown_detectors), self.get_detector_names()))
+
+        common_configuration = {key: value for key, value in configuration.items() if key != "detectors"}
+
+        def set_detector_config(name, client):
+            detector_configuration = dict(common_configuration)
+            detector_configuration.update(detectors_overrides.get(name, {}))
+
+            client.set_config(detector_configuration)
+
+        self._execute("set_config", set_detector_config)
+
+    def initialise(self, config_file=None, n_modules=0, force=False):
+        # A dictionary specifies a different config file for each detector.
+        def initialise_detector(name, client):
+            detector_config_file = config_file.get(name) if isinstance(config_file, dict) else config_file
+            return client.initialise(detector_config_file, n_modules, force=force)
+
+        return self._execute("initialise", initialise_detector)
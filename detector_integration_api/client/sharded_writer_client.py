@@ -0,0 +1,216 @@
+import os
+from numbers import Number
+from logging import getLogger
+
+from detector_integration_api.client.cpp_writer_client import CppWriterClient
+from detector_integration_api.utils import execute_in_parallel
+
+_logger = getLogger(__name__)
+
+# Statuses of the running shards, in order of precedence when the running shards do not agree.
+WRITER_STATUS_PRECEDENCE = ("writing", "receiving")
+
+# Status of a shard whose writer is not running, because it finished or was not started yet.
+WRITER_STOPPED_STATUS = "stopped"
+
+
+def aggregate_writer_status(statuses):
+    """
+    Combine the statuses of all writer shards into a single writer status.
+    :param statuses: Dictionary {shard_name: status}.
+    :return: "error" if any shard reports an error, the common status if all shards agree, otherwise the most active
+    status of the running shards. The shards finish at slightly different times, so stopped shards mixed with running
+    ones are still running.
+    """
+    unique_statuses = set(statuses.values())
+
+    if "error" in unique_statuses:
+        return "error"
+
+    if len(unique_statuses) == 1:
+        return unique_statuses.pop()
+
+    running_statuses = unique_statuses - {WRITER_STOPPED_STATUS}
+
+    for status in WRITER_STATUS_PRECEDENCE:
+        if status in running_statuses:
+            return status
+
+    return sorted(running_statuses)[0]
+
+
+def aggregate_writer_statistics(statistics):
+    """
+    Sum the numeric statistics of all writer shards.
+    :param statistics: Dictionary {shard_name: statistics}.
+    :return: Summed statistics, with the statistics of each shard under "shards".
+    """
+    aggregated_statistics = {}
+
+    for shard_statistics in statistics.values():
+        for name, value in shard_statistics.items():
+            if isinstance(value, Number) and not isinstance(value, bool):
+                aggregated_statistics[name] = aggregated_statistics.get(name, 0) + value
+
+    if any(statistics.values()):
+        aggregated_statistics["shards"] = statistics
+
+    return aggregated_statistics
+
+
+def get_shard_output_file(output_file, output_suffix):
+    output_file_root, output_file_extension = os.path.splitext(output_file)
+
+    return output_file_root + output_suffix + output_file_extension
+
+
+class ShardedWriterClient(object):
+    """
+    Drive a set of writer processes, each writing its own stream to its own file.
+    """
+
+    def __init__(self, shards, writer_executable, log_folder=None, writer_client_class=CppWriterClient,
+                 callback_url=None):
+        """
+        :param shards: List of dictionaries with "stream_url", "writer_port" and "output_suffix" for each shard.
+        Optionally each shard can have a "name", by default "shard_[index]".
+        :param callback_url: URL the shards push their status and statistics to, see ExternalProcessClient.
+        """
+        if not shards:
+            raise ValueError("At least one writer shard must be provided.")
+
+        self.writer_clients = {}
+        self.output_suffixes = {}
+
+        for index, shard in enumerate(shards):
+            shard_name = shard.get("name", "shard_%d" % index)
+
+            if shard_name in self.writer_clients:
+                raise ValueError("Writer shard name '%s' is not unique." % shard_name)
+
+            writer_client_parameters = {"stream_url": shard["stream_url"],
+                                        "writer_executable": writer_executable,
+                                        "writer_port": shard["writer_port"],
+                                        "log_folder": log_folder}
+
+            if callback_url is not None:
+                writer_client_parameters["callback_url"] = callback_url
+
+            writer_client = writer_client_class(**writer_client_parameters)
+
+            # Each shard needs its own log files.
+            writer_client.PROCESS_NAME = "%s_%s" % (writer_client.PROCESS_NAME, shard_name)
+
+            self.writer_clients[shard_name] = writer_client
+            self.output_suffixes[shard_name] = shard.get("output_suffix", "_%d" % index)
+
+        self.last_statuses = {name: None for name in self.writer_clients}
+        self.last_errors = {}
+
+    def _execute(self, operation_name, function, raise_errors=True):
+        results, errors = execute_in_parallel({name: (lambda client=client: function(client))
+                                               for name, client in self.writer_clients.items()})
+
+        if errors:
+            error_text = ", ".join("%s: %s" % (name, error) for name, error in sorted(errors.items()))
+            _logger.error("Operation '%s' failed on writer shards: %s", operation_name, error_text)
+
+            if raise_errors:
+                raise RuntimeError("Operation '%s' failed on writer shards %s." % (operation_name, error_text))
+
+        return results, errors
+
+    def get_shard_names(self):
+        return sorted(self.writer_clients)
+
+    def set_parameters(self, writer_parameters):
+        """
+        :param writer_parameters: Parameters of the whole acquisition, or None to clear the parameters of all shards.
+        """
+        for name, client in self.writer_clients.items():
+            if writer_parameters is None:
+                client.set_parameters(None)
+                continue
+
+            shard_parameters = dict(writer_parameters)
+
+            if "output_file" in shard_parameters:
+                shard_parameters["output_file"] = get_shard_output_file(shard_parameters["output_file"],
+                                                                        self.output_suffixes[name])
+
+            client.set_parameters(shard_parameters)
+
+    def start(self):
+        results, errors = self._execute("start", lambda client: client.start(), raise_errors=False)
+
+        if errors:
+            # Do not leave the successfully started shards behind.
+            for name in results:
+                self.writer_clients[name].kill()
+
+            error_text = ", ".join("%s: %s" % (name, error) for name, error in sorted(errors.items()))
+            raise RuntimeError("Could not start writer shards %s." % error_text)
+
+    def stop(self):
+        self._execute("stop", lambda client: client.stop())
+
+    def reset(self):
+        self._execute("reset", lambda client: client.reset())
+
+    def kill(self, step_timeout=None):
+        results, _ = self._execute("kill", lambda client: client.kill(step_timeout))
+
+        return results
+
+    def push_values(self, writer_port, values):
+        for client in self.writer_clients.values():
+            if client.process_port == writer_port:
+                return client.push_values(writer_port, values)
+
+        raise ValueError("No writer shard uses port %s." % writer_port)
+
+    def add_exit_callback(self, callback):
+        for client in self.writer_clients.values():
+            client.add_exit_callback(callback)
+
+    def is_running(self):
+        return any(client.is_running() for client in self.writer_clients.values())
+
+    def get_status(self):
+        statuses, errors = self._execute("get_status", lambda client: client.get_status(), raise_errors=False)
+
+        for name in errors:
+            statuses[name] = "error"
+
+        self.last_statuses = statuses
+        self.last_errors = {name: str(error) for name, error in errors.items()}
+
+        return aggregate_writer_status(statuses)
+
+    def get_shards_details(self):
+        return {name: {"status": self.last_statuses[name],
+                       "error": self.last_errors.get(name),
+                       "process_url": client.process_url,
+                       "output_file": (client.process_parameters or {}).get("output_file")}
+                for name, client in self.writer_clients.items()}
+
+    def get_statistics(self):
+        statistics, _ = self._execute("get_statistics", lambda client: client.get_statistics())
+
+        return aggregate_writer_statistics(statistics)
+
+    def get_log_names(self):
+        return sorted(log_name for client in self.writer_clients.values() for log_name in client.get_log_names())
+
+    def read_log(self, log_name=None, offset=0, length=None, follow=False, timeout=None):
+        # Without a log name, read the current log of the first shard.
+        if log_name is None:
+            writer_client = self.writer_clients[self.get_shard_names()[0]]
+        else:
+            writer_client = next((client for client in self.writer_clients.values()
+                                  if log_name in client.get_log_names()), None)
+
+            if writer_client is None:
+                raise ValueError("Log '%s' not available for any writer shard." % log_name)
+
+        return writer_client.read_log(log_name, offset, length, follow, timeout)
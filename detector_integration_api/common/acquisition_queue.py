@@ -0,0 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from logging import getLogger
+from threading import Thread, Event, Lock
+from time import time, sleep
+
+from detector_integration_api import config
+from detector_integration_api.default_validator import IntegrationStatus
+
+_logger = getLogger(__name__)
+
+
+def merge_config_delta(base_config, config_delta):
+    merged_config = deepcopy(base_config)
+
+    for section_name, section_updates in config_delta.items():
+        if section_name not in merged_config:
+            raise ValueError("Unknown config section '%s' in queue point. Available sections: %s."
+                             % (section_name, sorted(merged_config)))
+
+        merged_config[section_name].update(section_updates)
+
+    return merged_config
+
+
+def get_config_section_delta(previous_section, new_section):
+    return {name: value for name, value in new_section.items()
+            if name not in previous_section or previous_section[name] != value}
+
+
+class AcquisitionQueue(object):
+    """
+    Run a list of acquisitions back to back, each with its own config delta.
+    """
+
+    STATE_IDLE = "idle"
+    STATE_RUNNING = "running"
+    STATE_FINISHED = "finished"
+    STATE_CANCELLED = "cancelled"
+    STATE_ERROR = "error"
+
+    def __init__(self, integration_manager, point_timeout=None):
+        """
+        :param point_timeout: Maximum time the acquisition of a point can take, by default
+        ACQUISITION_QUEUE_POINT_TIMEOUT.
+        """
+        self.integration_manager = integration_manager
+        self.point_timeout = point_timeout if point_timeout is not None else config.ACQUISITION_QUEUE_POINT_TIMEOUT
+
+        self._lock = Lock()
+        self._cancel_event = Event()
+        self._thread = None
+
+        self._point_configs = []
+        self._parameters = None
+
+        self.state = self.STATE_IDLE
+        self.current_point = None
+        self.point_timings = []
+        self.error = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, points, parameters=None):
+        """
+        :param points: List of config deltas. Each delta is applied on top of the config of the previous point.
+        :param parameters: Start parameters passed to start_acquisition for every point. The config sections in
+        them are applied on top of the config of every point, before it is set.
+        """
+        with self._lock:
+            if self.is_running():
+                raise ValueError("Acquisition queue already running. Cancel it or wait for it to finish.")
+
+            if not points:
+                raise ValueError("Acquisition queue needs at least one point.")
+
+            # Config updates in the start parameters would reconfigure all components at every start.
+            parameters = dict(parameters or {})
+            start_config_updates = {section_name: parameters.pop(section_name) or {}
+                                    for section_name in ("writer", "backend", "detector")
+                                    if section_name in parameters}
+
+            # The first point is based on the currently set config.
+            point_configs = []
+            last_config = self.integration_manager.get_acquisition_config()
+
+            for config_delta in points:
+                last_config = merge_config_delta(last_config, config_delta or {})
+                last_config = merge_config_delta(last_config, start_config_updates)
+                point_configs.append(last_config)
+
+            _logger.info("Starting acquisition queue with %d points.", len(point_configs))
+
+            self._point_configs = point_configs
+            self._parameters = parameters or None
+            self._cancel_event.clear()
+
+            self.state = self.STATE_RUNNING
+            self.current_point = None
+            self.point_timings = []
+            self.error = None
+
+            self._thread = Thread(target=self._run_queue, daemon=True)
+            self._thread.start()
+
+        return self.get_status()
+
+    def cancel(self):
+        if self.is_running():
+            _logger.info("Cancelling acquisition queue at point %s.", self.current_point)
+            self._cancel_event.set()
+
+        return self.get_status()
+
+    def get_status(self):
+        return {"state": self.state,
+                "n_points": len(self._point_configs),
+                "current_point": self.current_point,
+                "completed_points": len(self.point_timings),
+                "point_timings": list(self.point_timings),
+                "error": self.error}
+
+    def _prepare_point(self, index, previous_config):
+        # The validation normalizes the config in place, while the previous point config is still being applied.
+        point_config = deepcopy(self._point_configs[index])
+
+        self.integration_manager.validate_acquisition_config(point_config)
+
+        # Only the changed detector parameters need to be sent after the first point.
+        detector_config_delta = None
+        if previous_config is not None:
+            detector_config_delta = get_config_section_delta(previous_config["detector"], point_config["detector"])
+
+        return point_config, detector_config_delta
+
+    def _wait_for_acquisition_end(self, index):
+        """
+        :return: True if the acquisition ended, False if the queue was cancelled.
+        """
+        end_time = time() + self.point_timeout
+
+        while not self._cancel_event.is_set():
+            status = self.integration_manager.get_acquisition_status()
+
+            if status == IntegrationStatus.FINISHED:
+                return True
+
+            # The acquisition was ended outside of the queue, for example by a reset.
+            if status in (IntegrationStatus.INITIALIZED, IntegrationStatus.CONFIGURED):
+                _logger.warning("Acquisition of queue point %d ended in %s state.", index, status)
+                return True
+
+            if status == IntegrationStatus.ERROR:
+                raise RuntimeError("Acquisition of queue point %d ended in %s state." % (index, status))
+
+            if time() > end_time:
+                raise RuntimeError("Acquisition of queue point %d did not end in %s seconds, current state %s."
+                                   % (index, self.point_timeout, status))
+
+            sleep(config.ACQUISITION_QUEUE_POLLING_INTERVAL)
+
+        return False
+
+    def _run_queue(self):
+        manager = self.integration_manager
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        try:
+            prepared_point = executor.submit(self._prepare_point, 0, None)
+
+            for index in range(len(self._point_configs)):
+                if self._cancel_event.is_set():
+                    break
+
+                self.current_point = index
+                point_config, detector_config_delta = prepared_point.result()
+                timing = {"point": index}
+
+                start_time = time()
+                manager.set_acquisition_config(point_config, detector_config_delta=detector_config_delta)
+                timing["configure"] = time() - start_time
+
+                start_time = time()
+                manager.start_acquisition(parameters=self._parameters)
+                timing["start"] = time() - start_time
+
+                # Prepare the next point while this one is acquired and the writer finalizes the file.
+                if index + 1 < len(self._point_configs):
+                    prepared_point = executor.submit(self._prepare_point, index + 1, point_config)
+
+                start_time = time()
+                finished = self._wait_for_acquisition_end(index)
+                timing["acquisition"] = time() - start_time
+
+                if not finished:
+                    manager.stop_acquisition()
+                    break
+
+                start_time = time()
+                manager.reset()
+                timing["reset"] = time() - start_time
+
+                self.point_timings.append(timing)
+
+            self.state = self.STATE_CANCELLED if self._cancel_event.is_set() else self.STATE_FINISHED
+            _logger.info("Acquisition queue %s after %d points.", self.state, len(self.point_timings))
+
+        except Exception as e:
+            _logger.error("Acquisition queue failed at point %s: %s", self.current_point, e)
+
+            self.state = self.STATE_ERROR
+            self.error = str(e)
+
+            try:
+                manager.reset()
+            except Exception as reset_error:
+                _logger.error("Cannot reset after acquisition queue error: %s", reset_error)
+
+        finally:
+            executor.shutdown(wait=False)
@@ -1,5 +1,7 @@
 import logging
 
+from detector_integration_api.common.tracing import is_tracing_enabled, span
+
 _logger = logging.getLogger(__name__)
 
 
@@ -27,6 +29,10 @@ class ClientDisableWrapper(object):
                 if self.is_client_enabled():
 
                     try:
+                        if is_tracing_enabled():
+                            with span("%s.%s" % (type(self.client).__name__, attr_name), category="component"):
+                                return remote_attr(*args, **kwargs)
+
                         result = remote_attr(*args, **kwargs)
                         return result
                     except Exception as e:
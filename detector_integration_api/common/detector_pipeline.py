@@ -1,5 +1,7 @@
 from logging import getLogger
-from time import time
+
+from detector_integration_api.client.multi_detector_client import MultiDetectorClient
+from detector_integration_api.utils import execute_in_parallel, reset_components, kill_components
 
 _logger = getLogger(__name__)
 
@@ -7,6 +9,10 @@ _logger = getLogger(__name__)
 class DetectorPipeline(object):
 
     def __init__(self, detector_client, backend_client, writer_client):
+        # A dictionary of detector clients is driven as a single detector.
+        if isinstance(detector_client, dict):
+            detector_client = MultiDetectorClient(detector_client)
+
         self.detector_client = detector_client
         self.backend_client = backend_client
         self.writer_client = writer_client
@@ -22,19 +28,36 @@ class DetectorPipeline(object):
         self.writer_client.stop()
 
     def reset(self):
-        time1 = time()
-        self.detector_client.stop()
-        time2 = time()
-        self.backend_client.reset()
-        time3 = time()
-        self.writer_client.reset()
-        time4 = time()
-        _logger.info("detector %f , backend %f , writer %f", time2 - time1, time3 - time2, time4 - time3)
-
-    def kill(self):
-        self.detector_client.stop()
-        self.backend_client.reset()
-        self.writer_client.kill()
+        """
+        Reset in parallel the components that are not idle.
+        :return: Status, action and time of each component.
+        """
+        # Components with an unknown status are reset.
+        statuses, _ = execute_in_parallel({"detector": self.detector_client.get_status,
+                                           "backend": self.backend_client.get_status,
+                                           "writer": self.writer_client.get_status})
+
+        report, errors = reset_components({"detector": self.detector_client.stop,
+                                           "backend": self.backend_client.reset,
+                                           "writer": self.writer_client.reset},
+                                          statuses,
+                                          skip_functions={"writer": lambda: self.writer_client.set_parameters(None)})
+
+        if errors:
+            error_text = ", ".join("%s: %s" % (name, error) for name, error in sorted(errors.items()))
+            raise RuntimeError("Could not reset components %s." % error_text)
+
+        return report
+
+    def kill(self, timeout=None):
+        """
+        Stop the detector, reset the backend and kill the writer in parallel, returning within the timeout.
+        :return: For each component, the action ("killed", "failed" or "timeout"), the kill time and the result.
+        """
+        return kill_components({"detector": self.detector_client.stop,
+                                "backend": self.backend_client.reset,
+                                "writer": self.writer_client.kill},
+                               timeout)
 
     def return_clients(self):
         return self.detector_client, self.backend_client, self.writer_client
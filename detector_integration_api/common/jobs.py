@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from threading import RLock, Thread
+from time import time
+from uuid import uuid4
+
+from detector_integration_api import config
+from detector_integration_api.common.tracing import bind_context
+
+_logger = getLogger(__name__)
+
+JSON_TYPES = (dict, list, str, int, float, bool, type(None))
+
+
+class Job(object):
+    """
+    Sequence of named steps, executed in order, with the progress and timing of each step.
+    """
+
+    STATE_PENDING = "pending"
+    STATE_RUNNING = "running"
+    STATE_FINISHED = "finished"
+    STATE_FAILED = "failed"
+    STATE_CANCELLED = "cancelled"
+    STATE_SKIPPED = "skipped"
+
+    def __init__(self, name, steps):
+        """
+        :param name: Name of the operation the job executes.
+        :param steps: List of (step_name, function) tuples. Functions are called without arguments.
+        """
+        self.job_id = uuid4().hex
+        self.name = name
+
+        self.steps = steps
+        self.step_results = [{"name": step_name, "state": self.STATE_PENDING, "time": None, "error": None}
+                             for step_name, _ in steps]
+
+        self.state = self.STATE_PENDING
+        self.current_step = None
+        self.result = None
+        self.error = None
+        self.cancel_requested = False
+
+        self.submit_time = time()
+        self.start_time = None
+        self.end_time = None
+
+    def is_done(self):
+        return self.state not in (self.STATE_PENDING, self.STATE_RUNNING)
+
+    def cancel(self):
+        """
+        Skip the steps that did not start yet. The running step, if any, is not interrupted.
+        """
+        if not self.is_done():
+            _logger.info("Cancelling job '%s' (%s).", self.name, self.job_id)
+            self.cancel_requested = True
+
+    def has_executed_steps(self):
+        return any(step_result["state"] not in (self.STATE_PENDING, self.STATE_SKIPPED)
+                   for step_result in self.step_results)
+
+    def run(self):
+        _logger.info("Running job '%s' (%s).", self.name, self.job_id)
+
+        self.state = self.STATE_RUNNING
+        self.start_time = time()
+
+        try:
+            for index, (step_name, function) in enumerate(self.steps):
+                if self.cancel_requested:
+                    for step_result in self.step_results[index:]:
+                        step_result["state"] = self.STATE_SKIPPED
+
+                    self.state = self.STATE_CANCELLED
+                    return
+
+                self.current_step = step_name
+                step_result = self.step_results[index]
+                step_result["state"] = self.STATE_RUNNING
+
+                step_start_time = time()
+
+                try:
+                    self.result = function()
+                    step_result["state"] = self.STATE_FINISHED
+                except Exception as e:
+                    step_result["state"] = self.STATE_FAILED
+                    step_result["error"] = str(e)
+                    raise
+                finally:
+                    step_result["time"] = time() - step_start_time
+
+            self.state = self.STATE_FINISHED
+
+        except Exception as e:
+            _logger.error("Job '%s' (%s) failed in step '%s': %s", self.name, self.job_id, self.current_step, e)
+
+            self.state = self.STATE_FAILED
+            self.error = str(e)
+
+        finally:
+            self.current_step = None
+            self.end_time = time()
+
+    def get_info(self):
+        return {"job_id": self.job_id,
+                "name": self.name,
+                "state": self.state,
+                "current_step": self.current_step,
+                "steps": [dict(step_result) for step_result in self.step_results],
+                "result": self.result if isinstance(self.result, JSON_TYPES) else str(self.result),
+                "error": self.error,
+                "run_time": (self.end_time or time()) - self.start_time if self.start_time else None}
+
+
+def run_steps(steps):
+    """
+    Execute the steps of a job in the calling thread.
+    :return: Result of the last step.
+    """
+    result = None
+
+    for _, function in steps:
+        result = function()
+
+    return result
+
+
+class JobManager(object):
+    """
+    Execute jobs one after the other in a single worker thread.
+    """
+
+    def __init__(self, lock=None, on_cancel=None, history_size=config.JOBS_HISTORY_SIZE):
+        """
+        :param lock: Lock held while a job is running.
+        :param on_cancel: Function called after a job was cancelled in the middle of its steps.
+        :param history_size: Number of jobs to keep.
+        """
+        self.lock = lock if lock is not None else RLock()
+        self.on_cancel = on_cancel
+        self.history_size = history_size
+
+        self.jobs = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, name, steps, exclusive=True):
+        """
+        :param exclusive: Run the job after the previously submitted jobs, while holding the lock. A non exclusive job
+        starts at once in its own thread, for operations that must not wait for the running jobs.
+        """
+        job = Job(name, steps)
+
+        _logger.info("Submitting job '%s' (%s) with steps %s.", name, job.job_id, [step[0] for step in steps])
+
+        self.jobs[job.job_id] = job
+        self._remove_old_jobs()
+
+        # The job keeps the context (trace id) of the request that submitted it.
+        if exclusive:
+            self.executor.submit(bind_context(self._run_job), job)
+        else:
+            Thread(target=bind_context(job.run), daemon=True).start()
+
+        return job
+
+    def _run_job(self, job):
+        with self.lock:
+            job.run()
+
+            if job.state == Job.STATE_CANCELLED and job.has_executed_steps() and self.on_cancel is not None:
+                _logger.info("Job '%s' (%s) cancelled after it started, executing cleanup.", job.name, job.job_id)
+
+                try:
+                    self.on_cancel()
+                except Exception as e:
+                    _logger.error("Cleanup after cancelling job '%s' (%s) failed: %s", job.name, job.job_id, e)
+
+    def _remove_old_jobs(self):
+        finished_jobs = [job_id for job_id, job in self.jobs.items() if job.is_done()]
+
+        for job_id in finished_jobs[:max(len(self.jobs) - self.history_size, 0)]:
+            del self.jobs[job_id]
+
+    def get_job(self, job_id):
+        if job_id not in self.jobs:
+            raise ValueError("Job '%s' does not exist." % job_id)
+
+        return self.jobs[job_id]
+
+    def get_jobs_info(self):
+        return [job.get_info() for job in self.jobs.values()]
+
+    def cancel_job(self, job_id):
+        job = self.get_job(job_id)
+        job.cancel()
+
+        return job
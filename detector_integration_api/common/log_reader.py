@@ -0,0 +1,108 @@
+import mmap
+import os
+from time import time, sleep
+
+from detector_integration_api import config
+
+
+def read_log_range(filename, offset=0, length=None):
+    """
+    Read a byte range of a log file without loading the whole file in memory. The range is aligned to whole UTF-8
+    characters, see align_to_characters.
+    :param filename: Log file to read.
+    :param offset: Byte offset to start reading from. Negative offsets are counted from the end of the file.
+    :param length: Maximum number of bytes to read, limited to config.PROCESS_LOG_READ_MAX_LENGTH.
+    :return: Tuple (data, offset, file_size), where offset is the (non negative) offset of the returned data.
+    """
+    if length is None or length > config.PROCESS_LOG_READ_MAX_LENGTH:
+        length = config.PROCESS_LOG_READ_MAX_LENGTH
+
+    file_size = os.path.getsize(filename)
+
+    if offset < 0:
+        offset = max(file_size + offset, 0)
+
+    # Empty files cannot be memory mapped.
+    if offset >= file_size or length <= 0:
+        return b"", min(offset, file_size), file_size
+
+    with open(filename, "rb") as input_file:
+        with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as log_map:
+            data = log_map[offset:offset + length]
+
+    aligned_data, aligned_offset = align_to_characters(data, offset)
+
+    # A range shorter than a character is returned as it is, unless the character is still being written.
+    if aligned_data or offset + len(data) >= file_size:
+        data, offset = aligned_data, aligned_offset
+
+    return data, offset, file_size
+
+
+def _get_character_length(first_byte):
+    if first_byte < 0x80:
+        return 1
+    elif first_byte < 0xE0:
+        return 2
+    elif first_byte < 0xF0:
+        return 3
+    else:
+        return 4
+
+
+def _is_continuation_byte(byte):
+    return 0x80 <= byte < 0xC0
+
+
+def align_to_characters(data, offset):
+    """
+    Drop the partial UTF-8 characters at both ends of a byte range, so that the range decodes without replacement
+    characters and the next range starts at a whole character.
+    :param data: Bytes read from the log.
+    :param offset: Offset of data in the log.
+    :return: Tuple (data, offset) of the aligned range.
+    """
+    # A UTF-8 character is at most 4 bytes long, so at most 3 bytes of it can be cut off at each end.
+    start = 0
+    while start < min(len(data), 3) and _is_continuation_byte(data[start]):
+        start += 1
+
+    end = len(data)
+    for index in range(len(data) - 1, max(len(data) - 4, start - 1), -1):
+        if not _is_continuation_byte(data[index]):
+            if index + _get_character_length(data[index]) > len(data):
+                end = index
+            break
+
+    return data[start:max(start, end)], offset + start
+
+
+def follow_log_range(filename, offset=0, length=None, timeout=None):
+    """
+    Same as read_log_range, but wait up to timeout seconds for new data if there is nothing to read at offset.
+    """
+    if timeout is None or timeout > config.PROCESS_LOG_FOLLOW_MAX_TIMEOUT:
+        timeout = config.PROCESS_LOG_FOLLOW_MAX_TIMEOUT
+
+    start_time = time()
+
+    while True:
+        data, offset, file_size = read_log_range(filename, offset, length)
+
+        if data or time() - start_time >= timeout:
+            return data, offset, file_size
+
+        sleep(config.PROCESS_LOG_FOLLOW_POLLING_INTERVAL)
+
+
+def get_log_tail(filename, length=None):
+    """
+    Return the last bytes of a log file as text.
+    :param length: Number of bytes to return, by default config.PROCESS_EXIT_LOG_TAIL_LENGTH.
+    """
+    if length is None:
+        length = config.PROCESS_EXIT_LOG_TAIL_LENGTH
+
+    data, _, _ = read_log_range(filename, -length, length)
+
+    return data.decode("utf-8", errors="replace")
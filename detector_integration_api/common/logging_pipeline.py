@@ -0,0 +1,179 @@
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue, Full
+from threading import Lock
+from time import monotonic
+
+from detector_integration_api import config
+
+# Logging pipeline installed by setup_queue_logging.
+_pipeline = None
+
+# Pass as extra to the log calls repeated by every status query, to let the DeduplicationFilter suppress them.
+DEDUPLICATE = {"deduplicate": True}
+
+
+class DeduplicationFilter(logging.Filter):
+    """
+    Let only the first of the identical log records through in each time interval. Only the records logged with
+    extra=DEDUPLICATE below WARNING are deduplicated, all the others are always let through. Records are identical if
+    they have the same logger, level, message format and arguments; the messages are not formatted for the comparison.
+    """
+
+    def __init__(self, interval=None, max_keys=None, clock=monotonic):
+        """
+        :param interval: Time in seconds identical records are suppressed for, by default LOG_DEDUPLICATION_INTERVAL.
+        :param max_keys: Maximum number of different records remembered, by default LOG_DEDUPLICATION_MAX_KEYS.
+        """
+        super(DeduplicationFilter, self).__init__()
+
+        self.interval = interval if interval is not None else config.LOG_DEDUPLICATION_INTERVAL
+        self.max_keys = max_keys if max_keys is not None else config.LOG_DEDUPLICATION_MAX_KEYS
+        self.clock = clock
+
+        # Time the record was last let through, and the number of records suppressed since then.
+        self.last_records = {}
+        self.n_deduplicated = 0
+        self.lock = Lock()
+
+    @staticmethod
+    def get_record_key(record):
+        try:
+            key = (record.name, record.levelno, record.msg, record.args)
+            hash(key)
+            return key
+        except TypeError:
+            # Unhashable arguments (dictionaries, lists) are compared by their representation.
+            return record.name, record.levelno, str(record.msg), repr(record.args)
+
+    def filter(self, record):
+        # One-off messages, warnings and errors are never suppressed.
+        if not getattr(record, "deduplicate", False) or record.levelno >= logging.WARNING:
+            return True
+
+        key = self.get_record_key(record)
+        current_time = self.clock()
+
+        with self.lock:
+            last_time, n_suppressed = self.last_records.get(key, (None, 0))
+
+            if last_time is not None and current_time - last_time < self.interval:
+                self.last_records[key] = (last_time, n_suppressed + 1)
+                self.n_deduplicated += 1
+                return False
+
+            if len(self.last_records) >= self.max_keys:
+                self.last_records.clear()
+
+            self.last_records[key] = (current_time, 0)
+
+        if n_suppressed:
+            record.msg = "%s (%d identical messages suppressed)" % (record.msg, n_suppressed)
+
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the logging thread: records are dropped when the queue is full. As in the
+    QueueHandler, the message is formatted before the record is queued, because the arguments (for example a config
+    dictionary) can be modified after the log call.
+    """
+
+    def __init__(self, queue):
+        super(DroppingQueueHandler, self).__init__(queue)
+        self.n_dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.n_dropped += 1
+
+
+class BlockingStopQueueListener(QueueListener):
+    """
+    Queue listener that waits for space in the full queue to stop, instead of failing.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LoggingPipeline(object):
+    """
+    Root logger handlers moved behind a bounded queue, emptied by a background thread.
+    """
+
+    def __init__(self, queue_size=None, deduplication_interval=None):
+        """
+        :param queue_size: Maximum number of records waiting to be written, by default LOG_QUEUE_SIZE.
+        :param deduplication_interval: Time identical records are suppressed for, by default
+        LOG_DEDUPLICATION_INTERVAL.
+        """
+        self.queue = Queue(maxsize=queue_size if queue_size is not None else config.LOG_QUEUE_SIZE)
+
+        self.queue_handler = DroppingQueueHandler(self.queue)
+        self.deduplication_filter = DeduplicationFilter(deduplication_interval)
+        self.queue_handler.addFilter(self.deduplication_filter)
+
+        self.logger = None
+        self.handlers = []
+        self.listener = None
+
+    def start(self, logger=None):
+        """
+        Move the handlers of the logger (root by default) behind the queue.
+        """
+        logger = logger or logging.getLogger()
+
+        self.handlers = list(logger.handlers)
+        for handler in self.handlers:
+            logger.removeHandler(handler)
+
+        logger.addHandler(self.queue_handler)
+        self.logger = logger
+
+        self.listener = BlockingStopQueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        """
+        Write the queued records and put the handlers back on the logger.
+        """
+        self.listener.stop()
+
+        self.logger.removeHandler(self.queue_handler)
+        for handler in self.handlers:
+            self.logger.addHandler(handler)
+
+    def get_statistics(self):
+        return {"n_dropped": self.queue_handler.n_dropped,
+                "n_deduplicated": self.deduplication_filter.n_deduplicated,
+                "n_queued": self.queue.qsize()}
+
+
+def setup_queue_logging(queue_size=None, deduplication_interval=None):
+    """
+    Write the log records of the root logger handlers in a background thread.
+    :return: The installed LoggingPipeline.
+    """
+    global _pipeline
+
+    if _pipeline is not None:
+        _pipeline.stop()
+
+    _pipeline = LoggingPipeline(queue_size, deduplication_interval)
+    _pipeline.start()
+
+    return _pipeline
+
+
+def get_logging_statistics():
+    """
+    :return: Number of dropped, deduplicated and queued log records, None if the queue logging is not installed.
+    """
+    if _pipeline is None:
+        return None
+
+    return _pipeline.get_statistics()
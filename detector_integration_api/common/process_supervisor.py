@@ -0,0 +1,75 @@
+from logging import getLogger
+from threading import Thread
+from time import time
+
+from detector_integration_api.common.log_reader import get_log_tail
+
+_logger = getLogger(__name__)
+
+
+class ProcessSupervisor(object):
+    """
+    Wait for the exit of a process in a dedicated thread, and record how it exited.
+    """
+
+    def __init__(self, process, process_name, log_filename=None, on_exit=None):
+        """
+        :param process: Started Popen process.
+        :param process_name: Name used in the logs.
+        :param log_filename: Log of the process, the end of it is recorded on exit.
+        :param on_exit: Function called with the exit info when the process exits.
+        """
+        self.process = process
+        self.process_name = process_name
+        self.log_filename = log_filename
+        self.on_exit = on_exit
+
+        self.start_time = time()
+        self.exit_expected = False
+        self.exit_info = None
+
+        self.thread = Thread(target=self._wait_for_exit, daemon=True)
+        self.thread.start()
+
+    def set_exit_expected(self):
+        """
+        The process was asked to stop, so its exit is not a crash.
+        """
+        self.exit_expected = True
+
+    def is_running(self):
+        return self.exit_info is None
+
+    def _wait_for_exit(self):
+        exit_code = self.process.wait()
+        exit_time = time()
+
+        log_tail = None
+        if self.log_filename is not None:
+            try:
+                log_tail = get_log_tail(self.log_filename)
+            except OSError as e:
+                _logger.warning("Cannot read the log tail of process %s: %s", self.process_name, e)
+
+        # A process that exits by itself with exit code 0 has finished its work.
+        crashed = not self.exit_expected and exit_code != 0
+
+        self.exit_info = {"pid": self.process.pid,
+                          "exit_code": exit_code,
+                          "run_time": exit_time - self.start_time,
+                          "exit_time": exit_time,
+                          "crashed": crashed,
+                          "log_tail": log_tail}
+
+        if crashed:
+            _logger.error("Process %s (pid %d) exited unexpectedly with exit code %d after %.2f seconds.\n%s",
+                          self.process_name, self.process.pid, exit_code, self.exit_info["run_time"], log_tail or "")
+        else:
+            _logger.info("Process %s (pid %d) exited with exit code %d after %.2f seconds.",
+                         self.process_name, self.process.pid, exit_code, self.exit_info["run_time"])
+
+        if self.on_exit is not None:
+            try:
+                self.on_exit(self.exit_info)
+            except Exception as e:
+                _logger.error("Exit callback of process %s failed: %s", self.process_name, e)
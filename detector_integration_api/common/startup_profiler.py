@@ -0,0 +1,65 @@
+from importlib import import_module
+from logging import getLogger
+from time import time
+import sys
+
+_logger = getLogger(__name__)
+
+
+class StartupProfiler(object):
+    """
+    Measure the import time of the server modules and the time until the server receives its first request.
+    """
+
+    def __init__(self, start_time=None):
+        """
+        :param start_time: Time the startup began, by default now.
+        """
+        self.start_time = start_time if start_time is not None else time()
+
+        self.import_times = []
+        self.first_request_time = None
+
+    def import_module(self, module_name):
+        """
+        Import a module, recording how long the import took and how many modules it loaded.
+        Modules already imported take no time, the time of shared dependencies goes to the first importer.
+        """
+        n_modules = len(sys.modules)
+        import_start_time = time()
+
+        module = import_module(module_name)
+
+        self.import_times.append((module_name, time() - import_start_time, len(sys.modules) - n_modules))
+
+        return module
+
+    def install(self, app):
+        """
+        Record the time of the first request received by the bottle app.
+        """
+        def on_request():
+            if self.first_request_time is None:
+                self.first_request_time = time()
+                _logger.info("Startup profile:\n%s", self.get_report())
+
+        app.add_hook("before_request", on_request)
+
+    def get_profile(self):
+        return {"imports": [{"module": module_name, "time": import_time, "n_loaded_modules": n_loaded_modules}
+                            for module_name, import_time, n_loaded_modules in self.import_times],
+                "total_import_time": sum(import_time for _, import_time, _ in self.import_times),
+                "time_to_first_request": (self.first_request_time - self.start_time
+                                          if self.first_request_time is not None else None)}
+
+    def get_report(self):
+        profile = self.get_profile()
+
+        lines = ["%-60s %8.3f s %5d modules" % (module["module"], module["time"], module["n_loaded_modules"])
+                 for module in profile["imports"]]
+        lines.append("%-60s %8.3f s" % ("Total import time", profile["total_import_time"]))
+
+        if profile["time_to_first_request"] is not None:
+            lines.append("%-60s %8.3f s" % ("Time to first request", profile["time_to_first_request"]))
+
+        return "\n".join(lines)
@@ -2,6 +2,7 @@ from logging import getLogger
 
 from detector_integration_api.default_validator import IntegrationStatus
 from detector_integration_api.common.client_disable_wrapper import ClientDisableWrapper
+from detector_integration_api.common.logging_pipeline import DEDUPLICATE
 
 _logger = getLogger(__name__)
 
@@ -14,7 +15,7 @@ class StatusProvider(object):
 
     def get_quick_status_details(self):
 
-        _logger.info("Getting quick status details.")
+        _logger.info("Getting quick status details.", extra=DEDUPLICATE)
 
         try:
             writer_status = self.writer_client.get_status() \
@@ -26,7 +27,7 @@ class StatusProvider(object):
         detector_status = None
 
         _logger.debug("Detailed status requested:\nWriter: %s\nBackend: %s\nDetector: %s",
-                      writer_status, backend_status, detector_status)
+                      writer_status, backend_status, detector_status, extra=DEDUPLICATE)
 
         return {"writer": writer_status,
                 "backend": backend_status,
@@ -34,7 +35,7 @@ class StatusProvider(object):
 
     def get_complete_status_details(self):
 
-        _logger.info("Getting complete status details.")
+        _logger.info("Getting complete status details.", extra=DEDUPLICATE)
 
         try:
             writer_status = self.writer_client.get_status() \
@@ -55,7 +56,7 @@ class StatusProvider(object):
             detector_status = IntegrationStatus.COMPONENT_NOT_RESPONDING
 
         _logger.debug("Detailed status requested:\nWriter: %s\nBackend: %s\nDetector: %s",
-                      writer_status, backend_status, detector_status)
+                      writer_status, backend_status, detector_status, extra=DEDUPLICATE)
 
         return {"writer": writer_status,
                 "backend": backend_status,
@@ -0,0 +1,144 @@
+from array import array
+from threading import Lock
+from time import monotonic, time
+
+from detector_integration_api import config
+
+# Sources of the recorded statuses: the interpreted integration status and the raw status of each component.
+STATUS_SOURCES = ("integration", "writer", "backend", "detector")
+
+# Integration status that starts a new acquisition in the timeline.
+ACQUISITION_START_STATUS = "IntegrationStatus.CONFIGURED"
+
+# Name recorded for the statuses seen after the status names table is full.
+OTHER_STATUS_NAME = "other"
+
+
+class StatusTimeline(object):
+    """
+    Record of the status changes, in a ring buffer of fixed size backed by arrays.
+    Statuses are stored as indexes in the list of the status names seen so far.
+    """
+
+    def __init__(self, size=None, clock=monotonic, max_status_names=None):
+        """
+        :param size: Maximum number of status changes to keep, by default config.STATUS_TIMELINE_SIZE.
+        :param clock: Monotonic clock used for the timestamps.
+        :param max_status_names: Maximum number of distinct status names, by default
+        config.STATUS_TIMELINE_MAX_STATUS_NAMES. Statuses with varying text, like error messages, are recorded as
+        "other" when the limit is reached.
+        """
+        if size is None:
+            size = config.STATUS_TIMELINE_SIZE
+
+        if max_status_names is None:
+            max_status_names = config.STATUS_TIMELINE_MAX_STATUS_NAMES
+
+        # The status indexes are stored as unsigned shorts, one index is left for OTHER_STATUS_NAME.
+        if not 0 < max_status_names < 2 ** 16:
+            raise ValueError("The maximum number of status names must be between 1 and %d, not %s."
+                             % (2 ** 16 - 1, max_status_names))
+
+        self.size = size
+        self.max_status_names = max_status_names
+        self.clock = clock
+
+        self.timestamps = array("d", [0.0]) * size
+        self.sources = array("B", [0]) * size
+        self.statuses = array("H", [0]) * size
+        self.n_changes = 0
+
+        self.status_names = []
+        self.status_indexes = {}
+
+        self.last_statuses = {}
+        self.lock = Lock()
+
+    def _get_status_index(self, status):
+        if status not in self.status_indexes and len(self.status_names) >= self.max_status_names:
+            status = OTHER_STATUS_NAME
+
+        if status not in self.status_indexes:
+            self.status_indexes[status] = len(self.status_names)
+            self.status_names.append(status)
+
+        return self.status_indexes[status]
+
+    def record(self, source, status):
+        """
+        Record the status of a source, if it changed since the last record.
+        """
+        status = str(status)
+
+        with self.lock:
+            if self.last_statuses.get(source) == status:
+                return
+
+            self.last_statuses[source] = status
+
+            position = self.n_changes % self.size
+            self.timestamps[position] = self.clock()
+            self.sources[position] = STATUS_SOURCES.index(source)
+            self.statuses[position] = self._get_status_index(status)
+
+            self.n_changes += 1
+
+    def record_status(self, integration_status, status_details):
+        for source in STATUS_SOURCES[1:]:
+            if source in status_details:
+                self.record(source, status_details[source])
+
+        self.record("integration", integration_status)
+
+    def get_changes(self):
+        """
+        :return: List of (timestamp, source, status) tuples, from the oldest to the newest.
+        """
+        with self.lock:
+            n_changes = min(self.n_changes, self.size)
+
+            return [(self.timestamps[index % self.size],
+                     STATUS_SOURCES[self.sources[index % self.size]],
+                     self.status_names[self.statuses[index % self.size]])
+                    for index in range(self.n_changes - n_changes, self.n_changes)]
+
+    def get_acquisitions(self, n_acquisitions=None):
+        """
+        Split the recorded changes in acquisitions, each starting when the integration becomes CONFIGURED.
+        :param n_acquisitions: Number of the most recent acquisitions to return.
+        :return: List of acquisitions, with the changes and the time spent in each integration status.
+        """
+        if n_acquisitions is None:
+            n_acquisitions = config.STATUS_TIMELINE_N_ACQUISITIONS
+
+        changes = self.get_changes()
+        current_timestamp = self.clock()
+        wall_time_offset = time() - current_timestamp
+
+        # The changes before the first acquisition start are returned as well, as an incomplete acquisition.
+        start_indexes = [index for index, (_, source, status) in enumerate(changes)
+                         if index == 0 or (source == "integration" and status == ACQUISITION_START_STATUS)]
+        start_indexes = start_indexes[-n_acquisitions:] if n_acquisitions > 0 else []
+
+        acquisitions = []
+
+        for start_index, end_index in zip(start_indexes, start_indexes[1:] + [len(changes)]):
+            acquisition_changes = changes[start_index:end_index]
+            start_timestamp = acquisition_changes[0][0]
+            end_timestamp = changes[end_index][0] if end_index < len(changes) else current_timestamp
+
+            integration_changes = [(timestamp, status) for timestamp, source, status in acquisition_changes
+                                   if source == "integration"]
+
+            time_in_status = {}
+            for (timestamp, status), (next_timestamp, _) in zip(integration_changes,
+                                                                integration_changes[1:] + [(end_timestamp, None)]):
+                time_in_status[status] = time_in_status.get(status, 0) + next_timestamp - timestamp
+
+            acquisitions.append({"start_time": start_timestamp + wall_time_offset,
+                                 "duration": end_timestamp - start_timestamp,
+                                 "time_in_status": time_in_status,
+                                 "changes": [{"time": timestamp - start_timestamp, "source": source, "status": status}
+                                             for timestamp, source, status in acquisition_changes]})
+
+        return acquisitions
@@ -0,0 +1,226 @@
+import json
+import os
+from contextlib import contextmanager
+from functools import partial
+from threading import Lock, get_ident, local
+from time import time
+from uuid import uuid4
+
+try:
+    from contextvars import ContextVar, copy_context
+except ImportError:
+    # Python < 3.7, the trace id is stored per thread.
+    ContextVar = None
+    copy_context = None
+
+from detector_integration_api import config
+
+
+class ThreadLocalVariable(object):
+    """
+    Replacement of ContextVar without the contextvars module: one value per thread, set and reset the same way.
+    """
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+        self.values = local()
+
+    def get(self):
+        return getattr(self.values, "value", self.default)
+
+    def set(self, value):
+        # The token is the previous value.
+        token = self.get()
+        self.values.value = value
+
+        return token
+
+    def reset(self, token):
+        self.values.value = token
+
+
+# Trace id of the request being handled.
+_trace_id = ContextVar("trace_id", default=None) if ContextVar is not None else ThreadLocalVariable("trace_id")
+
+# Writer of the recorded spans, set by setup_tracing. Spans are not recorded without it.
+_span_writer = None
+
+
+def new_trace_id():
+    return uuid4().hex
+
+
+def get_trace_id():
+    return _trace_id.get()
+
+
+def set_trace_id(trace_id):
+    """
+    :return: Token to restore the previous trace id with reset_trace_id.
+    """
+    return _trace_id.set(trace_id)
+
+
+def reset_trace_id(token):
+    _trace_id.reset(token)
+
+
+def bind_context(function):
+    """
+    :return: Function calling the given function with the trace id of the caller, to execute it in another thread.
+    """
+    if copy_context is not None:
+        return partial(copy_context().run, function)
+
+    trace_id = get_trace_id()
+
+    def function_with_trace_id(*args, **kwargs):
+        token = set_trace_id(trace_id)
+
+        try:
+            return function(*args, **kwargs)
+        finally:
+            reset_trace_id(token)
+
+    return function_with_trace_id
+
+
+def get_trace_headers():
+    """
+    :return: Headers propagating the current trace id to the called component.
+    """
+    trace_id = _trace_id.get()
+
+    if trace_id is None:
+        return {}
+
+    return {config.TRACE_HEADER: trace_id}
+
+
+class TraceFileWriter(object):
+    """
+    Write spans as complete events of the Chrome trace event format, which chrome://tracing, Perfetto and
+    speedscope can load. The file is rotated when it exceeds max_size, keeping backup_count old files. A trace file
+    left by a previous run is rotated as well, or continued if no old files are kept.
+    """
+
+    def __init__(self, filename, max_size=None, backup_count=None):
+        self.filename = filename
+        self.max_size = max_size if max_size is not None else config.TRACE_FILE_MAX_SIZE
+        self.backup_count = backup_count if backup_count is not None else config.TRACE_FILE_BACKUP_COUNT
+
+        self.trace_file = None
+        self.lock = Lock()
+
+    def _open(self):
+        if os.path.exists(self.filename) and os.path.getsize(self.filename) > 0:
+            if self.backup_count == 0:
+                # The existing file already starts with the opening bracket.
+                self.trace_file = open(self.filename, "a")
+                return
+
+            self._shift_backups()
+
+        self.trace_file = open(self.filename, "w")
+
+        # The closing bracket is optional in the trace event format, so the file is valid at any time.
+        self.trace_file.write("[\n")
+
+    def _shift_backups(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists("%s.%d" % (self.filename, index)):
+                os.replace("%s.%d" % (self.filename, index), "%s.%d" % (self.filename, index + 1))
+
+        os.replace(self.filename, self.filename + ".1")
+
+    def _rotate(self):
+        self.trace_file.close()
+
+        if self.backup_count == 0:
+            os.remove(self.filename)
+
+        self._open()
+
+    def write(self, event):
+        line = json.dumps(event) + ",\n"
+
+        with self.lock:
+            if self.trace_file is None:
+                self._open()
+            elif self.trace_file.tell() + len(line) > self.max_size:
+                self._rotate()
+
+            self.trace_file.write(line)
+            self.trace_file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.trace_file is not None:
+                self.trace_file.close()
+                self.trace_file = None
+
+
+def setup_tracing(filename, max_size=None, backup_count=None):
+    """
+    Record the spans in the given trace file.
+    """
+    global _span_writer
+
+    if _span_writer is not None:
+        _span_writer.close()
+
+    _span_writer = TraceFileWriter(filename, max_size, backup_count) if filename else None
+
+
+def is_tracing_enabled():
+    return _span_writer is not None
+
+
+def record_span(name, start_time, duration, category="dia", error=None, **attributes):
+    """
+    Record a span of the current trace, if tracing is enabled.
+    :param start_time: Start of the span, as returned by time().
+    :param duration: Duration of the span in seconds.
+    """
+    span_writer = _span_writer
+
+    if span_writer is None:
+        return
+
+    args = dict(attributes, trace_id=_trace_id.get())
+    if error is not None:
+        args["error"] = error
+
+    # Timestamps and durations are in microseconds.
+    span_writer.write({"name": name,
+                       "cat": category,
+                       "ph": "X",
+                       "ts": int(start_time * 1e6),
+                       "dur": int(duration * 1e6),
+                       "pid": os.getpid(),
+                       "tid": get_ident(),
+                       "args": args})
+
+
+@contextmanager
+def span(name, category="dia", **attributes):
+    """
+    Record the execution of the block as a span of the current trace.
+    :param name: Name of the span, for example the component and method called.
+    :param attributes: Additional values stored with the span.
+    """
+    if _span_writer is None:
+        yield
+        return
+
+    start_time = time()
+    error = None
+
+    try:
+        yield
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        record_span(name, start_time, time() - start_time, category, error, **attributes)
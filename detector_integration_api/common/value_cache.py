@@ -0,0 +1,57 @@
+from threading import Lock
+from time import monotonic
+
+
+class ValueCache(object):
+    """
+    Cache of values read from a component, each expiring after the time to live of its key.
+    """
+
+    def __init__(self, times_to_live=None, default_time_to_live=0, clock=monotonic):
+        """
+        :param times_to_live: Time to live in seconds for each key.
+        :param default_time_to_live: Time to live of the keys not in times_to_live. 0 means the value is not cached.
+        :param clock: Monotonic clock used for the value ages.
+        """
+        self.times_to_live = times_to_live or {}
+        self.default_time_to_live = default_time_to_live
+        self.clock = clock
+
+        self.values = {}
+        self.lock = Lock()
+
+    def get_time_to_live(self, key):
+        return self.times_to_live.get(key, self.default_time_to_live)
+
+    def lookup(self, key):
+        """
+        :return: Tuple (found, value), found is False if the value is not cached or has expired.
+        """
+        with self.lock:
+            if key not in self.values:
+                return False, None
+
+            value, read_time = self.values[key]
+
+            if self.clock() - read_time >= self.get_time_to_live(key):
+                del self.values[key]
+                return False, None
+
+            return True, value
+
+    def set(self, key, value):
+        if self.get_time_to_live(key) <= 0:
+            return
+
+        with self.lock:
+            self.values[key] = (value, self.clock())
+
+    def invalidate(self, key=None):
+        """
+        :param key: Key to invalidate, all values if None.
+        """
+        with self.lock:
+            if key is None:
+                self.values.clear()
+            else:
+                self.values.pop(key, None)
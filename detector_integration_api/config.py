@@ -2,6 +2,9 @@ DEFAULT_LOGGING_LEVEL = "DEBUG"
 DEFAULT_SERVER_INTERFACE = "0.0.0.0"
 DEFAULT_SERVER_PORT = 10000
 
+# Maximum number of open connections of the async client.
+CLIENT_CONNECTION_POOL_SIZE = 10
+
 DEFAULT_BACKEND_URL = "http://localhost:8080"
 DEFAULT_WRITER_URL = "http://localhost:8083"
 DEFAULT_BSREAD_URL = "http://localhost:8085"
@@ -11,11 +14,40 @@ DEFAULT_BSREAD_INSTANCE_NAME = "bsread"
 BACKEND_URL_SUFFIX = "/v1"
 BACKEND_COMMUNICATION_TIMEOUT = 20
 
+# Time the backend metrics are cached for, shared between all requests.
+BACKEND_METRICS_CACHE_TIME = 0.5
+# Query parameter to request only the selected backend metrics, for example "metrics". None (all metrics are
+# requested) unless the deployed backend supports it.
+BACKEND_METRICS_SELECTION_PARAMETER = None
+
 # Number of retries when setting the start of the experiment.
 N_COLLECT_STATUS_RETRY = 3
 # Delay between re-tries.
 N_COLLECT_STATUS_RETRY_DELAY = 0.2
 
+# Time to wait for all detectors to be armed before starting them.
+DETECTOR_START_BARRIER_TIMEOUT = 10
+
+# High voltage set on the detector when it is initialised with a config file.
+DETECTOR_HIGH_VOLTAGE = 120
+
+# Time in seconds the detector parameter values are cached for, per parameter. Parameters not listed are not cached.
+DETECTOR_VALUE_CACHE_TIMES = {"exptime": 60,
+                              "frames": 60,
+                              "cycles": 60,
+                              "timing": 60,
+                              "period": 60,
+                              "dr": 60,
+                              "vhighvoltage": 5}
+
+# Maximum age of the cached status for answering conditional requests without querying the components.
+STATUS_CACHE_TIME = 1.0
+
+# Interval for checking if the current acquisition in the queue has finished.
+ACQUISITION_QUEUE_POLLING_INTERVAL = 0.05
+# Maximum time the acquisition of a queue point can take before the queue is aborted.
+ACQUISITION_QUEUE_POINT_TIMEOUT = 3600
+
 # CPP writer settings
 EXTERNAL_PROCESS_URL_FORMAT = "http://localhost:%d"
 
@@ -29,14 +61,82 @@ EXTERNAL_PROCESS_TERMINATE_TIMEOUT = 10
 EXTERNAL_PROCESS_LOG_FILENAME_FORMAT = "%s-%s.log"
 EXTERNAL_PROCESS_LOG_FILENAME_TIME_FORMAT = "%Y%m%d-%H%M%S"
 
+# Component statuses in which the component does not need a reset.
+COMPONENT_IDLE_STATUSES = {"detector": ("idle", "stopped"),
+                           "backend": ("INITIALIZED",),
+                           "writer": ("stopped",)}
+# Maximum time each component has to reset, when the components are reset in parallel.
+COMPONENT_RESET_TIMEOUTS = {"detector": 10,
+                            "backend": BACKEND_COMMUNICATION_TIMEOUT + 5,
+                            "writer": EXTERNAL_PROCESS_TERMINATE_TIMEOUT + 5}
+
+# Maximum time the emergency kill of all components can take.
+KILL_TIMEOUT = 5
+# Maximum time the kill response waits for the integration status after the kill.
+KILL_STATUS_TIMEOUT = 1
+# Time the external process has to exit after each kill escalation step (kill request, SIGTERM, SIGKILL).
+EXTERNAL_PROCESS_KILL_STEP_TIMEOUT = 1
+
 EXTERNAL_PROCESS_PREVIOUS_WAIT_N = 10
 EXTERNAL_PROCESS_SLEEP_PREVIOUS = 2 
 
+# Maximum number of bytes returned by a single process log read.
+PROCESS_LOG_READ_MAX_LENGTH = 1024 * 1024
+# Maximum time a process log read in follow mode waits for new data. The REST server answers one request at a time,
+# so a follow read delays all the other requests.
+PROCESS_LOG_FOLLOW_MAX_TIMEOUT = 0.5
+PROCESS_LOG_FOLLOW_POLLING_INTERVAL = 0.1
+# Number of bytes from the end of the process log recorded when the process exits.
+PROCESS_EXIT_LOG_TAIL_LENGTH = 4096
+
+# Environment variable with the URL the writer can push its status and statistics to.
+WRITER_CALLBACK_URL_ENV_VARIABLE = "DIA_CALLBACK_URL"
+# Time without pushes from the writer after which its status and statistics are polled again.
+WRITER_PUSH_TIMEOUT = 5
+
+# Number of status changes kept in the status timeline.
+STATUS_TIMELINE_SIZE = 10000
+# Number of acquisitions returned from the status timeline by default.
+STATUS_TIMELINE_N_ACQUISITIONS = 10
+# Number of distinct status names stored in the status timeline, further statuses are recorded as "other".
+STATUS_TIMELINE_MAX_STATUS_NAMES = 1000
+
+# Maximum number of log records waiting to be written by the logging thread. Further records are dropped.
+LOG_QUEUE_SIZE = 10000
+# Time identical log records are suppressed for, after the first one is written.
+LOG_DEDUPLICATION_INTERVAL = 10
+# Maximum number of different log records remembered for the deduplication.
+LOG_DEDUPLICATION_MAX_KEYS = 1000
+
+# Fraction of the requests profiled when the request profiler is enabled.
+REQUEST_PROFILER_SAMPLE_FRACTION = 0.1
+# Time between two stack samples of a profiled request.
+REQUEST_PROFILER_SAMPLING_INTERVAL = 0.001
+
+# Header with the trace id, received from the callers and sent to the backend and writer.
+TRACE_HEADER = "X-Trace-Id"
+# Maximum size of the trace file before it is rotated, and number of rotated trace files kept.
+TRACE_FILE_MAX_SIZE = 10 * 1024 * 1024
+TRACE_FILE_BACKUP_COUNT = 5
+
+# Default frame rate of the simulated backend and writer counters, in frames per second.
+SIMULATOR_FRAME_RATE = 100
+# Time a simulated service takes to answer a request with a scripted hang.
+SIMULATOR_HANG_TIME = 60
+# Time the simulated detector does not answer after a restart.
+SIMULATOR_DETECTOR_BOOT_TIME = 0.5
+# Environment variable with the JSON options of the writer simulator, which gets only the writer arguments.
+WRITER_SIMULATOR_OPTIONS_ENV_VARIABLE = "DIA_WRITER_SIMULATOR_OPTIONS"
+
+# Number of asynchronous jobs kept for querying their result.
+JOBS_HISTORY_SIZE = 100
+
 # Rest API routes.
 ROUTES = {
     "html_index": "/",
     "start": "/api/v1/start",
     "stop": "/api/v1/stop",
+    "get_finalization": "/api/v1/stop/finalization",
     "reset": "/api/v1/reset",
     "kill": "/api/v1/kill",
 
@@ -50,6 +150,8 @@ ROUTES = {
 
     "get_detector_value": "/api/v1/detector/value",
     "set_detector_value": "/api/v1/detector/value",
+    "get_detector_values": "/api/v1/detector/values",
+    "set_detector_values": "/api/v1/detector/values",
 
     "get_server_info": "/api/v1/info",
 
@@ -57,6 +159,12 @@ ROUTES = {
 
     "get_metrics": "/api/v1/metrics",
 
+    "get_status_timeline": "/api/v1/timeline",
+
+    "get_profiler": "/api/v1/profiler",
+    "set_profiler": "/api/v1/profiler",
+    "get_profiler_stacks": "/api/v1/profiler/stacks",
+
     "backend_client": "/api/v1/backend",
 
     "clients_enabled": "/api/v1/enabled_clients",
@@ -65,5 +173,19 @@ ROUTES = {
     "clear_client_configuration": "/api/v1/clear_client_configuration",
     "get_client_configuration":   "/api/v1/get_client_configuration",
 
+    "submit_acquisition_queue": "/api/v1/queue",
+    "get_acquisition_queue": "/api/v1/queue",
+    "cancel_acquisition_queue": "/api/v1/queue/cancel",
+
+    "batch": "/api/v1/batch",
+
+    "get_jobs": "/api/v1/jobs",
+    "get_job": "/api/v1/jobs",
+    "cancel_job": "/api/v1/jobs/cancel",
+
+    "get_writer_logs": "/api/v1/writer/logs",
+    "get_writer_log": "/api/v1/writer/log",
+    "push_writer_values": "/api/v1/writer/push",
+
     "daq_test": "/api/v1/daq_test"
 }
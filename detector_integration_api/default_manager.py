@@ -1,17 +1,30 @@
+from concurrent import futures
 from copy import copy
 from logging import getLogger
+from threading import RLock
+from time import time
 
-from detector_integration_api import default_validator
+from detector_integration_api import config, default_validator
+from detector_integration_api.client.multi_detector_client import MultiDetectorClient
+from detector_integration_api.common.acquisition_queue import AcquisitionQueue
 from detector_integration_api.example import example_validator
 from detector_integration_api.common.client_disable_wrapper import ClientDisableWrapper
+from detector_integration_api.common.jobs import JobManager, run_steps
+from detector_integration_api.common.logging_pipeline import get_logging_statistics, DEDUPLICATE
+from detector_integration_api.common.status_timeline import StatusTimeline
 from detector_integration_api.default_validator import IntegrationStatus
-from detector_integration_api.utils import check_for_target_status
+from detector_integration_api.utils import check_for_target_status, synchronized, reset_components, \
+    kill_components, execute_in_parallel
 
 _logger = getLogger(__name__)
 
 
 class IntegrationManager(object):
     def __init__(self, backend_client, writer_client, detector_client):
+        # A dictionary of detector clients is driven as a single detector.
+        if isinstance(detector_client, dict):
+            detector_client = MultiDetectorClient(detector_client)
+
         self.backend_client = ClientDisableWrapper(backend_client)
         self.writer_client = ClientDisableWrapper(writer_client)
         self.detector_client = ClientDisableWrapper(detector_client)
@@ -22,50 +35,231 @@ class IntegrationManager(object):
 
         self.last_config_successful = False
 
-    def start_acquisition(self):
-        _logger.info("Starting acquisition.")
+        # Serializes the operations that change the state of the components.
+        self.lock = RLock()
+
+        # Versions used to tell clients if anything changed since their last request.
+        self.config_version = 0
+        self.clients_enabled_version = 0
+        self.status_version = 0
+
+        self._cached_status = None
+        self._cached_status_time = None
+
+        # Changes of the integration and component statuses, for timing the acquisitions.
+        self.status_timeline = StatusTimeline()
+
+        self.acquisition_queue = AcquisitionQueue(self)
+
+        # Status, action and time of each component in the last reset.
+        self.last_reset_report = {}
+
+        # Operations submitted as asynchronous jobs are executed one after the other, holding the lock.
+        self.jobs = JobManager(lock=self.lock, on_cancel=self.reset)
+
+        # Backend close, writer stop and reset of the last asynchronous stop.
+        self.finalization_job = None
+
+        # A crashed writer changes the status without any request to the components.
+        if hasattr(self.writer_client, "add_exit_callback"):
+            self.writer_client.add_exit_callback(self._on_writer_exit)
+
+    def _on_writer_exit(self, exit_info):
+        self.invalidate_status()
+
+    def _get_start_config_updates(self, parameters):
+        """
+        :param parameters: Start parameters, config sections to update before starting and the trigger_start flag.
+        :return: Config updates to apply before starting.
+        """
+        config_updates = dict(parameters or {})
+
+        # Sent by the clients with every start, the detector is always triggered.
+        if not config_updates.pop("trigger_start", True):
+            raise ValueError("Starting the acquisition without triggering the detector is not supported.")
+
+        unknown_parameters = set(config_updates) - {"writer", "backend", "detector"}
+        if unknown_parameters:
+            raise ValueError("Unknown start parameters %s. Use the 'writer', 'backend' and 'detector' config "
+                             "sections." % sorted(unknown_parameters))
+
+        return config_updates
+
+    def _get_start_steps(self, parameters=None):
+        config_updates = self._get_start_config_updates(parameters)
+
+        def update_config():
+            _logger.info("Updating config with the start parameters: %s", config_updates)
+            self.update_acquisition_config(config_updates)
+
+        def check_status():
+            _logger.info("Starting acquisition.")
+
+            status = self.get_acquisition_status()
+            if status != IntegrationStatus.CONFIGURED:
+                raise ValueError("Cannot start acquisition in %s state. Please configure first." % status)
+
+            self.invalidate_status()
+
+        def wait_for_status():
+            # We need the status FINISHED for very short acquisitions.
+            return check_for_target_status(self.get_acquisition_status,
+                                           (IntegrationStatus.RUNNING,
+                                            IntegrationStatus.DETECTOR_STOPPED,
+                                            IntegrationStatus.FINISHED))
 
-        status = self.get_acquisition_status()
-        if status != IntegrationStatus.CONFIGURED:
-            raise ValueError("Cannot start acquisition in %s state. Please configure first." % status)
+        steps = [("check_status", check_status),
+                 ("backend_open", self.backend_client.open),
+                 ("writer_start", self.writer_client.start),
+                 ("detector_start", self.detector_client.start),
+                 ("wait_for_status", wait_for_status)]
 
-        self.backend_client.open()
-        self.writer_client.start()
-        self.detector_client.start()
+        if config_updates:
+            steps.insert(0, ("update_config", update_config))
 
-        # We need the status FINISHED for very short acquisitions.
-        return check_for_target_status(self.get_acquisition_status,
-                                       (IntegrationStatus.RUNNING,
-                                        IntegrationStatus.DETECTOR_STOPPED,
-                                        IntegrationStatus.FINISHED))
+        return self._invalidate_status_after(steps)
 
-    def stop_acquisition(self):
-        _logger.info("Stopping acquisition.")
+    @synchronized
+    def start_acquisition(self, parameters=None):
+        """
+        :param parameters: Config sections updated before starting, on top of the current config.
+        """
+        return run_steps(self._get_start_steps(parameters))
 
-        status = self.get_acquisition_status()
+    def stop_acquisition(self, asynchronous=False):
+        """
+        Stop the acquisition and reset the components.
+        :param asynchronous: If True, only the detector is stopped before returning. The backend close, writer stop
+        and reset are executed by a background finalization job, see get_finalization_job.
+        """
+        # Do not wait on the lock held by the previous finalization.
+        if asynchronous and self.is_finalization_running():
+            _logger.info("Acquisition finalization already running.")
+            return self.get_acquisition_status()
 
-        if status == IntegrationStatus.RUNNING:
-            self.detector_client.stop()
-            self.backend_client.close()
-            self.writer_client.stop()
+        with self.lock:
+            _logger.info("Stopping acquisition.")
 
-        return self.reset()
+            status = self.get_acquisition_status()
 
-    def get_acquisition_status(self):
-        status = example_validator.interpret_status(self.get_status_details())
+            self.invalidate_status()
+
+            if status == IntegrationStatus.RUNNING:
+                self.detector_client.stop()
+
+                if not asynchronous:
+                    self.backend_client.close()
+                    self.writer_client.stop()
+
+            if not asynchronous:
+                return self.reset()
+
+            finalization_steps = []
+            if status == IntegrationStatus.RUNNING:
+                finalization_steps.append(("backend_close", self.backend_client.close))
+                finalization_steps.append(("writer_stop", self.writer_client.stop))
+            finalization_steps.append(("reset", self.reset))
+
+            # The job waits for the lock, so it starts after this call returns.
+            self.finalization_job = self.jobs.submit("stop", finalization_steps)
+
+            return self.get_acquisition_status()
+
+    def is_finalization_running(self):
+        return self.finalization_job is not None and not self.finalization_job.is_done()
+
+    def get_finalization_job(self):
+        if self.finalization_job is None:
+            return None
+
+        return self.finalization_job.get_info()
+
+    def get_acquisition_status(self, status_details=None):
+        """
+        :param status_details: Status details to interpret, by default queried from the components.
+        """
+        if status_details is None:
+            status_details = self.get_status_details()
+
+        status = example_validator.interpret_status(status_details)
 
         # There is no way of knowing if the detector is configured as the user desired.
         # We have a flag to check if the user config was passed on to the detector.
         if status == IntegrationStatus.CONFIGURED and self.last_config_successful is False:
-            return IntegrationStatus.ERROR
+            status = IntegrationStatus.ERROR
+
+        self._update_status_cache(status)
+        self.status_timeline.record_status(status, status_details)
 
         return status
 
-    def get_acquisition_status_string(self):
-        return str(self.get_acquisition_status())
+    def _update_status_cache(self, status):
+        if status != self._cached_status:
+            self.status_version += 1
+            self._cached_status = status
+
+        self._cached_status_time = time()
+
+    def invalidate_status(self):
+        """
+        Mark the cached status as outdated. Call it whenever the state of a component might have changed.
+        """
+        self.status_version += 1
+        self._cached_status_time = None
+
+    def _invalidate_status_after(self, steps):
+        """
+        Invalidate the status after each step that changes the components, also if the step fails. A status cached
+        by a concurrent request in the middle of the operation is not used for conditional requests after the step.
+        The wait_for_status steps query the status at the end of the operation and keep it cached.
+        """
+        def invalidating(function):
+            def wrapper():
+                try:
+                    return function()
+                finally:
+                    self.invalidate_status()
+
+            return wrapper
+
+        return [(name, function if name == "wait_for_status" else invalidating(function)) for name, function in steps]
+
+    def get_state_etag(self, stable_status_only=False):
+        """
+        Return the ETag of the current config, enabled clients and interpreted status.
+        :param stable_status_only: Return an ETag only if the status is INITIALIZED or CONFIGURED, because in other
+        states the metrics change without a status change.
+        :return: ETag, or None if the cached status is too old to be used without querying the components.
+        """
+        if self._cached_status_time is None or time() - self._cached_status_time > config.STATUS_CACHE_TIME:
+            return None
+
+        if stable_status_only and self._cached_status not in (IntegrationStatus.INITIALIZED,
+                                                              IntegrationStatus.CONFIGURED):
+            return None
+
+        return '"%d-%d-%d"' % (self.config_version, self.clients_enabled_version, self.status_version)
+
+    def get_acquisition_status_string(self, timeout=None):
+        """
+        :param timeout: Maximum time to wait for the component statuses. If they do not answer in time, the status is
+        COMPONENT_NOT_RESPONDING.
+        """
+        if timeout is None:
+            return str(self.get_acquisition_status())
+
+        results, errors = execute_in_parallel({"status": self.get_acquisition_status}, timeout=timeout)
+
+        if "status" in errors:
+            if isinstance(errors["status"], futures.TimeoutError):
+                return str(IntegrationStatus.COMPONENT_NOT_RESPONDING)
+
+            raise errors["status"]
+
+        return str(results["status"])
 
     def get_status_details(self):
-        _logger.info("Getting status details.")
+        _logger.debug("Getting status details.", extra=DEDUPLICATE)
 
         writer_status = self.writer_client.get_status() \
             if self.writer_client.is_client_enabled() else ClientDisableWrapper.STATUS_DISABLED
@@ -77,11 +271,25 @@ class IntegrationManager(object):
             if self.detector_client.is_client_enabled() else ClientDisableWrapper.STATUS_DISABLED
 
         _logger.debug("Detailed status requested:\nWriter: %s\nBackend: %s\nDetector: %s",
-                      writer_status, backend_status, detector_status)
+                      writer_status, backend_status, detector_status, extra=DEDUPLICATE)
+
+        status_details = {"writer": writer_status,
+                          "backend": backend_status,
+                          "detector": detector_status}
+
+        # Per detector status and timing, when multiple detectors are used.
+        if self.detector_client.is_client_enabled() and hasattr(self.detector_client, "get_detectors_details"):
+            status_details["detectors"] = self.detector_client.get_detectors_details()
+
+        # Exit code, run time and log tail of the last writer process.
+        if self.writer_client.is_client_enabled() and hasattr(self.writer_client, "get_last_exit"):
+            status_details["writer_exit"] = self.writer_client.get_last_exit()
 
-        return {"writer": writer_status,
-                "backend": backend_status,
-                "detector": detector_status}
+        # Per shard status, when the writer is sharded.
+        if self.writer_client.is_client_enabled() and hasattr(self.writer_client, "get_shards_details"):
+            status_details["writer_shards"] = self.writer_client.get_shards_details()
+
+        return status_details
 
     def get_acquisition_config(self):
         # Always return a copy - we do not want this to be updated.
@@ -89,7 +297,23 @@ class IntegrationManager(object):
                 "backend": copy(self._last_set_backend_config),
                 "detector": copy(self._last_set_detector_config)}
 
-    def set_acquisition_config(self, new_config):
+    def validate_acquisition_config(self, new_config):
+        writer_config = new_config["writer"]
+        backend_config = new_config["backend"]
+        detector_config = new_config["detector"]
+
+        if self.writer_client.client_enabled:
+            default_validator.validate_writer_config(writer_config)
+
+        if self.backend_client.client_enabled:
+            default_validator.validate_backend_config(backend_config)
+
+        if self.detector_client.client_enabled:
+            default_validator.validate_detector_config(detector_config)
+
+        default_validator.validate_configs_dependencies(writer_config, backend_config, detector_config)
+
+    def _get_set_config_steps(self, new_config, detector_config_delta=None):
 
         if {"writer", "backend", "detector"} != set(new_config):
             raise ValueError("Specify config JSON with 3 root elements: 'writer', 'backend', 'detector'.")
@@ -98,49 +322,64 @@ class IntegrationManager(object):
         backend_config = new_config["backend"]
         detector_config = new_config["detector"]
 
-        status = self.get_acquisition_status()
+        def check_status():
+            status = self.get_acquisition_status()
 
-        self.last_config_successful = False
+            self.last_config_successful = False
+            self.invalidate_status()
 
-        if status not in (IntegrationStatus.INITIALIZED, IntegrationStatus.CONFIGURED):
-            raise ValueError("Cannot set config in %s state. Please reset first." % status)
+            if status not in (IntegrationStatus.INITIALIZED, IntegrationStatus.CONFIGURED):
+                raise ValueError("Cannot set config in %s state. Please reset first." % status)
 
-        # The backend is configurable only in the INITIALIZED state.
-        if status == IntegrationStatus.CONFIGURED:
-            _logger.debug("Integration status is %s. Resetting before applying config.", status)
-            self.reset()
+            # The backend is configurable only in the INITIALIZED state.
+            if status == IntegrationStatus.CONFIGURED:
+                _logger.debug("Integration status is %s. Resetting before applying config.", status)
+                self.reset()
 
-        _logger.info("Set acquisition configuration:\n"
-                           "Writer config: %s\n"
-                           "Backend config: %s\n"
-                           "Detector config: %s\n",
-                           writer_config, backend_config, detector_config)
+            _logger.info("Set acquisition configuration:\n"
+                               "Writer config: %s\n"
+                               "Backend config: %s\n"
+                               "Detector config: %s\n",
+                               writer_config, backend_config, detector_config)
 
-        # Before setting the new config, validate the provided values. All must be valid.
-        if self.writer_client.client_enabled:
-            default_validator.validate_writer_config(writer_config)
+            # Before setting the new config, validate the provided values. All must be valid.
+            self.validate_acquisition_config(new_config)
 
-        if self.backend_client.client_enabled:
-            default_validator.validate_backend_config(backend_config)
+            self.config_version += 1
 
-        if self.detector_client.client_enabled:
-            default_validator.validate_detector_config(detector_config)
+        def set_backend_config():
+            self.backend_client.set_config(backend_config)
+            self._last_set_backend_config = backend_config
 
-        default_validator.validate_configs_dependencies(writer_config, backend_config, detector_config)
+        def set_writer_config():
+            self.writer_client.set_parameters(writer_config)
+            self._last_set_writer_config = writer_config
 
-        self.backend_client.set_config(backend_config)
-        self._last_set_backend_config = backend_config
+        def set_detector_config():
+            # The detector keeps its parameters, so it is enough to send the changed ones.
+            if detector_config_delta is not None:
+                _logger.debug("Setting only changed detector parameters: %s", detector_config_delta)
+                self.detector_client.set_config(detector_config_delta)
+            else:
+                self.detector_client.set_config(detector_config)
+            self._last_set_detector_config = detector_config
 
-        self.writer_client.set_parameters(writer_config)
-        self._last_set_writer_config = writer_config
+            self.last_config_successful = True
 
-        self.detector_client.set_config(detector_config)
-        self._last_set_detector_config = detector_config
+        def wait_for_status():
+            return check_for_target_status(self.get_acquisition_status, IntegrationStatus.CONFIGURED)
 
-        self.last_config_successful = True
+        return self._invalidate_status_after([("check_status", check_status),
+                                              ("backend_config", set_backend_config),
+                                              ("writer_config", set_writer_config),
+                                              ("detector_config", set_detector_config),
+                                              ("wait_for_status", wait_for_status)])
 
-        return check_for_target_status(self.get_acquisition_status, IntegrationStatus.CONFIGURED)
+    @synchronized
+    def set_acquisition_config(self, new_config, detector_config_delta=None):
+        return run_steps(self._get_set_config_steps(new_config, detector_config_delta))
 
+    @synchronized
     def update_acquisition_config(self, config_updates):
         current_config = self.get_acquisition_config()
 
@@ -158,7 +397,10 @@ class IntegrationManager(object):
 
         return check_for_target_status(self.get_acquisition_status, IntegrationStatus.CONFIGURED)
 
+    @synchronized
     def set_clients_enabled(self, client_status):
+        self.clients_enabled_version += 1
+        self.invalidate_status()
 
         if "backend" in client_status:
             self.backend_client.set_client_enabled(client_status["backend"])
@@ -177,21 +419,111 @@ class IntegrationManager(object):
                 "writer": self.writer_client.is_client_enabled(),
                 "detector": self.detector_client.is_client_enabled()}
 
+    def _get_reset_steps(self):
+        status_snapshot = {}
+
+        def prepare():
+            _logger.info("Resetting integration api.")
+
+            self.last_config_successful = False
+            self.invalidate_status()
+
+            # One status snapshot decides which components need a reset.
+            try:
+                status_snapshot.update(self.get_status_details())
+            except Exception as e:
+                _logger.warning("Cannot get the status of all components, resetting all of them: %s", e)
+
+        def reset_all_components():
+            self.last_reset_report, errors = reset_components({"detector": self.detector_client.stop,
+                                                               "backend": self.backend_client.reset,
+                                                               "writer": self.writer_client.reset},
+                                                              status_snapshot,
+                                                              skip_functions={"writer": self._clear_writer_parameters})
+
+            if errors:
+                error_text = ", ".join("%s: %s" % (name, error) for name, error in sorted(errors.items()))
+                raise RuntimeError("Could not reset components %s." % error_text)
+
+        def wait_for_status():
+            # When no component had to be reset, the snapshot already has the status after the reset.
+            if status_snapshot and all(component["action"] == "skipped"
+                                       for component in self.last_reset_report.values()):
+                status = self.get_acquisition_status(status_snapshot)
+
+                if status == IntegrationStatus.INITIALIZED:
+                    return status
+
+            return check_for_target_status(self.get_acquisition_status, IntegrationStatus.INITIALIZED)
+
+        return self._invalidate_status_after([("prepare", prepare),
+                                              ("reset_components", reset_all_components),
+                                              ("wait_for_status", wait_for_status)])
+
+    def _clear_writer_parameters(self):
+        # A stopped writer is not reset, but the parameters of the last acquisition must not be reused.
+        self.writer_client.set_parameters(None)
+
+    @synchronized
     def reset(self):
-        _logger.info("Resetting integration api.")
+        return run_steps(self._get_reset_steps())
+
+    def _get_kill_steps(self):
+        return [("kill", self.kill)]
+
+    def kill(self, timeout=None):
+        """
+        Emergency abort: stop the detector, reset the backend and kill the writer in parallel. The running operations
+        are not waited for (no lock), and the call returns within the timeout even if components do not respond.
+        :param timeout: Maximum time for the kill, by default config.KILL_TIMEOUT.
+        :return: For each component, the action ("killed", "failed" or "timeout"), the kill time and the result.
+        """
+        if timeout is None:
+            timeout = config.KILL_TIMEOUT
 
         self.last_config_successful = False
+        self.invalidate_status()
+
+        # The writer kill has a kill request, SIGTERM and SIGKILL step, each waiting for the process to exit.
+        writer_step_timeout = timeout / 4
+
+        report = kill_components({"detector": self.detector_client.stop,
+                                  "backend": self.backend_client.reset,
+                                  "writer": lambda: self.writer_client.kill(writer_step_timeout)},
+                                 timeout)
+
+        self.invalidate_status()
+
+        return report
+
+    def submit_job(self, operation, *args):
+        """
+        Execute an operation in the background, after the previously submitted jobs. The kill does not wait for the
+        other jobs and starts at once.
+        :param operation: One of "start", "set_config", "reset", "kill".
+        :param args: Arguments of the operation, the same as for the synchronous method.
+        :return: Job info with the job_id to query the progress and result with.
+        """
+        operations_steps = {"start": self._get_start_steps,
+                            "set_config": self._get_set_config_steps,
+                            "reset": self._get_reset_steps,
+                            "kill": self._get_kill_steps}
 
-        self.detector_client.stop()
+        if operation not in operations_steps:
+            raise ValueError("Operation '%s' cannot be executed as a job. Available operations: %s." %
+                             (operation, sorted(operations_steps)))
 
-        self.backend_client.reset()
+        return self.jobs.submit(operation, operations_steps[operation](*args),
+                                exclusive=operation != "kill").get_info()
 
-        self.writer_client.reset()
+    def get_job(self, job_id):
+        return self.jobs.get_job(job_id).get_info()
 
-        return check_for_target_status(self.get_acquisition_status, IntegrationStatus.INITIALIZED)
+    def get_jobs(self):
+        return self.jobs.get_jobs_info()
 
-    def kill(self):
-        self.stop_acquisition()
+    def cancel_job(self, job_id):
+        return self.jobs.cancel_job(job_id).get_info()
 
     def get_server_info(self):
         return {
@@ -200,14 +532,105 @@ class IntegrationManager(object):
                 "writer_url": self.writer_client.url},
             "clients_enabled": self.get_clients_enabled(),
             "validator": "NOT IMPLEMENTED",
-            "last_config_successful": self.last_config_successful
+            "last_config_successful": self.last_config_successful,
+            "last_reset": self.last_reset_report
         }
 
     def get_metrics(self):
         # Always return a copy - we do not want this to be updated.
         return {"writer": self.writer_client.get_statistics(),
                 "backend": self.backend_client.get_metrics(),
-                "detector": {}}
+                "detector": {},
+                "logging": get_logging_statistics()}
+
+    def detector_client_get_value(self, name, fresh=False):
+        """
+        :param name: Name of the detector parameter.
+        :param fresh: Read the value from the detector instead of the parameter cache.
+        """
+        return self.detector_client.get_value(name, fresh=fresh)
+
+    @synchronized
+    def detector_client_set_value(self, name, value, no_verification=False):
+        try:
+            return self.detector_client.set_value(name, value, no_verification=no_verification)
+        finally:
+            self.invalidate_status()
+
+    def detector_client_get_values(self, names, fresh=False):
+        """
+        :param names: Names of the detector parameters.
+        :param fresh: Read the values from the detector instead of the parameter cache.
+        :return: Tuple (values, errors), with the value or the error message for each parameter.
+        """
+        if hasattr(self.detector_client, "get_values"):
+            return self.detector_client.get_values(names, fresh=fresh)
+
+        # Detector clients without bulk access are read one parameter at a time.
+        return self._execute_per_parameter(names, lambda name: self.detector_client.get_value(name, fresh=fresh))
+
+    @synchronized
+    def detector_client_set_values(self, values):
+        """
+        :param values: Dictionary with the value for each detector parameter.
+        :return: Tuple (values, errors), with the read back value or the error message for each parameter.
+        """
+        try:
+            if hasattr(self.detector_client, "set_values"):
+                return self.detector_client.set_values(values)
+
+            return self._execute_per_parameter(values,
+                                               lambda name: self.detector_client.set_value(name, values[name]))
+        finally:
+            self.invalidate_status()
+
+    @staticmethod
+    def _execute_per_parameter(names, function):
+        values = {}
+        errors = {}
+
+        for name in names:
+            try:
+                values[name] = function(name)
+            except Exception as e:
+                errors[name] = str(e)
+
+        return values, errors
+
+    def get_status_timeline(self, n_acquisitions=None):
+        return self.status_timeline.get_acquisitions(n_acquisitions)
+
+    def push_writer_values(self, writer_port, values):
+        if not hasattr(self.writer_client, "push_values"):
+            raise ValueError("The writer client does not accept pushed values.")
+
+        if self.writer_client.push_values(writer_port, values):
+            self.invalidate_status()
+
+    def get_writer_log_names(self):
+        if not hasattr(self.writer_client, "get_log_names"):
+            raise ValueError("The writer client does not provide process logs.")
+
+        # A disabled writer client returns None.
+        return self.writer_client.get_log_names() or []
+
+    def read_writer_log(self, log_name=None, offset=0, length=None, follow=False, timeout=None):
+        if not hasattr(self.writer_client, "read_log"):
+            raise ValueError("The writer client does not provide process logs.")
+
+        if not self.writer_client.is_client_enabled():
+            raise ValueError("Cannot read the writer log, the writer client is disabled.")
+
+        return self.writer_client.read_log(log_name, offset, length, follow, timeout)
+
+    def submit_acquisition_queue(self, points, parameters=None):
+        return self.acquisition_queue.submit(points, parameters)
+
+    def get_acquisition_queue_status(self):
+        return self.acquisition_queue.get_status()
+
+    def cancel_acquisition_queue(self):
+        return self.acquisition_queue.cancel()
 
     def test_daq(self, test_configuration):
         return test_configuration
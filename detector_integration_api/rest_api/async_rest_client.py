@@ -0,0 +1,334 @@
+import asyncio
+import json
+from time import time
+from urllib.parse import urlencode
+
+import aiohttp
+
+from detector_integration_api import config
+from detector_integration_api.config import ROUTES
+from detector_integration_api.rest_api import encoding
+from detector_integration_api.rest_api.rest_client import validate_response, get_batch_request
+
+JOB_RUNNING_STATES = ("pending", "running")
+
+
+class AsyncDetectorIntegrationClient(object):
+    """
+    Asyncio counterpart of DetectorIntegrationClient. All methods are coroutines.
+    """
+
+    def __init__(self, api_address=None, connection_limit=config.CLIENT_CONNECTION_POOL_SIZE, request_timeout=None,
+                 use_msgpack=False):
+        if not api_address:
+            api_address = "http://%s:%s" % (config.DEFAULT_SERVER_INTERFACE, config.DEFAULT_SERVER_PORT)
+
+        self.api_address = api_address.rstrip("/")
+
+        self.connection_limit = connection_limit
+        self.request_timeout = request_timeout
+
+        # The session is bound to the event loop, so it is created on the first request.
+        self._session = None
+
+        self.headers = {}
+        if use_msgpack:
+            if not encoding.is_msgpack_available():
+                raise ValueError("MessagePack responses requested, but the msgpack package is not installed.")
+
+            self.headers["Accept"] = encoding.MSGPACK_CONTENT_TYPE + ", application/json;q=0.5"
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.connection_limit)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _request(self, method, request_url, request_json=None):
+        async with self._get_session().request(method, request_url, json=request_json,
+                                               headers=self.headers) as response:
+
+            if encoding.is_msgpack_content_type(response.headers.get("Content-Type")):
+                server_response = encoding.decode_msgpack(await response.read())
+            else:
+                # The server does not always set the JSON content type (error handler).
+                server_response = await response.json(content_type=None)
+
+        return validate_response(server_response)
+
+    async def start(self, trigger_start=True, parameters=None, asynchronous=False):
+        request_url = self.api_address + ROUTES["start"]
+
+        if asynchronous:
+            request_url += "?async=true"
+
+        if not parameters:
+            parameters = {}
+
+        parameters["trigger_start"] = trigger_start
+
+        return await self._request("POST", request_url, parameters)
+
+    async def stop(self, asynchronous=False):
+        request_url = self.api_address + ROUTES["stop"]
+
+        if asynchronous:
+            request_url += "?async=true"
+
+        return await self._request("POST", request_url)
+
+    async def get_finalization(self):
+        return (await self._request("GET", self.api_address + ROUTES["get_finalization"]))["finalization"]
+
+    async def wait_for_finalization(self, timeout=None, polling_interval=0.2):
+        return await self._wait_for_job_done(self.get_finalization, timeout, polling_interval)
+
+    async def get_status(self):
+        return await self._request("GET", self.api_address + ROUTES["get_status"])
+
+    async def get_status_details(self):
+        return await self._request("GET", self.api_address + ROUTES["get_status_details"])
+
+    async def get_config(self):
+        return await self._request("GET", self.api_address + ROUTES["get_config"])
+
+    async def wait_for_status(self, target_status, timeout=None, polling_interval=0.2):
+
+        if not isinstance(target_status, (list, tuple)):
+            target_status = [target_status]
+
+        start_time = time()
+        while True:
+            last_status = (await self.get_status())["status"]
+
+            if last_status in target_status:
+                return
+
+            if last_status == 'IntegrationStatus.ERROR':
+                # Check the status again, the same as the synchronous client.
+                last_status = (await self.get_status())["status"]
+                if last_status == 'IntegrationStatus.ERROR':
+                    raise RuntimeError("Received status 'IntegrationStatus.ERROR'."
+                                       "Use get_status_details for more info.")
+
+            if timeout and time() - start_time > timeout:
+                raise ValueError("Timeout exceeded. Could not reach target status '%s'. Last received status: '%s'." %
+                                 (target_status, last_status))
+
+            await asyncio.sleep(polling_interval)
+
+    async def get_clients_enabled(self):
+        return await self._request("GET", self.api_address + ROUTES["clients_enabled"])
+
+    async def set_clients_enabled(self, configuration):
+        return await self._request("POST", self.api_address + ROUTES["clients_enabled"], configuration)
+
+    async def set_client_configuration(self, configuration):
+        return await self._request("POST", self.api_address + ROUTES["set_client_configuration"], configuration)
+
+    async def clear_client_configuration(self, client):
+        return await self._request("POST", self.api_address + ROUTES["clear_client_configuration"] + "/" + client)
+
+    async def get_client_configuration(self, client):
+        return await self._request("POST", self.api_address + ROUTES["get_client_configuration"] + "/" + client)
+
+    async def set_config(self, configuration, asynchronous=False):
+        request_url = self.api_address + ROUTES["set_config"]
+
+        if asynchronous:
+            request_url += "?async=true"
+
+        return await self._request("PUT", request_url, configuration)
+
+    async def set_config_from_file(self, filename):
+        with open(filename) as input_file:
+            configuration = json.load(input_file)
+
+        return await self.set_config(configuration)
+
+    async def set_last_config(self):
+        return await self._request("POST", self.api_address + ROUTES["set_last_config"])
+
+    async def update_config(self, configuration):
+        return await self._request("POST", self.api_address + ROUTES["update_config"], configuration)
+
+    async def get_detector_value(self, name, fresh=False):
+        request_url = self.api_address + ROUTES["get_detector_value"] + "/" + name
+
+        if fresh:
+            request_url += "?fresh=true"
+
+        response = await self._request("GET", request_url)
+
+        return response["value"]
+
+    async def set_detector_value(self, parameter_name, parameter_value):
+        request_json = {"name": parameter_name,
+                        "value": parameter_value}
+
+        response = await self._request("POST", self.api_address + ROUTES["set_detector_value"], request_json)
+
+        return response["value"]
+
+    async def get_detector_values(self, names, fresh=False):
+        query_parameters = {"names": ",".join(names)}
+
+        if fresh:
+            query_parameters["fresh"] = "true"
+
+        response = await self._request("GET", self.api_address + ROUTES["get_detector_values"] + "?" +
+                                       urlencode(query_parameters))
+
+        return response["values"], response["errors"]
+
+    async def set_detector_values(self, values):
+        response = await self._request("POST", self.api_address + ROUTES["set_detector_values"], {"values": values})
+
+        return response["values"], response["errors"]
+
+    async def reset(self, asynchronous=False):
+        request_url = self.api_address + ROUTES["reset"]
+
+        if asynchronous:
+            request_url += "?async=true"
+
+        return await self._request("POST", request_url)
+
+    async def kill(self, asynchronous=False, timeout=None):
+        request_url = self.api_address + ROUTES["kill"]
+
+        query = {}
+        if asynchronous:
+            query["async"] = "true"
+        if timeout is not None:
+            query["timeout"] = timeout
+
+        if query:
+            request_url += "?" + urlencode(query)
+
+        return await self._request("POST", request_url)
+
+    async def get_jobs(self):
+        return (await self._request("GET", self.api_address + ROUTES["get_jobs"]))["jobs"]
+
+    async def get_job(self, job_id):
+        return (await self._request("GET", self.api_address + ROUTES["get_job"] + "/" + job_id))["job"]
+
+    async def cancel_job(self, job_id):
+        return (await self._request("POST", self.api_address + ROUTES["cancel_job"] + "/" + job_id))["job"]
+
+    async def wait_for_job(self, job_id, timeout=None, polling_interval=0.2):
+        return await self._wait_for_job_done(lambda: self.get_job(job_id), timeout, polling_interval)
+
+    async def _wait_for_job_done(self, get_job_info, timeout=None, polling_interval=0.2):
+        """
+        :param get_job_info: Coroutine function returning the job info, or None if there is no job.
+        """
+        start_time = time()
+
+        while True:
+            job_info = await get_job_info()
+
+            if job_info is None or job_info["state"] not in JOB_RUNNING_STATES:
+                return job_info
+
+            if timeout and time() - start_time > timeout:
+                raise ValueError("Timeout exceeded. Job '%s' still in step '%s'." %
+                                 (job_info["name"], job_info["current_step"]))
+
+            await asyncio.sleep(polling_interval)
+
+    async def get_server_info(self):
+        return await self._request("GET", self.api_address + ROUTES["get_server_info"])
+
+    async def get_control_panel_info(self):
+        return await self._request("GET", self.api_address + ROUTES["get_control_panel_info"])
+
+    async def get_metrics(self):
+        return await self._request("GET", self.api_address + ROUTES["get_metrics"])
+
+    async def get_status_timeline(self, n_acquisitions=None):
+        request_url = self.api_address + ROUTES["get_status_timeline"]
+
+        if n_acquisitions is not None:
+            request_url += "?" + urlencode({"n_acquisitions": n_acquisitions})
+
+        return (await self._request("GET", request_url))["timeline"]
+
+    async def get_writer_logs(self):
+        return (await self._request("GET", self.api_address + ROUTES["get_writer_logs"]))["logs"]
+
+    async def get_writer_log(self, log_name=None, offset=0, length=None, follow=False, timeout=None):
+        query_parameters = {"offset": offset,
+                            "follow": "true" if follow else "false"}
+
+        if log_name is not None:
+            query_parameters["log_name"] = log_name
+        if length is not None:
+            query_parameters["length"] = length
+        if timeout is not None:
+            query_parameters["timeout"] = timeout
+
+        request_url = self.api_address + ROUTES["get_writer_log"] + "?" + urlencode(query_parameters)
+
+        return (await self._request("GET", request_url))["log"]
+
+    async def get_profiler(self):
+        return (await self._request("GET", self.api_address + ROUTES["get_profiler"]))["profiler"]
+
+    async def set_profiler(self, enabled, sample_fraction=None, clear=False):
+        request_json = {"enabled": enabled,
+                        "clear": clear}
+
+        if sample_fraction is not None:
+            request_json["sample_fraction"] = sample_fraction
+
+        return (await self._request("POST", self.api_address + ROUTES["set_profiler"], request_json))["profiler"]
+
+    async def get_profiler_stacks(self):
+        async with self._get_session().get(self.api_address + ROUTES["get_profiler_stacks"]) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def get_backend(self, action):
+        return await self._request("GET", self.api_address + ROUTES["backend_client"] + "/" + action)
+
+    async def put_backend(self, action, configuration=None):
+        if configuration is None:
+            configuration = {}
+
+        return await self._request("PUT", self.api_address + ROUTES["backend_client"] + "/" + action, configuration)
+
+    async def daq_test(self, configuration=None):
+        if configuration is None:
+            configuration = {}
+
+        return await self._request("POST", self.api_address + ROUTES["daq_test"], configuration)
+
+    async def batch(self, operations):
+        return await self._request("POST", self.api_address + ROUTES["batch"], get_batch_request(operations))
+
+    async def submit_acquisition_queue(self, points, parameters=None):
+        request_json = {"points": points,
+                        "parameters": parameters}
+
+        return await self._request("POST", self.api_address + ROUTES["submit_acquisition_queue"], request_json)
+
+    async def get_acquisition_queue(self):
+        return await self._request("GET", self.api_address + ROUTES["get_acquisition_queue"])
+
+    async def cancel_acquisition_queue(self):
+        return await self._request("POST", self.api_address + ROUTES["cancel_acquisition_queue"])
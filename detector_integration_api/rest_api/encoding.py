@@ -0,0 +1,32 @@
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+MSGPACK_ACCEPTED_CONTENT_TYPES = (MSGPACK_CONTENT_TYPE, "application/x-msgpack")
+
+
+def is_msgpack_available():
+    return msgpack is not None
+
+
+def accepts_msgpack(accept_header):
+    if not accept_header or not is_msgpack_available():
+        return False
+
+    accepted_types = (media_range.split(";")[0].strip() for media_range in accept_header.split(","))
+
+    return any(accepted_type in MSGPACK_ACCEPTED_CONTENT_TYPES for accepted_type in accepted_types)
+
+
+def is_msgpack_content_type(content_type):
+    return bool(content_type) and content_type.split(";")[0].strip() in MSGPACK_ACCEPTED_CONTENT_TYPES
+
+
+def encode_msgpack(data):
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def decode_msgpack(data):
+    return msgpack.unpackb(data, raw=False)
@@ -0,0 +1,138 @@
+import os
+import sys
+from collections import Counter
+from logging import getLogger
+from random import random
+from threading import Thread, Lock, Event, get_ident
+
+from bottle import request
+
+from detector_integration_api import config
+
+_logger = getLogger(__name__)
+
+
+def get_collapsed_stack(frame):
+    """
+    :return: Stack of the frame in the collapsed format of the flame graph tools, from the outermost call.
+    """
+    stack = []
+
+    while frame is not None:
+        code = frame.f_code
+        stack.append("%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+        frame = frame.f_back
+
+    return ";".join(reversed(stack))
+
+
+class RequestProfiler(object):
+    """
+    Sample the call stacks of a fraction of the requests of a bottle app, and aggregate them per route.
+    A sampling thread reads the stacks of the threads handling the profiled requests, so the requests themselves
+    are not slowed down by tracing.
+    """
+
+    def __init__(self, sample_fraction=None, sampling_interval=None):
+        """
+        :param sample_fraction: Fraction of the requests to profile, by default REQUEST_PROFILER_SAMPLE_FRACTION.
+        :param sampling_interval: Time between two stack samples, by default REQUEST_PROFILER_SAMPLING_INTERVAL.
+        """
+        self.sample_fraction = sample_fraction if sample_fraction is not None \
+            else config.REQUEST_PROFILER_SAMPLE_FRACTION
+        self.sampling_interval = sampling_interval if sampling_interval is not None \
+            else config.REQUEST_PROFILER_SAMPLING_INTERVAL
+
+        self.enabled = False
+        self.stopped = Event()
+        self.sampling_thread = None
+
+        # Stacks sampled for each request in progress, by thread id.
+        self.active_requests = {}
+        self.stack_counts = Counter()
+        self.n_profiled_requests = 0
+        self.n_samples = 0
+
+        self.lock = Lock()
+
+    def install(self, app):
+        app.add_hook("before_request", self._on_request_start)
+        app.add_hook("after_request", self._on_request_end)
+
+    def _on_request_start(self):
+        if self.enabled and random() < self.sample_fraction:
+            with self.lock:
+                self.active_requests[get_ident()] = Counter()
+
+    def _on_request_end(self):
+        with self.lock:
+            request_stacks = self.active_requests.pop(get_ident(), None)
+
+            if request_stacks is None:
+                return
+
+            # Bottle sets the route in the environment once the request is matched.
+            route = request.environ.get("bottle.route")
+            route_name = "%s %s" % (route.method, route.rule) if route is not None else "unmatched"
+
+            self.n_profiled_requests += 1
+
+            for stack, count in request_stacks.items():
+                self.stack_counts[route_name + ";" + stack] += count
+
+    def _sample(self):
+        while not self.stopped.wait(self.sampling_interval):
+
+            if not self.active_requests:
+                continue
+
+            frames = sys._current_frames()
+
+            with self.lock:
+                for thread_id, request_stacks in self.active_requests.items():
+                    if thread_id in frames:
+                        request_stacks[get_collapsed_stack(frames[thread_id])] += 1
+                        self.n_samples += 1
+
+    def set_enabled(self, enabled, sample_fraction=None):
+        if sample_fraction is not None:
+            if not 0 <= sample_fraction <= 1:
+                raise ValueError("Profiler sample fraction must be between 0 and 1, but %s was given."
+                                 % sample_fraction)
+
+            self.sample_fraction = sample_fraction
+
+        if enabled and not self.enabled:
+            self.stopped.clear()
+            self.sampling_thread = Thread(target=self._sample, name="request_profiler", daemon=True)
+            self.sampling_thread.start()
+
+        elif not enabled and self.enabled:
+            self.stopped.set()
+            self.sampling_thread.join()
+
+            with self.lock:
+                self.active_requests.clear()
+
+        self.enabled = enabled
+        _logger.info("Request profiler enabled=%s with sample fraction %s.", self.enabled, self.sample_fraction)
+
+    def clear(self):
+        with self.lock:
+            self.stack_counts.clear()
+            self.n_profiled_requests = 0
+            self.n_samples = 0
+
+    def get_status(self):
+        return {"enabled": self.enabled,
+                "sample_fraction": self.sample_fraction,
+                "sampling_interval": self.sampling_interval,
+                "n_profiled_requests": self.n_profiled_requests,
+                "n_samples": self.n_samples}
+
+    def get_collapsed_stacks(self):
+        """
+        :return: Sampled stacks, one "route;frame;frame count" line per stack, as used by the flame graph tools.
+        """
+        with self.lock:
+            return "".join("%s %d\n" % (stack, count) for stack, count in sorted(self.stack_counts.items()))
@@ -1,10 +1,11 @@
 import json
+from copy import deepcopy
 from time import time, sleep
-
-import requests
+from urllib.parse import urlencode
 
 from detector_integration_api import config
 from detector_integration_api.config import ROUTES
+from detector_integration_api.rest_api import encoding
 
 
 def validate_response(server_response):
@@ -14,54 +15,201 @@ def validate_response(server_response):
 
     return server_response
 
+
+def get_batch_request(operations):
+    request_operations = []
+
+    for operation in operations:
+        if isinstance(operation, str):
+            operation = (operation, None)
+
+        request_operations.append({"operation": operation[0],
+                                   "payload": operation[1]})
+
+    return {"operations": request_operations}
+
+
+def wait_for_job_done(get_job_info, timeout=None, polling_interval=0.2):
+    """
+    Poll a job until it is not pending or running anymore.
+    :param get_job_info: Function returning the job info, or None if there is no job.
+    :return: Last job info.
+    """
+    start_time = time()
+
+    while True:
+        job_info = get_job_info()
+
+        if job_info is None or job_info["state"] not in ("pending", "running"):
+            return job_info
+
+        if timeout and time() - start_time > timeout:
+            raise ValueError("Timeout exceeded. Job '%s' still in step '%s'." %
+                             (job_info["name"], job_info["current_step"]))
+
+        sleep(polling_interval)
+
 # TODO: Add functionality to get all the clients separately.
 
 
 class DetectorIntegrationClient(object):
-    def __init__(self, api_address=None):
+    def __init__(self, api_address=None, session=None, use_msgpack=False, use_etags=True):
+        """
+        :param api_address: Address of the integration server.
+        :param session: requests.Session to use. Clients can share a session to share the connection pool.
+        :param use_msgpack: Request MessagePack encoded responses, which are faster to decode.
+        :param use_etags: Cache responses with an ETag and ask the server only if they changed.
+        """
         if not api_address:
             api_address = "http://%s:%s" % (config.DEFAULT_SERVER_INTERFACE, config.DEFAULT_SERVER_PORT)
 
         self.api_address = api_address.rstrip("/")
 
+        if session is None:
+            # Imported here, so that importing the package (for example only the validator) does not import requests.
+            import requests
+            session = requests.Session()
+
+        # Keep the connections alive between requests.
+        self.session = session
+
+        self.headers = {}
+        if use_msgpack:
+            if not encoding.is_msgpack_available():
+                raise ValueError("MessagePack responses requested, but the msgpack package is not installed.")
+
+            self.headers["Accept"] = encoding.MSGPACK_CONTENT_TYPE + ", application/json;q=0.5"
+
+        self.use_etags = use_etags
+        # Responses by request url, in format {request_url: (etag, response)}.
+        self._etag_cache = {}
+
+    @staticmethod
+    def _decode_response(response):
+        if encoding.is_msgpack_content_type(response.headers.get("Content-Type")):
+            return encoding.decode_msgpack(response.content)
+
+        return response.json()
+
+    def _get(self, request_url):
+        cached_response = self._etag_cache.get(request_url)
+
+        headers = self.headers
+        if cached_response is not None:
+            headers = dict(self.headers, **{"If-None-Match": cached_response[0]})
+
+        response = self.session.get(request_url, headers=headers)
+
+        if response.status_code == 304 and cached_response is not None:
+            return deepcopy(cached_response[1])
+
+        server_response = self._decode_response(response)
+
+        etag = response.headers.get("ETag")
+        if self.use_etags and etag and server_response.get("state") == "ok":
+            self._etag_cache[request_url] = (etag, deepcopy(server_response))
+        else:
+            self._etag_cache.pop(request_url, None)
+
+        return server_response
+
+    def _post(self, request_url, request_json=None):
+        return self._decode_response(self.session.post(request_url, json=request_json, headers=self.headers))
+
+    def _put(self, request_url, request_json=None):
+        return self._decode_response(self.session.put(request_url, json=request_json, headers=self.headers))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     # TODO: Remove trigger_start parameter from start (use parameters instead).
-    def start(self, trigger_start=True, parameters=None):
+    def start(self, trigger_start=True, parameters=None, asynchronous=False):
         request_url = self.api_address + ROUTES["start"]
 
+        if asynchronous:
+            request_url += "?async=true"
+
         if not parameters:
             parameters = {}
 
         parameters["trigger_start"] = trigger_start
 
-        response = requests.post(request_url, json=parameters).json()
+        response = self._post(request_url, request_json=parameters)
 
         return validate_response(response)
 
-    def stop(self):
+    def stop(self, asynchronous=False):
+        """
+        :param asynchronous: Return as soon as the detector is stopped, and finalize the acquisition in the
+        background. Use get_finalization or wait_for_finalization to follow it.
+        """
         request_url = self.api_address + ROUTES["stop"]
 
-        response = requests.post(request_url).json()
+        if asynchronous:
+            request_url += "?async=true"
+
+        response = self._post(request_url)
 
         return validate_response(response)
 
+    def get_finalization(self):
+        request_url = self.api_address + ROUTES["get_finalization"]
+
+        response = self._get(request_url)
+
+        return validate_response(response)["finalization"]
+
+    def wait_for_finalization(self, timeout=None, polling_interval=0.2):
+        return wait_for_job_done(self.get_finalization, timeout, polling_interval)
+
+    def get_jobs(self):
+        request_url = self.api_address + ROUTES["get_jobs"]
+
+        response = self._get(request_url)
+
+        return validate_response(response)["jobs"]
+
+    def get_job(self, job_id):
+        request_url = self.api_address + ROUTES["get_job"] + "/" + job_id
+
+        response = self._get(request_url)
+
+        return validate_response(response)["job"]
+
+    def cancel_job(self, job_id):
+        request_url = self.api_address + ROUTES["cancel_job"] + "/" + job_id
+
+        response = self._post(request_url)
+
+        return validate_response(response)["job"]
+
+    def wait_for_job(self, job_id, timeout=None, polling_interval=0.2):
+        return wait_for_job_done(lambda: self.get_job(job_id), timeout, polling_interval)
+
     def get_status(self):
         request_url = self.api_address + ROUTES["get_status"]
 
-        response = requests.get(request_url).json()
+        response = self._get(request_url)
 
         return validate_response(response)
 
     def get_status_details(self):
         request_url = self.api_address + ROUTES["get_status_details"]
 
-        response = requests.get(request_url).json()
+        response = self._get(request_url)
 
         return validate_response(response)
 
     def get_config(self):
         request_url = self.api_address + ROUTES["get_config"]
 
-        response = requests.get(request_url).json()
+        response = self._get(request_url)
 
         return validate_response(response)
 
@@ -93,43 +241,46 @@ class DetectorIntegrationClient(object):
     def get_clients_enabled(self):
         request_url = self.api_address + ROUTES["clients_enabled"]
 
-        response = requests.get(request_url).json()
+        response = self._get(request_url)
 
         return validate_response(response)
 
     def set_clients_enabled(self, configuration):
         request_url = self.api_address + ROUTES["clients_enabled"]
 
-        response = requests.post(request_url, json=configuration).json()
+        response = self._post(request_url, request_json=configuration)
 
         return validate_response(response)
 
     def set_client_configuration(self, configuration):
         request_url = self.api_address + ROUTES["set_client_configuration"]
  
-        response = requests.post(request_url, json=configuration).json()
+        response = self._post(request_url, request_json=configuration)
 
         return validate_response(response)
 
     def clear_client_configuration(self, client):
         request_url = self.api_address + ROUTES["clear_client_configuration"] + "/" + client
 
-        response = requests.post(request_url).json()
+        response = self._post(request_url)
 
         return validate_response(response)
 
     def get_client_configuration(self, client):
         request_url = self.api_address + ROUTES["get_client_configuration"] + "/" + client
 
-        response = requests.post(request_url).json()
+        response = self._post(request_url)
 
         return validate_response(response)
 
 
-    def set_config(self, configuration):
+    def set_config(self, configuration, asynchronous=False):
         request_url = self.api_address + ROUTES["set_config"]
 
-        response = requests.put(request_url, json=configuration).json()
+        if asynchronous:
+            request_url += "?async=true"
+
+        response = self._put(request_url, request_json=configuration)
 
         return validate_response(response)
 
@@ -142,21 +293,28 @@ class DetectorIntegrationClient(object):
     def set_last_config(self):
         request_url = self.api_address + ROUTES["set_last_config"]
 
-        response = requests.post(request_url).json()
+        response = self._post(request_url)
 
         return validate_response(response)
 
     def update_config(self, configuration):
         request_url = self.api_address + ROUTES["update_config"]
 
-        response = requests.post(request_url, json=configuration).json()
+        response = self._post(request_url, request_json=configuration)
 
         return validate_response(response)
 
-    def get_detector_value(self, name):
+    def get_detector_value(self, name, fresh=False):
+        """
+        :param name: Name of the detector parameter.
+        :param fresh: Read the value from the detector instead of the server parameter cache.
+        """
         request_url = self.api_address + ROUTES["get_detector_value"] + "/" + name
 
-        response = requests.get(request_url).json()
+        if fresh:
+            request_url += "?fresh=true"
+
+        response = self._get(request_url)
 
         return validate_response(response)["value"]
 
@@ -166,41 +324,91 @@ class DetectorIntegrationClient(object):
         request_json = {"name": parameter_name,
                         "value": parameter_value}
 
-        response = requests.post(request_url, json=request_json).json()
+        response = self._post(request_url, request_json=request_json)
 
         return validate_response(response)["value"]
 
-    def reset(self):
+    def get_detector_values(self, names, fresh=False):
+        """
+        :param names: Names of the detector parameters.
+        :param fresh: Read the values from the detector instead of the server parameter cache.
+        :return: Tuple (values, errors), with the value or the error message for each parameter.
+        """
+        query_parameters = {"names": ",".join(names)}
+
+        if fresh:
+            query_parameters["fresh"] = "true"
+
+        request_url = self.api_address + ROUTES["get_detector_values"] + "?" + urlencode(query_parameters)
+
+        response = validate_response(self._get(request_url))
+
+        return response["values"], response["errors"]
+
+    def set_detector_values(self, values):
+        """
+        :param values: Dictionary with the value for each detector parameter.
+        :return: Tuple (values, errors), with the read back value or the error message for each parameter.
+        """
+        request_url = self.api_address + ROUTES["set_detector_values"]
+
+        response = validate_response(self._post(request_url, request_json={"values": values}))
+
+        return response["values"], response["errors"]
+
+    def reset(self, asynchronous=False):
         request_url = self.api_address + ROUTES["reset"]
 
-        response = requests.post(request_url).json()
+        if asynchronous:
+            request_url += "?async=true"
+
+        response = self._post(request_url)
 
         return validate_response(response)
 
-    def kill(self):
+    def kill(self, asynchronous=False, timeout=None):
+        """
+        :param timeout: Maximum time the server can take to kill all components.
+        """
         request_url = self.api_address + ROUTES["kill"]
 
-        response = requests.post(request_url).json()
+        query = {}
+        if asynchronous:
+            query["async"] = "true"
+        if timeout is not None:
+            query["timeout"] = timeout
+
+        if query:
+            request_url += "?" + urlencode(query)
+
+        response = self._post(request_url)
 
         return validate_response(response)
 
     def get_server_info(self):
         request_url = self.api_address + ROUTES["get_server_info"]
 
-        response = requests.get(request_url).json()
+        response = self._get(request_url)
+
+        return validate_response(response)
+
+    def get_control_panel_info(self):
+        request_url = self.api_address + ROUTES["get_control_panel_info"]
+
+        response = self._get(request_url)
 
         return validate_response(response)
 
     def get_metrics(self):
         request_url = self.api_address + ROUTES["get_metrics"]
-        response = requests.get(request_url)
-        
-        return validate_response(response.json())
+        response = self._get(request_url)
+
+        return validate_response(response)
 
     def get_backend(self, action):
         request_url = self.api_address + ROUTES["backend_client"] + "/" + action
 
-        response = requests.get(request_url).json() 
+        response = self._get(request_url) 
         return validate_response(response)
 
     def put_backend(self, action, configuration=None):
@@ -209,7 +417,7 @@ class DetectorIntegrationClient(object):
         if configuration is None:
             configuration = {}
 
-        response = requests.put(request_url, json=configuration).json()
+        response = self._put(request_url, request_json=configuration)
         return validate_response(response)
 
     def daq_test(self, configuration=None):
@@ -218,11 +426,117 @@ class DetectorIntegrationClient(object):
         if configuration is None:
             configuration = {}
 
-        response = requests.post(request_url, json=configuration).json()
+        response = self._post(request_url, request_json=configuration)
+        return validate_response(response)
+
+    def batch(self, operations):
+        """
+        Execute multiple operations in a single request.
+        :param operations: List of operation names or (operation name, payload) tuples, for example
+        ["reset", ("set_config", configuration), "start"].
+        """
+        request_url = self.api_address + ROUTES["batch"]
+
+        response = self._post(request_url, request_json=get_batch_request(operations))
+        return validate_response(response)
+
+    def get_status_timeline(self, n_acquisitions=None):
+        """
+        :param n_acquisitions: Number of the most recent acquisitions to return.
+        :return: For each acquisition, the status changes and the time spent in each integration status.
+        """
+        request_url = self.api_address + ROUTES["get_status_timeline"]
+
+        if n_acquisitions is not None:
+            request_url += "?" + urlencode({"n_acquisitions": n_acquisitions})
+
+        response = self._get(request_url)
+
+        return validate_response(response)["timeline"]
+
+    def get_writer_logs(self):
+        request_url = self.api_address + ROUTES["get_writer_logs"]
+
+        response = self._get(request_url)
+        return validate_response(response)["logs"]
+
+    def get_writer_log(self, log_name=None, offset=0, length=None, follow=False, timeout=None):
+        """
+        Read a part of the current or a past writer log.
+        :param offset: Byte offset to start reading from. Negative offsets are counted from the end of the log.
+        :param follow: If there is no new data at offset, wait up to timeout seconds for it.
+        :return: Dictionary with the log "data", and the "next_offset" to continue reading from.
+        """
+        request_url = self.api_address + ROUTES["get_writer_log"]
+
+        query_parameters = {"offset": offset,
+                            "follow": "true" if follow else "false"}
+
+        if log_name is not None:
+            query_parameters["log_name"] = log_name
+        if length is not None:
+            query_parameters["length"] = length
+        if timeout is not None:
+            query_parameters["timeout"] = timeout
+
+        request_url += "?" + urlencode(query_parameters)
+
+        response = self._get(request_url)
+        return validate_response(response)["log"]
+
+    def get_profiler(self):
+        request_url = self.api_address + ROUTES["get_profiler"]
+
+        return validate_response(self._get(request_url))["profiler"]
+
+    def set_profiler(self, enabled, sample_fraction=None, clear=False):
+        """
+        :param enabled: Turn the request profiler on or off.
+        :param sample_fraction: Fraction of the requests to profile.
+        :param clear: Discard the stacks sampled so far.
+        """
+        request_url = self.api_address + ROUTES["set_profiler"]
+
+        request_json = {"enabled": enabled,
+                        "clear": clear}
+
+        if sample_fraction is not None:
+            request_json["sample_fraction"] = sample_fraction
+
+        return validate_response(self._post(request_url, request_json=request_json))["profiler"]
+
+    def get_profiler_stacks(self):
+        """
+        :return: Sampled stacks in the collapsed format of the flame graph tools.
+        """
+        response = self.session.get(self.api_address + ROUTES["get_profiler_stacks"])
+        response.raise_for_status()
+
+        return response.text
+
+    def submit_acquisition_queue(self, points, parameters=None):
+        request_url = self.api_address + ROUTES["submit_acquisition_queue"]
+
+        request_json = {"points": points,
+                        "parameters": parameters}
+
+        response = self._post(request_url, request_json=request_json)
+        return validate_response(response)
+
+    def get_acquisition_queue(self):
+        request_url = self.api_address + ROUTES["get_acquisition_queue"]
+
+        response = self._get(request_url)
+        return validate_response(response)
+
+    def cancel_acquisition_queue(self):
+        request_url = self.api_address + ROUTES["cancel_acquisition_queue"]
+
+        response = self._post(request_url)
         return validate_response(response)
 
     def ping(self):
         request_url = self.api_address + ROUTES["ping"]
-        response = requests.get(request_url)
+        response = self.session.get(request_url)
         return validate_response(response)
 
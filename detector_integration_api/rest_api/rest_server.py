@@ -1,15 +1,60 @@
+import ipaddress
 import json
 from logging import getLogger
+from time import time
 
 import bottle
 import os
 from bottle import request, response
 
-from detector_integration_api.config import ROUTES
+from detector_integration_api.common.tracing import new_trace_id, set_trace_id, reset_trace_id, get_trace_id, \
+    record_span
+from detector_integration_api.config import ROUTES, TRACE_HEADER, KILL_STATUS_TIMEOUT
+from detector_integration_api.rest_api import encoding
+from detector_integration_api.rest_api.request_profiler import RequestProfiler
 
 _logger = getLogger(__name__)
 
 
+def encode_response(callback):
+    """
+    Bottle plugin: encode the response with MessagePack if the client accepts it. JSON otherwise.
+    """
+    def wrapper(*args, **kwargs):
+        result = callback(*args, **kwargs)
+
+        if isinstance(result, dict):
+            response.set_header("Vary", "Accept")
+
+            if encoding.accepts_msgpack(request.headers.get("Accept")):
+                response.content_type = encoding.MSGPACK_CONTENT_TYPE
+                return encoding.encode_msgpack(result)
+
+        return result
+
+    return wrapper
+
+
+def is_loopback_request():
+    # Not request.remote_addr, which trusts the X-Forwarded-For header sent by the caller.
+    try:
+        address = ipaddress.ip_address(request.environ.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+
+    if address.version == 6 and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+
+    return address.is_loopback
+
+
+def error_response(status_code, error_text):
+    _logger.error(error_text)
+
+    return bottle.HTTPResponse(status=status_code, body=json.dumps({"state": "error", "status": error_text}),
+                               headers={"Content-Type": "application/json"})
+
+
 def register_rest_interface(app, integration_manager):
     static_root_path = os.path.join(os.path.dirname(__file__), "static")
     _logger.debug("Static files root folder: %s", static_root_path)
@@ -17,15 +62,79 @@ def register_rest_interface(app, integration_manager):
     # Set the path for the templates.
     bottle.TEMPLATE_PATH = [static_root_path]
 
+    app.install(encode_response)
+
+    # Disabled until turned on over the REST interface.
+    profiler = RequestProfiler()
+    profiler.install(app)
+
+    @app.hook("before_request")
+    def start_request_trace():
+        # Requests without a trace id from the caller start a new trace.
+        trace_id = request.headers.get(TRACE_HEADER) or new_trace_id()
+
+        request.environ["dia.trace_token"] = set_trace_id(trace_id)
+        request.environ["dia.request_start_time"] = time()
+
+    @app.hook("after_request")
+    def end_request_trace():
+        trace_token = request.environ.pop("dia.trace_token", None)
+
+        if trace_token is None:
+            return
+
+        response.set_header(TRACE_HEADER, get_trace_id())
+
+        start_time = request.environ["dia.request_start_time"]
+        record_span("%s %s" % (request.method, request.path), start_time, time() - start_time, category="request")
+
+        reset_trace_id(trace_token)
+
+    def conditional_get(stable_status_only=False):
+        """
+        Answer with 304 Not Modified, without querying the components, if the client has the current state. The
+        state changing operations invalidate the ETag, see IntegrationManager.invalidate_status.
+        """
+        def decorator(callback):
+            def wrapper(*args, **kwargs):
+                etag = integration_manager.get_state_etag(stable_status_only)
+                client_etags = [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]
+
+                if etag is not None and etag in client_etags:
+                    # The representation depends on the Accept header, see encode_response.
+                    return bottle.HTTPResponse(status=304, headers={"ETag": etag, "Vary": "Accept"})
+
+                result = callback(*args, **kwargs)
+
+                etag = integration_manager.get_state_etag(stable_status_only)
+                if etag is not None:
+                    response.set_header("ETag", etag)
+
+                return result
+
+            return wrapper
+
+        return decorator
+
     @app.get(ROUTES["html_index"])
     @bottle.view("index")
     def index():
         pass
 
+    def is_asynchronous_request():
+        return request.query.get("async", "false").lower() == "true"
+
+    def submit_job(operation, *args):
+        return {"state": "ok",
+                "job": integration_manager.submit_job(operation, *args)}
+
     @app.post(ROUTES["start"])
     def start():
         parameters = request.json
 
+        if is_asynchronous_request():
+            return submit_job("start", parameters)
+
         status = integration_manager.start_acquisition(parameters=parameters)
 
         return {"state": "ok",
@@ -33,10 +142,23 @@ def register_rest_interface(app, integration_manager):
 
     @app.post(ROUTES["stop"])
     def stop():
-        status = integration_manager.stop_acquisition()
+        asynchronous = is_asynchronous_request()
 
+        status = integration_manager.stop_acquisition(asynchronous=asynchronous)
+
+        stop_result = {"state": "ok",
+                       "status": str(status)}
+
+        if asynchronous:
+            stop_result["finalization"] = integration_manager.get_finalization_job()
+
+        return stop_result
+
+    @app.get(ROUTES["get_finalization"])
+    def get_finalization():
         return {"state": "ok",
-                "status": str(status)}
+                "status": integration_manager.get_acquisition_status_string(),
+                "finalization": integration_manager.get_finalization_job()}
 
     @app.get(ROUTES["get_status"])
     def get_status():
@@ -68,6 +190,7 @@ def register_rest_interface(app, integration_manager):
                 "config": integration_manager.get_acquisition_config()}
 
     @app.get(ROUTES["get_config"])
+    @conditional_get()
     def get_config():
 
         return {"state": "ok",
@@ -78,6 +201,9 @@ def register_rest_interface(app, integration_manager):
     def set_config():
         new_config = request.json
 
+        if is_asynchronous_request():
+            return submit_job("set_config", new_config)
+
         status = integration_manager.set_acquisition_config(new_config)
 
         return {"state": "ok",
@@ -96,6 +222,9 @@ def register_rest_interface(app, integration_manager):
 
     @app.post(ROUTES["reset"])
     def reset():
+        if is_asynchronous_request():
+            return submit_job("reset")
+
         status = integration_manager.reset()
 
         return {"state": "ok",
@@ -103,12 +232,34 @@ def register_rest_interface(app, integration_manager):
 
     @app.post(ROUTES["kill"])
     def kill():
-        status = integration_manager.kill()
+        if is_asynchronous_request():
+            return submit_job("kill")
+
+        timeout = request.query.get("timeout")
+        report = integration_manager.kill(timeout=float(timeout) if timeout else None)
 
+        # A component that does not respond must not delay the response.
         return {"state": "ok",
-                "status": str(status)}
+                "status": integration_manager.get_acquisition_status_string(timeout=KILL_STATUS_TIMEOUT),
+                "kill": report}
+
+    @app.get(ROUTES["get_jobs"])
+    def get_jobs():
+        return {"state": "ok",
+                "jobs": integration_manager.get_jobs()}
+
+    @app.get(ROUTES["get_job"] + "/<job_id>")
+    def get_job(job_id):
+        return {"state": "ok",
+                "job": integration_manager.get_job(job_id)}
+
+    @app.post(ROUTES["cancel_job"] + "/<job_id>")
+    def cancel_job(job_id):
+        return {"state": "ok",
+                "job": integration_manager.cancel_job(job_id)}
 
     @app.get(ROUTES["get_server_info"])
+    @conditional_get()
     def get_server_info():
 
         return {"state": "ok",
@@ -116,6 +267,7 @@ def register_rest_interface(app, integration_manager):
                 "server_info": integration_manager.get_server_info()}
 
     @app.get(ROUTES["get_control_panel_info"])
+    @conditional_get(stable_status_only=True)
     def get_control_panel_info():
 
         return {"state": "ok",
@@ -179,7 +331,9 @@ def register_rest_interface(app, integration_manager):
 
     @app.get(ROUTES["get_detector_value"] + "/<name>")
     def get_detector_value(name):
-        value = integration_manager.detector_client_get_value(name)
+        fresh = request.query.get("fresh", "false").lower() == "true"
+
+        value = integration_manager.detector_client_get_value(name, fresh=fresh)
 
         return {"state": "ok",
                 "status": integration_manager.get_acquisition_status_string(),
@@ -205,6 +359,36 @@ def register_rest_interface(app, integration_manager):
                 "status": integration_manager.get_acquisition_status_string(),
                 "value": value}
 
+    @app.get(ROUTES["get_detector_values"])
+    def get_detector_values():
+        names = request.query.get("names")
+
+        if not names:
+            raise ValueError("'names' query parameter with the comma separated parameter names must be set.")
+
+        fresh = request.query.get("fresh", "false").lower() == "true"
+
+        values, errors = integration_manager.detector_client_get_values(names.split(","), fresh=fresh)
+
+        return {"state": "ok",
+                "status": integration_manager.get_acquisition_status_string(),
+                "values": values,
+                "errors": errors}
+
+    @app.post(ROUTES["set_detector_values"])
+    def set_detector_values():
+        parameters_request = request.json
+
+        if not parameters_request or not isinstance(parameters_request.get("values"), dict):
+            raise ValueError("'values' with the value for each parameter must be set in JSON request.")
+
+        values, errors = integration_manager.detector_client_set_values(parameters_request["values"])
+
+        return {"state": "ok",
+                "status": integration_manager.get_acquisition_status_string(),
+                "values": values,
+                "errors": errors}
+
     @app.get(ROUTES["backend_client"] + "/<action>")
     def get_backend_client(action):
         value = integration_manager.backend_client_action(action)()
@@ -230,6 +414,162 @@ def register_rest_interface(app, integration_manager):
             return {"state": "ok",
                     "status": integration_manager.backend_client_get_status()}
 
+    # Operations available in a batch request. Each takes the operation payload and returns the result fields.
+    batch_operations = {
+        "start": lambda payload: {"status": str(integration_manager.start_acquisition(parameters=payload))},
+        "stop": lambda payload: {"status": str(integration_manager.stop_acquisition())},
+        "reset": lambda payload: {"status": str(integration_manager.reset())},
+        "kill": lambda payload: {"kill": integration_manager.kill(),
+                                 "status": integration_manager.get_acquisition_status_string(
+                                     timeout=KILL_STATUS_TIMEOUT)},
+
+        "get_status": lambda payload: {"status": integration_manager.get_acquisition_status_string()},
+        "get_status_details": lambda payload: {"details": integration_manager.get_status_details()},
+
+        "get_config": lambda payload: {"config": integration_manager.get_acquisition_config()},
+        "set_config": lambda payload: {"status": str(integration_manager.set_acquisition_config(payload)),
+                                       "config": integration_manager.get_acquisition_config()},
+        "update_config": lambda payload: {"status": str(integration_manager.update_acquisition_config(payload)),
+                                          "config": integration_manager.get_acquisition_config()},
+        "set_last_config": lambda payload: {
+            "status": str(integration_manager.set_acquisition_config(integration_manager.get_acquisition_config())),
+            "config": integration_manager.get_acquisition_config()},
+
+        "get_detector_value": lambda payload: {
+            "value": integration_manager.detector_client_get_value(payload["name"], fresh=payload.get("fresh", False))},
+        "set_detector_value": lambda payload: {
+            "value": integration_manager.detector_client_set_value(payload["name"], payload["value"],
+                                                                   no_verification=True)},
+        "get_detector_values": lambda payload: dict(zip(
+            ("values", "errors"),
+            integration_manager.detector_client_get_values(payload["names"], fresh=payload.get("fresh", False)))),
+        "set_detector_values": lambda payload: dict(zip(
+            ("values", "errors"), integration_manager.detector_client_set_values(payload["values"]))),
+
+        "get_server_info": lambda payload: {"server_info": integration_manager.get_server_info()},
+        "get_metrics": lambda payload: {"metrics": integration_manager.get_metrics()},
+    }
+
+    @app.post(ROUTES["batch"])
+    def batch():
+        batch_request = request.json
+
+        if not batch_request or "operations" not in batch_request:
+            raise ValueError("'operations' must be set in JSON request.")
+
+        operations = batch_request["operations"]
+
+        unknown_operations = [operation.get("operation") for operation in operations
+                              if operation.get("operation") not in batch_operations]
+        if unknown_operations:
+            raise ValueError("Unknown batch operations %s. Available operations: %s."
+                             % (unknown_operations, sorted(batch_operations)))
+
+        results = []
+        error_text = None
+
+        with integration_manager.lock:
+            for operation in operations:
+                operation_name = operation["operation"]
+                start_time = time()
+
+                try:
+                    result = batch_operations[operation_name](operation.get("payload"))
+                    result["state"] = "ok"
+                except Exception as e:
+                    _logger.error("Batch operation '%s' failed: %s", operation_name, e)
+
+                    error_text = "Batch operation %d '%s' failed: %s" % (len(results), operation_name, e)
+                    result = {"state": "error",
+                              "status": str(e)}
+
+                result["operation"] = operation_name
+                result["time"] = time() - start_time
+                results.append(result)
+
+                # Stop at the first error.
+                if error_text:
+                    break
+
+        return {"state": "error" if error_text else "ok",
+                "status": error_text or integration_manager.get_acquisition_status_string(),
+                "results": results}
+
+    @app.get(ROUTES["get_status_timeline"])
+    def get_status_timeline():
+        n_acquisitions = request.query.get("n_acquisitions")
+
+        # No status query, the timeline is used to look at past acquisitions.
+        return {"state": "ok",
+                "timeline": integration_manager.get_status_timeline(int(n_acquisitions) if n_acquisitions else None)}
+
+    @app.get(ROUTES["get_writer_logs"])
+    def get_writer_logs():
+
+        return {"state": "ok",
+                "status": integration_manager.get_acquisition_status_string(),
+                "logs": integration_manager.get_writer_log_names()}
+
+    @app.get(ROUTES["get_writer_log"])
+    def get_writer_log():
+        length = request.query.get("length")
+        timeout = request.query.get("timeout")
+
+        log = integration_manager.read_writer_log(log_name=request.query.get("log_name") or None,
+                                                  offset=int(request.query.get("offset", 0)),
+                                                  length=int(length) if length else None,
+                                                  follow=request.query.get("follow", "false").lower() == "true",
+                                                  timeout=float(timeout) if timeout else None)
+
+        # No status query, to keep the log polling cheap.
+        return {"state": "ok",
+                "log": log}
+
+    @app.post(ROUTES["push_writer_values"] + "/<writer_port>")
+    def push_writer_values(writer_port):
+        # The server listens on all interfaces, but only the local writer processes may push their values.
+        if not is_loopback_request():
+            return error_response(403, "Writer values can be pushed only from the local host, not from %s." %
+                                  request.environ.get("REMOTE_ADDR"))
+
+        try:
+            writer_port = int(writer_port)
+        except ValueError:
+            return error_response(400, "Writer port must be an integer, not '%s'." % writer_port)
+
+        integration_manager.push_writer_values(writer_port, request.json)
+
+        # No status query, the writer pushes its statistics often.
+        return {"state": "ok"}
+
+    @app.post(ROUTES["submit_acquisition_queue"])
+    def submit_acquisition_queue():
+        queue_request = request.json
+
+        if not queue_request or "points" not in queue_request:
+            raise ValueError("'points' must be set in JSON request.")
+
+        queue_status = integration_manager.submit_acquisition_queue(queue_request["points"],
+                                                                    queue_request.get("parameters"))
+
+        return {"state": "ok",
+                "status": integration_manager.get_acquisition_status_string(),
+                "queue": queue_status}
+
+    @app.get(ROUTES["get_acquisition_queue"])
+    def get_acquisition_queue():
+
+        return {"state": "ok",
+                "status": integration_manager.get_acquisition_status_string(),
+                "queue": integration_manager.get_acquisition_queue_status()}
+
+    @app.post(ROUTES["cancel_acquisition_queue"])
+    def cancel_acquisition_queue():
+
+        return {"state": "ok",
+                "status": integration_manager.get_acquisition_status_string(),
+                "queue": integration_manager.cancel_acquisition_queue()}
+
     @app.post(ROUTES["daq_test"])
     def post_daq_test():
         test_configuration = request.json
@@ -240,6 +580,32 @@ def register_rest_interface(app, integration_manager):
                 "status": integration_manager.get_acquisition_status_string(),
                 "result": test_results}
 
+    @app.get(ROUTES["get_profiler"])
+    def get_profiler():
+        return {"state": "ok",
+                "profiler": profiler.get_status()}
+
+    @app.post(ROUTES["set_profiler"])
+    def set_profiler():
+        profiler_request = request.json
+
+        if not profiler_request or "enabled" not in profiler_request:
+            raise ValueError("'enabled' must be set in JSON request.")
+
+        if profiler_request.get("clear", False):
+            profiler.clear()
+
+        profiler.set_enabled(bool(profiler_request["enabled"]), profiler_request.get("sample_fraction"))
+
+        return {"state": "ok",
+                "profiler": profiler.get_status()}
+
+    @app.get(ROUTES["get_profiler_stacks"])
+    def get_profiler_stacks():
+        response.content_type = "text/plain"
+
+        return profiler.get_collapsed_stacks()
+
     @app.get(ROUTES["html_index"] + "static/<filename:path>")
     def get_static(filename):
         return bottle.static_file(filename=filename, root=static_root_path)
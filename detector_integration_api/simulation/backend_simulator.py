@@ -0,0 +1,165 @@
+"""
+Simulated backend, implementing the REST interface used by the BackendClient.
+
+Usage: python -m detector_integration_api.simulation.backend_simulator [--port 8080] [--frame_rate 100]
+       [--latency 0.01] [--failures '{"open": ["error", "ok", "hang"]}']
+"""
+import argparse
+import json
+import logging
+from logging import getLogger
+
+import bottle
+
+from detector_integration_api import config
+from detector_integration_api.simulation.simulated_service import SimulatedService, get_frame_count, \
+    make_simulator_server
+
+_logger = getLogger(__name__)
+
+
+class BackendSimulator(SimulatedService):
+    """
+    Backend with the global states INITIALIZED, CONFIGURED, OPEN and CLOSED. While the backend is open, the
+    received and sent frames grow with the frame rate, up to the n_frames setting if it is given.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(BackendSimulator, self).__init__(*args, **kwargs)
+
+        self.state = "INITIALIZED"
+        self.settings = None
+        self.open_time = None
+        self.close_time = None
+
+    def restart(self):
+        _logger.info("Restarting simulated backend.")
+
+        self.state = "INITIALIZED"
+        self.settings = None
+        self.open_time = None
+        self.close_time = None
+
+    def configure(self, settings):
+        if self.state not in ("INITIALIZED", "CONFIGURED", "CLOSED"):
+            return "Cannot configure backend in state %s." % self.state
+
+        self.settings = settings
+        self.state = "CONFIGURED"
+
+        return self.state
+
+    def open(self):
+        if self.state != "CONFIGURED":
+            return "Cannot open backend in state %s." % self.state
+
+        self.open_time = self.clock()
+        self.close_time = None
+        self.state = "OPEN"
+
+        return self.state
+
+    def close(self):
+        if self.state == "OPEN":
+            self.close_time = self.clock()
+
+        self.state = "CLOSED"
+
+        return self.state
+
+    def reset(self):
+        self.restart()
+
+        return self.state
+
+    def get_metrics(self, names=None):
+        """
+        :param names: Names of the metrics to return, all metrics if None.
+        """
+        n_frames = (self.settings or {}).get("n_frames", 0)
+
+        if self.open_time is None:
+            received_frames = 0
+        else:
+            end_time = self.close_time if self.close_time is not None else self.clock()
+            received_frames = get_frame_count(end_time - self.open_time, self.frame_rate, n_frames)
+
+        metrics = {"received_frames": received_frames,
+                   "sent_frames": received_frames,
+                   "dropped_frames": 0,
+                   "global_state": self.state}
+
+        if names is not None:
+            metrics = {name: metrics[name] for name in names if name in metrics}
+
+        return metrics
+
+    def get_app(self):
+        app = bottle.Bottle()
+        prefix = config.BACKEND_URL_SUFFIX
+
+        @app.post(prefix + "/state/configure")
+        def configure():
+            settings = (bottle.request.json or {}).get("settings", {})
+            return self.respond("configure", lambda: self.configure(settings))
+
+        @app.post(prefix + "/state/open")
+        def open_backend():
+            return self.respond("open", self.open)
+
+        @app.post(prefix + "/state/close")
+        def close():
+            return self.respond("close", self.close)
+
+        @app.post(prefix + "/state/reset")
+        def reset():
+            return self.respond("reset", self.reset)
+
+        @app.get(prefix + "/state")
+        def get_state():
+            return self.respond("state", lambda: {"global_state": self.state})
+
+        @app.get(prefix + "/metrics")
+        def get_metrics():
+            names = bottle.request.query.get(config.BACKEND_METRICS_SELECTION_PARAMETER) \
+                if config.BACKEND_METRICS_SELECTION_PARAMETER else None
+
+            return self.respond("metrics",
+                                lambda: {"value": {"backend": self.get_metrics(names.split(",") if names else None)}})
+
+        self.register_simulation_routes(app)
+
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated detector backend.")
+    parser.add_argument("--interface", default="0.0.0.0", help="Hostname interface to bind to.")
+    parser.add_argument("--port", type=int, default=8080, help="Server port.")
+    parser.add_argument("--frame_rate", type=float, default=config.SIMULATOR_FRAME_RATE,
+                        help="Frames per second received while the backend is open.")
+    parser.add_argument("--latency", type=float, default=0, help="Delay in seconds before each response.")
+    parser.add_argument("--hang_time", type=float, default=config.SIMULATOR_HANG_TIME,
+                        help="Time a request with a scripted hang takes.")
+    parser.add_argument("--failures", type=json.loads, default=None,
+                        help="JSON dictionary of operation to the list of actions of its next requests.")
+    parser.add_argument("--log_level", default=config.DEFAULT_LOGGING_LEVEL,
+                        choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG'], help="Log level to use.")
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=arguments.log_level)
+
+    simulator = BackendSimulator(frame_rate=arguments.frame_rate, latency=arguments.latency,
+                                 failures=arguments.failures, hang_time=arguments.hang_time)
+
+    server = make_simulator_server(simulator.get_app(), arguments.interface, arguments.port)
+    _logger.info("Simulated backend listening on %s:%d.", arguments.interface, arguments.port)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
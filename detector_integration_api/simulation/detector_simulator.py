@@ -0,0 +1,76 @@
+"""
+Simulated detector, with the attributes and methods of the sls_detector detector used by the DetectorClient. Pass it
+to the client as DetectorClient(detector=DetectorSimulator()) to run the client without the detector hardware.
+"""
+from time import monotonic
+
+from detector_integration_api import config
+
+
+class DetectorSimulator(object):
+    """
+    Detector that is running from start_detector until stop_detector, or until it acquired n_frames * n_cycles frames
+    at the frame period. After a restart it does not answer while it boots, and its parameters are the defaults.
+    """
+
+    def __init__(self, clock=monotonic, boot_time=None):
+        """
+        :param boot_time: Time the detector does not answer after a restart, by default SIMULATOR_DETECTOR_BOOT_TIME.
+        """
+        self.clock = clock
+        self.boot_time = boot_time if boot_time is not None else config.SIMULATOR_DETECTOR_BOOT_TIME
+
+        self.boot_end_time = None
+        self._set_default_parameters()
+
+    def _set_default_parameters(self):
+        self.exposure_time = 0.001
+        self.n_frames = 1
+        self.n_cycles = 1
+        self.timing_mode = "auto"
+        self.period = 0.01
+        self.dynamic_range = 16
+        self.high_voltage = 0
+        self.settings = "dynamicgain"
+        self.power_chip = False
+        self.online = True
+
+        self.start_time = None
+
+    def _check_booted(self):
+        if self.boot_end_time is not None and self.clock() < self.boot_end_time:
+            raise RuntimeError("Simulated detector is not responding, it is booting after a restart.")
+
+    def restart(self):
+        """
+        Simulate a power cycle: the acquisition stops and the parameters are lost.
+        """
+        self._set_default_parameters()
+        self.boot_end_time = self.clock() + self.boot_time
+
+    @property
+    def status(self):
+        self._check_booted()
+
+        if self.start_time is None:
+            return "idle"
+
+        if self.clock() - self.start_time >= self.n_frames * self.n_cycles * self.period:
+            self.start_time = None
+            return "idle"
+
+        return "running"
+
+    def start_detector(self):
+        self._check_booted()
+        self.start_time = self.clock()
+
+    def stop_detector(self):
+        self._check_booted()
+        self.start_time = None
+
+    def free_shared_memory(self):
+        pass
+
+    def load_config(self, config_file):
+        pass
@@ -0,0 +1,339 @@
+"""
+Fault injection harness: inject delays, exceptions and wrong states in the clients of an IntegrationManager during an
+acquisition, and measure how long the manager takes to detect the fault (the status goes to ERROR or cannot be read)
+and to recover from it (a reset reaches INITIALIZED).
+"""
+from logging import getLogger
+from threading import Lock, Timer
+from time import monotonic, sleep
+
+from detector_integration_api import config, default_validator
+
+_logger = getLogger(__name__)
+
+FAULT_TYPES = ("delay", "hang", "exception", "garbage", "wrong_state", "restart")
+
+# Value returned by the faulted methods with the "garbage" fault.
+GARBAGE_VALUE = "\x00\x17<injected garbage>"
+
+# Time a hanging call blocks before failing, the time the real client waits before timing out.
+HANG_TIMEOUTS = {"backend": config.BACKEND_COMMUNICATION_TIMEOUT,
+                 "writer": config.EXTERNAL_PROCESS_COMMUNICATION_TIMEOUT * config.EXTERNAL_PROCESS_RETRY_N,
+                 "detector": config.COMPONENT_RESET_TIMEOUTS["detector"]}
+
+
+def get_detector_restart(detector_client):
+    # Stopping the detector is the legitimate DETECTOR_STOPPED state, only the simulated detector can be power cycled.
+    if not hasattr(getattr(detector_client, "detector", None), "restart"):
+        raise ValueError("The detector restart fault needs a DetectorClient with a DetectorSimulator.")
+
+    return detector_client.detector.restart
+
+
+# Functions returning the method that brings each component back to its initial state, called by the "restart" fault.
+RESTART_METHODS = {"backend": lambda client: client.reset,
+                   "writer": lambda client: client.reset,
+                   "detector": get_detector_restart}
+
+ACQUISITION_CONFIG = {"writer": {"output_file": "/tmp/fault_injection.h5", "n_frames": 1000000, "user_id": -1},
+                      "backend": {"bit_depth": 16, "n_frames": 1000000},
+                      "detector": {"period": 0.001, "frames": 1000000, "exptime": 0.0001, "dr": 16, "timing": "auto"}}
+
+
+class InjectedFault(Exception):
+    pass
+
+
+class Fault(object):
+    """
+    Fault of one component, active from start_time seconds after the injection started, for duration seconds.
+    """
+
+    def __init__(self, name, component, fault_type, value=None, methods=None, start_time=0, duration=None):
+        """
+        :param component: "backend", "writer" or "detector".
+        :param fault_type: One of FAULT_TYPES.
+        :param value: Delay of the "delay" fault, time until the "hang" fault fails (by default the component
+        timeout in HANG_TIMEOUTS), status returned by the "wrong_state" fault.
+        :param methods: Names of the faulted methods. By default all methods, or only get_status for the "garbage"
+        and "wrong_state" faults.
+        :param duration: Time the fault stays active. None to keep it active until it is detected.
+        """
+        if fault_type not in FAULT_TYPES:
+            raise ValueError("Unknown fault type '%s'. Available types: %s." % (fault_type, ", ".join(FAULT_TYPES)))
+
+        if fault_type == "wrong_state" and value is None:
+            raise ValueError("Fault '%s' needs the wrong state to return as value." % name)
+
+        if fault_type == "hang" and value is None:
+            value = HANG_TIMEOUTS[component]
+
+        if methods is None and fault_type in ("garbage", "wrong_state"):
+            methods = ("get_status",)
+
+        self.name = name
+        self.component = component
+        self.fault_type = fault_type
+        self.value = value
+        self.methods = methods
+        self.start_time = start_time
+        self.duration = duration
+
+    def applies_to(self, method_name):
+        return self.methods is None or method_name in self.methods
+
+    def call(self, method_name, method, args, kwargs):
+        """
+        Call the method of the component with the fault applied.
+        """
+        if self.fault_type == "delay":
+            sleep(self.value)
+
+        elif self.fault_type == "hang":
+            sleep(self.value)
+            raise TimeoutError("Injected fault '%s': %s.%s timed out." % (self.name, self.component, method_name))
+
+        elif self.fault_type == "exception":
+            raise InjectedFault("Injected fault '%s' in %s.%s." % (self.name, self.component, method_name))
+
+        elif self.fault_type == "garbage":
+            return GARBAGE_VALUE
+
+        elif self.fault_type == "wrong_state":
+            return self.value
+
+        return method(*args, **kwargs)
+
+
+class FaultInjector(object):
+    """
+    Wrap the public methods of the component clients, so the active faults are applied to their calls. The wrappers
+    are set on the client instances, because the IntegrationManager accesses the clients through the
+    ClientDisableWrapper, which reads the attributes of the client object directly.
+    """
+
+    def __init__(self, clients, clock=monotonic):
+        """
+        :param clients: Dictionary of component name to client.
+        """
+        self.clients = clients
+        self.clock = clock
+
+        self.faults = []
+        self.injection_time = None
+        self.timers = []
+        self.lock = Lock()
+
+    def install(self):
+        for component, client in self.clients.items():
+            for method_name in dir(client):
+                if method_name.startswith("_"):
+                    continue
+
+                method = getattr(client, method_name)
+                if callable(method):
+                    setattr(client, method_name, self._wrap(component, method_name, method))
+
+    def uninstall(self):
+        self.clear()
+
+        for client in self.clients.values():
+            for method_name in [name for name in vars(client) if getattr(vars(client)[name], "fault_wrapper", False)]:
+                delattr(client, method_name)
+
+    def _wrap(self, component, method_name, method):
+
+        def faulted_method(*args, **kwargs):
+            fault = self.get_active_fault(component, method_name)
+
+            if fault is None:
+                return method(*args, **kwargs)
+
+            return fault.call(method_name, method, args, kwargs)
+
+        faulted_method.fault_wrapper = True
+
+        return faulted_method
+
+    def inject(self, faults):
+        """
+        Start the schedule of the faults, their start times are relative to now.
+        :return: Injection time, on the injector clock.
+        """
+        with self.lock:
+            self.faults = list(faults)
+            self.injection_time = self.clock()
+
+        for fault in faults:
+            if fault.fault_type == "restart":
+                # The component loses its state, as if it was restarted, without DIA being told.
+                restart = RESTART_METHODS[fault.component](self.clients[fault.component])
+
+                timer = Timer(fault.start_time, restart)
+                timer.daemon = True
+                timer.start()
+                self.timers.append(timer)
+
+        _logger.info("Injecting faults %s.", [fault.name for fault in faults])
+
+        return self.injection_time
+
+    def clear(self):
+        with self.lock:
+            self.faults = []
+
+        for timer in self.timers:
+            timer.cancel()
+        self.timers = []
+
+    def get_active_fault(self, component, method_name):
+        with self.lock:
+            if not self.faults:
+                return None
+
+            elapsed_time = self.clock() - self.injection_time
+
+            for fault in self.faults:
+                if fault.component != component or fault.fault_type == "restart" or \
+                        not fault.applies_to(method_name) or elapsed_time < fault.start_time:
+                    continue
+
+                if fault.duration is None or elapsed_time < fault.start_time + fault.duration:
+                    return fault
+
+        return None
+
+
+def wait_for_detection(manager, timeout, polling_interval):
+    """
+    :return: Tuple (detection time, detected status), (None, last status) if the fault was not detected.
+    """
+    integration_status = default_validator.IntegrationStatus
+
+    end_time = monotonic() + timeout
+    status = None
+
+    while monotonic() < end_time:
+        try:
+            status = manager.get_acquisition_status()
+        except Exception as e:
+            _logger.debug("Status request failed: %s", e)
+            return monotonic(), "status request failed"
+
+        if status == integration_status.ERROR:
+            return monotonic(), str(status)
+
+        sleep(polling_interval)
+
+    return None, str(status)
+
+
+def wait_for_recovery(manager, timeout, polling_interval):
+    """
+    :return: Tuple (recovery time, number of reset attempts, last error), recovery time is None if not recovered.
+    """
+    integration_status = default_validator.IntegrationStatus
+
+    end_time = monotonic() + timeout
+    n_attempts = 0
+    error = None
+
+    while monotonic() < end_time:
+        n_attempts += 1
+
+        try:
+            if manager.reset() == integration_status.INITIALIZED:
+                return monotonic(), n_attempts, None
+        except Exception as e:
+            error = str(e)
+            _logger.debug("Reset attempt %d failed: %s", n_attempts, e)
+
+        sleep(polling_interval)
+
+    return None, n_attempts, error
+
+
+def measure_recovery(manager_module, fault, get_clients, detection_timeout=60, recovery_timeout=60,
+                     polling_interval=0.05):
+    """
+    Start an acquisition, inject the fault and measure the time to detect it and to recover from it.
+    :param manager_module: Module with the IntegrationManager to test.
+    :param get_clients: Function returning a new dictionary of backend, writer and detector clients.
+    :return: Dictionary with the fault, the detected status, time_to_detect (from the fault start), time_to_recover
+    (from the detection), number of reset attempts and the last reset error. Times are None if the fault was not
+    detected or the manager did not recover.
+    """
+    clients = get_clients()
+    injector = FaultInjector(clients)
+    injector.install()
+
+    manager = manager_module.IntegrationManager(backend_client=clients["backend"], writer_client=clients["writer"],
+                                                detector_client=clients["detector"])
+
+    result = {"fault": fault.name,
+              "component": fault.component,
+              "fault_type": fault.fault_type,
+              "detected_status": None,
+              "time_to_detect": None,
+              "time_to_recover": None,
+              "n_reset_attempts": 0,
+              "error": None}
+
+    try:
+        manager.set_acquisition_config(ACQUISITION_CONFIG)
+        manager.start_acquisition()
+
+        fault_time = injector.inject([fault]) + fault.start_time
+
+        detection_time, result["detected_status"] = wait_for_detection(manager, fault.start_time + detection_timeout,
+                                                                        polling_interval)
+
+        if detection_time is None:
+            _logger.warning("Fault %s was not detected in %s seconds.", fault.name, detection_timeout)
+            detection_time = monotonic()
+        else:
+            result["time_to_detect"] = max(detection_time - fault_time, 0)
+
+        # Faults without duration end as soon as they are detected, only the recovery of DIA is measured.
+        if fault.duration is None:
+            injector.clear()
+
+        recovery_time, result["n_reset_attempts"], result["error"] = wait_for_recovery(manager, recovery_timeout,
+                                                                                       polling_interval)
+
+        if recovery_time is not None:
+            result["time_to_recover"] = recovery_time - detection_time
+
+    finally:
+        injector.uninstall()
+
+        # Do not leave external processes running after a failed recovery.
+        if result["time_to_recover"] is None:
+            try:
+                manager.kill()
+            except Exception as e:
+                _logger.error("Cannot kill the components after fault %s: %s", fault.name, e)
+
+    return result
+
+
+def format_results_table(results):
+    """
+    :return: The results of measure_recovery as a text table.
+    """
+    def format_time(value):
+        return "%.3f" % value if value is not None else "-"
+
+    header = ("fault", "component", "type", "detected as", "detect [s]", "recover [s]", "resets")
+    rows = [(result["fault"], result["component"], result["fault_type"], str(result["detected_status"]),
+             format_time(result["time_to_detect"]), format_time(result["time_to_recover"]),
+             str(result["n_reset_attempts"]))
+            for result in results]
+
+    widths = [max(len(row[index]) for row in [header] + rows) for index in range(len(header))]
+
+    lines = ["  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+             for row in [header] + rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+
+    return "\n".join(lines)
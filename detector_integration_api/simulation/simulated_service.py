@@ -0,0 +1,203 @@
+from logging import getLogger
+from socketserver import ThreadingMixIn
+from threading import Lock
+from time import sleep, monotonic
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+import bottle
+
+from detector_integration_api import config
+
+_logger = getLogger(__name__)
+
+# Actions a scripted failure can take when a simulated service answers a request.
+FAILURE_ACTIONS = ("ok", "error", "hang", "garbage", "restart")
+
+# Body of the responses with the scripted "garbage" action.
+GARBAGE_RESPONSE = "\x00\x17<simulated garbage>"
+
+
+def get_frame_count(elapsed_time, frame_rate, n_frames=0):
+    """
+    :param n_frames: Number of frames of the acquisition, 0 if the acquisition is not limited.
+    :return: Number of frames received or written after elapsed_time at the given frame rate.
+    """
+    frame_count = int(max(elapsed_time, 0) * frame_rate)
+
+    if n_frames > 0:
+        frame_count = min(frame_count, n_frames)
+
+    return frame_count
+
+
+class ScriptedFailures(object):
+    """
+    Actions injected in the responses of a simulated service. The actions of each operation are consumed in order,
+    one per request, and the operation behaves normally once its script is empty.
+    """
+
+    def __init__(self, failures=None):
+        """
+        :param failures: Dictionary of operation name to list of actions, see FAILURE_ACTIONS.
+        """
+        self.failures = {}
+        self.lock = Lock()
+
+        for operation, actions in (failures or {}).items():
+            self.add(operation, actions)
+
+    def add(self, operation, actions):
+        if isinstance(actions, str):
+            actions = [actions]
+
+        for action in actions:
+            if action not in FAILURE_ACTIONS:
+                raise ValueError("Unknown failure action '%s' for operation '%s'. Available actions: %s."
+                                 % (action, operation, ", ".join(FAILURE_ACTIONS)))
+
+        with self.lock:
+            self.failures.setdefault(operation, []).extend(actions)
+
+    def next_action(self, operation):
+        with self.lock:
+            actions = self.failures.get(operation)
+
+            if not actions:
+                return "ok"
+
+            return actions.pop(0)
+
+    def clear(self):
+        with self.lock:
+            self.failures.clear()
+
+    def get_remaining(self):
+        with self.lock:
+            return {operation: list(actions) for operation, actions in self.failures.items() if actions}
+
+
+class SimulatedService(object):
+    """
+    Base of the simulated components: response latency, frame rate driven counters and scripted failures, which
+    can be changed while the service runs with the /simulation control endpoint.
+    """
+
+    def __init__(self, frame_rate=None, latency=0, failures=None, hang_time=None, clock=monotonic):
+        """
+        :param frame_rate: Frames per second of the simulated acquisition, by default SIMULATOR_FRAME_RATE.
+        :param latency: Delay in seconds before each response, or a dictionary with the delay of each operation.
+        :param failures: Scripted failures, see ScriptedFailures.
+        :param hang_time: Time a request with the "hang" action takes, by default SIMULATOR_HANG_TIME.
+        """
+        self.frame_rate = frame_rate if frame_rate is not None else config.SIMULATOR_FRAME_RATE
+        self.latency = latency
+        self.failures = ScriptedFailures(failures)
+        self.hang_time = hang_time if hang_time is not None else config.SIMULATOR_HANG_TIME
+        self.clock = clock
+
+        self.n_requests = {}
+        self.lock = Lock()
+
+    def get_latency(self, operation):
+        if isinstance(self.latency, dict):
+            return self.latency.get(operation, 0)
+
+        return self.latency
+
+    def restart(self):
+        """
+        Simulate a restart of the service. The subclasses reset their state.
+        """
+        raise NotImplementedError()
+
+    def respond(self, operation, handler):
+        """
+        Answer a request of the operation with the handler, after the latency and the scripted failure.
+        """
+        with self.lock:
+            self.n_requests[operation] = self.n_requests.get(operation, 0) + 1
+
+        latency = self.get_latency(operation)
+        if latency > 0:
+            sleep(latency)
+
+        action = self.failures.next_action(operation)
+
+        if action != "ok":
+            _logger.info("Simulating '%s' on operation '%s'.", action, operation)
+
+        if action == "error":
+            bottle.abort(500, "Simulated failure of operation '%s'." % operation)
+
+        elif action == "hang":
+            sleep(self.hang_time)
+
+        elif action == "garbage":
+            bottle.response.content_type = "application/octet-stream"
+            return GARBAGE_RESPONSE
+
+        elif action == "restart":
+            self.restart()
+
+        return handler()
+
+    def get_simulation_status(self):
+        return {"frame_rate": self.frame_rate,
+                "latency": self.latency,
+                "hang_time": self.hang_time,
+                "failures": self.failures.get_remaining(),
+                "n_requests": dict(self.n_requests)}
+
+    def update_simulation(self, options):
+        """
+        :param options: Dictionary with the new frame_rate, latency or hang_time, and failures to add.
+        """
+        unknown_options = set(options) - {"frame_rate", "latency", "hang_time", "failures"}
+        if unknown_options:
+            raise ValueError("Unknown simulation options: %s." % ", ".join(sorted(unknown_options)))
+
+        for operation, actions in options.get("failures", {}).items():
+            self.failures.add(operation, actions)
+
+        self.frame_rate = options.get("frame_rate", self.frame_rate)
+        self.latency = options.get("latency", self.latency)
+        self.hang_time = options.get("hang_time", self.hang_time)
+
+    def register_simulation_routes(self, app):
+
+        @app.get("/simulation")
+        def get_simulation():
+            return self.get_simulation_status()
+
+        @app.post("/simulation")
+        def update_simulation():
+            try:
+                self.update_simulation(bottle.request.json or {})
+            except ValueError as e:
+                bottle.abort(400, str(e))
+
+            return self.get_simulation_status()
+
+        @app.delete("/simulation/failures")
+        def clear_failures():
+            self.failures.clear()
+            return self.get_simulation_status()
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """
+    WSGI server answering each request in its own thread, so a hanging request does not block the others.
+    """
+    daemon_threads = True
+
+
+class SimulatorRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        _logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_simulator_server(app, host, port, handler_class=SimulatorRequestHandler):
+    """
+    :return: Server of the simulator app. Run it with serve_forever, stop it with shutdown.
+    """
+    return make_server(host, port, app, server_class=ThreadingWSGIServer, handler_class=handler_class)
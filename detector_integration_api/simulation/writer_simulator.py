@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+Simulated writer process, implementing the REST interface used by the CppWriterClient. The client starts it with the
+writer arguments, so the simulation options are read from the DIA_WRITER_SIMULATOR_OPTIONS environment variable, a
+JSON dictionary with frame_rate, latency, hang_time and failures. If the DIA_CALLBACK_URL environment variable is
+set, the status changes and statistics are pushed to it.
+
+Usage: writer_simulator.py stream_url output_file n_frames port user_id
+"""
+import json
+import os
+import sys
+from threading import Thread, Event
+from queue import Queue
+
+if not __package__:
+    # Executed directly by the writer client: import the package from this source tree if it is not installed.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import bottle
+import requests
+
+from detector_integration_api import config
+from detector_integration_api.simulation.simulated_service import SimulatedService, SimulatorRequestHandler, \
+    get_frame_count, make_simulator_server
+
+# Interval between two statistics pushes.
+PUSH_INTERVAL = 0.1
+
+
+class WriterSimulator(SimulatedService):
+    """
+    Writer that starts writing when it receives its parameters. The written frames grow with the frame rate, up to
+    n_frames if it is not 0. The process exits after a stop or kill request, and crashes on a scripted restart.
+    """
+
+    def __init__(self, n_frames, callback_url=None, *args, **kwargs):
+        super(WriterSimulator, self).__init__(*args, **kwargs)
+
+        self.n_frames = n_frames
+        self.callback_url = callback_url
+
+        self.status = "receiving"
+        self.parameters = None
+        self.write_start_time = None
+        self.write_end_time = None
+
+        self.exit_requested = Event()
+
+        # Pushes are sent in order by a separate thread, so they never delay the REST responses.
+        self.push_queue = Queue()
+
+    def restart(self):
+        # A writer process cannot restart itself, it crashes without answering and the client has to start it again.
+        print("Simulating writer crash.", flush=True)
+        os._exit(1)
+
+    def push(self, values):
+        if self.callback_url is not None:
+            self.push_queue.put(values)
+
+    def send_pushed_values(self):
+        while True:
+            values = self.push_queue.get()
+
+            if values is None:
+                return
+
+            try:
+                requests.post(self.callback_url, json=values, timeout=1)
+            except Exception as e:
+                print("Cannot push values to %s: %s" % (self.callback_url, e), flush=True)
+
+    def push_statistics(self):
+        while not self.exit_requested.wait(PUSH_INTERVAL):
+            self.push({"statistics": self.get_statistics()})
+
+    def set_status(self, status):
+        self.status = status
+        self.push({"status": status})
+
+    def set_parameters(self, parameters):
+        self.parameters = parameters
+        self.write_start_time = self.clock()
+        self.set_status("writing")
+
+        return {"status": "ok"}
+
+    def stop(self):
+        if self.write_start_time is not None:
+            self.write_end_time = self.clock()
+
+        self.set_status("stopped")
+        self.exit_requested.set()
+
+        return {"status": "ok"}
+
+    def get_statistics(self):
+        if self.write_start_time is None:
+            n_written_frames = 0
+        else:
+            end_time = self.write_end_time if self.write_end_time is not None else self.clock()
+            n_written_frames = get_frame_count(end_time - self.write_start_time, self.frame_rate, self.n_frames)
+
+        return {"n_written_frames": n_written_frames,
+                "n_frames": self.n_frames}
+
+    def get_app(self):
+        app = bottle.Bottle()
+
+        @app.post("/parameters")
+        def set_parameters():
+            parameters = bottle.request.json or {}
+            return self.respond("parameters", lambda: self.set_parameters(parameters))
+
+        @app.get("/status")
+        def get_status():
+            return self.respond("status", lambda: {"status": self.status})
+
+        @app.get("/statistics")
+        def get_statistics():
+            return self.respond("statistics", self.get_statistics)
+
+        @app.get("/stop")
+        def stop():
+            return self.respond("stop", self.stop)
+
+        @app.get("/kill")
+        def kill():
+            return self.respond("kill", self.stop)
+
+        self.register_simulation_routes(app)
+
+        return app
+
+
+def get_request_handler(writer, response_sent):
+
+    class WriterRequestHandler(SimulatorRequestHandler):
+        def handle(self):
+            super(WriterRequestHandler, self).handle()
+
+            # The process exits only after the response to the stop or kill request was sent.
+            if writer.exit_requested.is_set():
+                response_sent.set()
+
+        def log_message(self, format, *args):
+            print(format % args, flush=True)
+
+    return WriterRequestHandler
+
+
+def main():
+    stream_url, output_file, n_frames, port, user_id = sys.argv[1:6]
+
+    options = json.loads(os.environ.get(config.WRITER_SIMULATOR_OPTIONS_ENV_VARIABLE) or "{}")
+
+    writer = WriterSimulator(int(n_frames), os.environ.get(config.WRITER_CALLBACK_URL_ENV_VARIABLE),
+                             frame_rate=options.get("frame_rate"), latency=options.get("latency", 0),
+                             failures=options.get("failures"), hang_time=options.get("hang_time"))
+    response_sent = Event()
+
+    server = make_simulator_server(writer.get_app(), "localhost", int(port),
+                                   handler_class=get_request_handler(writer, response_sent))
+    Thread(target=server.serve_forever, daemon=True).start()
+    Thread(target=writer.push_statistics, daemon=True).start()
+
+    push_thread = Thread(target=writer.send_pushed_values, daemon=True)
+    push_thread.start()
+
+    print("Simulated writer listening on port %s, stream %s, output file %s, user id %s, options %s."
+          % (port, stream_url, output_file, user_id, options), flush=True)
+
+    response_sent.wait()
+    server.shutdown()
+
+    writer.push_queue.put(None)
+    push_thread.join(timeout=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,46 @@
 import argparse
 import logging
+from time import time
 
-import bottle
 from detector_integration_api import config
-from detector_integration_api.debug import manager
-from detector_integration_api.rest_api.rest_server import register_rest_interface
-from tests.utils import MockBackendClient, MockDetectorClient, MockExternalProcessClient
+from detector_integration_api.common.logging_pipeline import setup_queue_logging
+from detector_integration_api.common.startup_profiler import StartupProfiler
+from detector_integration_api.common.tracing import setup_tracing
 
 _logger = logging.getLogger(__name__)
 
 
-def start_integration_server(host, port):
+def start_integration_server(host, port, profiler=None):
+    """
+    :param profiler: StartupProfiler to record the import times and the time to the first request.
+    """
+    profile_startup = profiler is not None
+    if not profile_startup:
+        profiler = StartupProfiler()
 
     _logger.info("Starting debug integration REST API.")
 
-    backend_client = MockBackendClient()
-    writer_client = MockExternalProcessClient()
-    detector_client = MockDetectorClient()
+    # The server dependencies are imported only when the server starts.
+    bottle = profiler.import_module("bottle")
+    manager = profiler.import_module("detector_integration_api.debug.manager")
+    rest_server = profiler.import_module("detector_integration_api.rest_api.rest_server")
+    mock_clients = profiler.import_module("tests.utils")
+
+    backend_client = mock_clients.MockBackendClient()
+    writer_client = mock_clients.MockExternalProcessClient()
+    detector_client = mock_clients.MockDetectorClient()
 
     integration_manager = manager.IntegrationManager(writer_client=writer_client,
                                                      backend_client=backend_client,
                                                      detector_client=detector_client)
 
     app = bottle.Bottle()
-    register_rest_interface(app=app, integration_manager=integration_manager)
+    rest_server.register_rest_interface(app=app, integration_manager=integration_manager)
+
+    if profile_startup:
+        profiler.install(app)
+        _logger.info("Server ready %.3f seconds after start, import times:\n%s",
+                     time() - profiler.start_time, profiler.get_report())
 
     try:
         bottle.run(app=app, host=host, port=port, debug=True)
@@ -32,6 +49,8 @@ def start_integration_server(host, port):
 
 
 def main():
+    profiler = StartupProfiler()
+
     parser = argparse.ArgumentParser(description='Rest API for beamline software')
     parser.add_argument('-i', '--interface', default=config.DEFAULT_SERVER_INTERFACE,
                         help="Hostname interface to bind to")
@@ -39,14 +58,24 @@ def main():
     parser.add_argument("--log_level", default=config.DEFAULT_LOGGING_LEVEL,
                         choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG'],
                         help="Log level to use.")
+    parser.add_argument("--profile_startup", action="store_true",
+                        help="Log the import times and the time to the first request.")
+    parser.add_argument("--trace_file", default=None,
+                        help="Record the request and component call spans in this file (Chrome trace format).")
 
     arguments = parser.parse_args()
 
     # Setup the logging level.
     logging.basicConfig(level=arguments.log_level, format='[%(levelname)s] %(message)s')
+    # Write the logs in a background thread, so that logging does not delay the requests.
+    setup_queue_logging()
+
+    if arguments.trace_file:
+        setup_tracing(arguments.trace_file)
 
     start_integration_server(host=arguments.interface,
-                             port=arguments.port)
+                             port=arguments.port,
+                             profiler=profiler if arguments.profile_startup else None)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import wraps
 from logging import getLogger
-from time import sleep
+from numbers import Number
+from time import sleep, time
 
 from detector_integration_api import config
 from detector_integration_api.common.client_disable_wrapper import ClientDisableWrapper
+from detector_integration_api.common.logging_pipeline import DEDUPLICATE
+from detector_integration_api.common.tracing import bind_context
 
 _logger = getLogger(__name__)
 
@@ -21,7 +26,7 @@ def try_catch(func, error_message_prefix):
 
 def compare_client_status(status, expected_value):
 
-    _logger.debug("Comparing status '%s' with expected status '%s'.", status, expected_value)
+    _logger.debug("Comparing status '%s' with expected status '%s'.", status, expected_value, extra=DEDUPLICATE)
 
     if status == ClientDisableWrapper.STATUS_DISABLED:
         return True
@@ -90,6 +95,181 @@ def check_for_target_status(get_status_function, desired_statuses):
                          (desired_statuses_text, status))
 
 
+def synchronized(method):
+    """
+    Execute the decorated method while holding the lock of the instance (self.lock).
+    """
+    @wraps(method)
+    def wrapped(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapped
+
+
+def execute_in_parallel(functions, timeout=None):
+    """
+    Execute the provided functions concurrently, one thread per function, in the context (trace id) of the caller.
+    :param functions: Dictionary {name: function}, functions are called without arguments.
+    :param timeout: Maximum time to wait for the functions, in seconds. Either one value for all functions or a
+    dictionary {name: timeout}. Functions that did not finish in time are reported with a TimeoutError, but they
+    cannot be interrupted and keep running in the background.
+    :return: Tuple (results, errors), both dictionaries keyed by the function name.
+    """
+    results = {}
+    errors = {}
+
+    if not functions:
+        return results, errors
+
+    if timeout is None:
+        with ThreadPoolExecutor(max_workers=len(functions)) as executor:
+            futures = {name: executor.submit(bind_context(function)) for name, function in functions.items()}
+
+        deadlines = {}
+
+    else:
+        executor = ThreadPoolExecutor(max_workers=len(functions))
+        futures = {name: executor.submit(bind_context(function)) for name, function in functions.items()}
+        # Do not wait for the functions that exceed their deadline.
+        executor.shutdown(wait=False)
+
+        if isinstance(timeout, Number):
+            timeout = {name: timeout for name in functions}
+
+        start_time = time()
+        deadlines = {name: start_time + timeout[name] for name in functions if name in timeout}
+
+    for name, future in futures.items():
+        try:
+            if name in deadlines:
+                results[name] = future.result(timeout=max(deadlines[name] - time(), 0))
+            else:
+                results[name] = future.result()
+        except TimeoutError:
+            errors[name] = TimeoutError("'%s' did not finish in the allowed time." % name)
+        except Exception as e:
+            errors[name] = e
+
+    return results, errors
+
+
+def execute_components_in_parallel(component_functions, timeouts):
+    """
+    Execute one function per component in parallel, and report the outcome of each one.
+    :param component_functions: Dictionary {component_name: function}.
+    :param timeouts: Dictionary {component_name: maximum execution time in seconds}.
+    :return: Tuple (report, errors). The report has for each component the execution time and the result or the
+    error. Errors are keyed by the component name.
+    """
+    start_time = time()
+    end_times = {}
+
+    def timed(name, function):
+        def timed_function():
+            try:
+                return function()
+            finally:
+                end_times[name] = time()
+
+        return timed_function
+
+    results, errors = execute_in_parallel({name: timed(name, function)
+                                           for name, function in component_functions.items()},
+                                          timeout={name: timeouts[name]
+                                                   for name in component_functions if name in timeouts})
+
+    report = {}
+    for name in component_functions:
+        # Components that exceeded their deadline are still running.
+        report[name] = {"time": end_times.get(name, time()) - start_time}
+
+        if name in errors:
+            report[name]["error"] = str(errors[name])
+        else:
+            report[name]["result"] = results[name]
+
+    return report, errors
+
+
+def reset_components(component_resets, component_statuses, idle_statuses=None, timeouts=None, skip_functions=None):
+    """
+    Reset in parallel the components that are not idle.
+    :param component_resets: Dictionary {component_name: reset_function}.
+    :param component_statuses: Dictionary {component_name: status}, taken before the reset. Components with unknown
+    (None) status are always reset.
+    :param idle_statuses: Dictionary {component_name: statuses that do not need a reset}.
+    :param timeouts: Dictionary {component_name: maximum reset time in seconds}.
+    :param skip_functions: Dictionary {component_name: function}, called instead of the reset when the component is
+    skipped. Used to clear the client state that the reset would have cleared.
+    :return: Tuple (report, errors). The report has for each component the status, the action ("skipped", "reset" or
+    "failed") and the reset time. Errors are keyed by the component name.
+    """
+    if idle_statuses is None:
+        idle_statuses = config.COMPONENT_IDLE_STATUSES
+
+    if timeouts is None:
+        timeouts = config.COMPONENT_RESET_TIMEOUTS
+
+    report = {}
+    functions = {}
+
+    for name, reset_function in component_resets.items():
+        status = component_statuses.get(name)
+        report[name] = {"status": status, "action": "skipped", "time": 0}
+
+        if status == ClientDisableWrapper.STATUS_DISABLED or status in idle_statuses.get(name, ()):
+            if skip_functions and name in skip_functions:
+                skip_functions[name]()
+
+            continue
+
+        functions[name] = reset_function
+
+    execution_report, errors = execute_components_in_parallel(functions, timeouts)
+
+    for name, execution in execution_report.items():
+        report[name]["time"] = execution["time"]
+        report[name]["action"] = "failed" if name in errors else "reset"
+
+        if name in errors:
+            report[name]["error"] = execution["error"]
+
+    _logger.info("Components reset: %s", ", ".join("%s %s (%.3f s)" % (name, values["action"], values["time"])
+                                                  for name, values in sorted(report.items())))
+
+    return report, errors
+
+
+def kill_components(component_kills, timeout=None):
+    """
+    Kill all components in parallel, and return within timeout seconds even if some components do not respond.
+    :param component_kills: Dictionary {component_name: kill_function}.
+    :param timeout: Maximum time for the kill, by default config.KILL_TIMEOUT.
+    :return: Report with, for each component, the action ("killed", "failed" or "timeout"), the kill time, and the
+    result or error of the kill function.
+    """
+    if timeout is None:
+        timeout = config.KILL_TIMEOUT
+
+    _logger.warning("Killing components %s with a deadline of %.1f seconds.", sorted(component_kills), timeout)
+
+    report, errors = execute_components_in_parallel(component_kills, {name: timeout for name in component_kills})
+
+    for name, component_report in report.items():
+        if name not in errors:
+            component_report["action"] = "killed"
+        elif isinstance(errors[name], TimeoutError):
+            component_report["action"] = "timeout"
+        else:
+            component_report["action"] = "failed"
+
+    _logger.warning("Components kill: %s", ", ".join("%s %s (%.3f s)" % (name, values["action"], values["time"])
+                                                     for name, values in sorted(report.items())))
+
+    return report
+
+
 def turn_off_requests_logging():
     _logger.info("Disabling logging on Requests.")
 
@@ -17,6 +17,7 @@ setup(name="detector_integration_api",
                 'detector_integration_api.common',
                 'detector_integration_api.debug',
                 'detector_integration_api.rest_api',
+                'detector_integration_api.simulation',
                 'detector_integration_api.tests'],
 
       include_package_data=True
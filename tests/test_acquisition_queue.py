@@ -0,0 +1,155 @@
+import unittest
+from threading import Thread, Event
+from time import sleep, time
+
+from detector_integration_api import default_manager
+from detector_integration_api.common.acquisition_queue import AcquisitionQueue, merge_config_delta, \
+    get_config_section_delta
+from tests.utils import get_test_integration_manager
+
+
+class TestAcquisitionQueue(unittest.TestCase):
+    def setUp(self):
+        self.manager = get_test_integration_manager(default_manager)
+
+        self.manager.set_acquisition_config({
+            "writer": {"output_file": "/tmp/test.h5", "n_frames": 10, "user_id": -1},
+            "backend": {"bit_depth": 16},
+            "detector": {"period": 0.1, "frames": 10, "dr": 16, "timing": "auto"}})
+
+        # Simulate acquisitions that finish by themselves.
+        self.finish_acquisitions = Event()
+        self.finish_acquisitions.set()
+        self.stop_simulation = Event()
+
+        def simulate_acquisitions():
+            while not self.stop_simulation.is_set():
+                if self.finish_acquisitions.is_set() and self.manager.writer_client.status == "writing":
+                    self.manager.detector_client.status = "idle"
+                    self.manager.writer_client.status = "stopped"
+                sleep(0.01)
+
+        self.simulation_thread = Thread(target=simulate_acquisitions, daemon=True)
+        self.simulation_thread.start()
+
+    def tearDown(self):
+        self.stop_simulation.set()
+        self.simulation_thread.join()
+
+    def wait_for_queue(self, timeout=5):
+        start_time = time()
+        while self.manager.acquisition_queue.is_running() and time() - start_time < timeout:
+            sleep(0.01)
+
+        return self.manager.get_acquisition_queue_status()
+
+    def test_config_delta(self):
+        base_config = {"writer": {"n_frames": 10}, "backend": {}, "detector": {"period": 0.1, "frames": 10}}
+
+        merged_config = merge_config_delta(base_config, {"detector": {"period": 0.2}})
+        self.assertEqual(merged_config["detector"]["period"], 0.2)
+        self.assertEqual(base_config["detector"]["period"], 0.1)
+
+        with self.assertRaisesRegex(ValueError, "Unknown config section 'motor'"):
+            merge_config_delta(base_config, {"motor": {}})
+
+        self.assertDictEqual(get_config_section_delta(base_config["detector"], merged_config["detector"]),
+                             {"period": 0.2})
+
+    def test_queue(self):
+        self.manager.submit_acquisition_queue([{},
+                                               {"detector": {"period": 0.2}},
+                                               {"writer": {"output_file": "/tmp/test_2.h5"}}])
+
+        queue_status = self.wait_for_queue()
+
+        self.assertEqual(queue_status["state"], AcquisitionQueue.STATE_FINISHED)
+        self.assertEqual(queue_status["completed_points"], 3)
+        self.assertEqual(len(queue_status["point_timings"]), 3)
+
+        self.assertEqual(self.manager.detector_client.config["period"], 0.2)
+        # The writer parameters are cleared by the reset after the last point, the config is kept.
+        self.assertEqual(self.manager.get_acquisition_config()["writer"]["output_file"], "/tmp/test_2.h5")
+        self.assertIsNone(self.manager.writer_client.config)
+
+    def test_invalid_point(self):
+        self.manager.submit_acquisition_queue([{}, {"backend": {"bit_depth": 32}}])
+
+        queue_status = self.wait_for_queue()
+
+        self.assertEqual(queue_status["state"], AcquisitionQueue.STATE_ERROR)
+        self.assertEqual(queue_status["completed_points"], 1)
+        self.assertTrue("bit_depth" in queue_status["error"])
+
+    def test_cancel(self):
+        self.finish_acquisitions.clear()
+
+        self.manager.submit_acquisition_queue([{}, {}])
+
+        with self.assertRaisesRegex(ValueError, "already running"):
+            self.manager.submit_acquisition_queue([{}])
+
+        sleep(0.1)
+        self.manager.cancel_acquisition_queue()
+
+        queue_status = self.wait_for_queue()
+
+        self.assertEqual(queue_status["state"], AcquisitionQueue.STATE_CANCELLED)
+        self.assertEqual(queue_status["completed_points"], 0)
+        self.assertEqual(self.manager.writer_client.status, "stopped")
+
+    def test_point_timeout(self):
+        self.finish_acquisitions.clear()
+        self.manager.acquisition_queue.point_timeout = 0.2
+
+        self.manager.submit_acquisition_queue([{}])
+
+        queue_status = self.wait_for_queue()
+
+        self.assertEqual(queue_status["state"], AcquisitionQueue.STATE_ERROR)
+        self.assertIn("did not end", queue_status["error"])
+
+    def test_external_reset(self):
+        self.finish_acquisitions.clear()
+
+        self.manager.submit_acquisition_queue([{}, {}])
+        sleep(0.1)
+
+        # The queue continues with the next point when the acquisition is ended from outside.
+        self.manager.reset()
+        self.finish_acquisitions.set()
+
+        queue_status = self.wait_for_queue()
+
+        self.assertEqual(queue_status["state"], AcquisitionQueue.STATE_FINISHED)
+        self.assertEqual(queue_status["completed_points"], 2)
+
+    def test_start_parameters(self):
+        self.manager.submit_acquisition_queue([{}], parameters={"trigger_start": True,
+                                                                "writer": {"output_file": "/tmp/test_3.h5"}})
+
+        self.assertEqual(self.wait_for_queue()["state"], AcquisitionQueue.STATE_FINISHED)
+        self.assertEqual(self.manager.get_acquisition_config()["writer"]["output_file"], "/tmp/test_3.h5")
+
+        detector_configs = []
+        set_detector_config = self.manager.detector_client.set_config
+
+        def record_detector_config(configuration):
+            detector_configs.append(dict(configuration))
+            set_detector_config(configuration)
+
+        self.manager.detector_client.set_config = record_detector_config
+
+        points = [{}, {"detector": {"period": 0.2}}]
+        self.manager.submit_acquisition_queue(points, parameters={"detector": {"exptime": 0.01}})
+
+        self.assertEqual(self.wait_for_queue()["state"], AcquisitionQueue.STATE_FINISHED)
+
+        # The start parameters are part of the point configs, so only the detector delta is sent after the first point.
+        self.assertEqual(len(detector_configs), 2)
+        self.assertEqual(detector_configs[0]["exptime"], 0.01)
+        self.assertDictEqual(detector_configs[1], {"period": 0.2})
+        self.assertDictEqual(points[1], {"detector": {"period": 0.2}})
+
+        with self.assertRaisesRegex(ValueError, "Unknown start parameters"):
+            self.manager.start_acquisition(parameters={"n_frames": 10})
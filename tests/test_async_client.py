@@ -0,0 +1,99 @@
+import asyncio
+import os
+import signal
+import unittest
+from multiprocessing import Process
+from time import sleep
+
+import pytest
+
+# The asyncio client is optional, its tests are skipped without aiohttp.
+pytest.importorskip("aiohttp")
+
+from detector_integration_api import DetectorIntegrationClient
+from detector_integration_api.example import example_manager
+from detector_integration_api.rest_api.async_rest_client import AsyncDetectorIntegrationClient
+from tests.utils import start_test_integration_server
+
+
+class TestAsyncRestClient(unittest.TestCase):
+    def setUp(self):
+        self.host = "0.0.0.0"
+        self.port = 10000
+
+        self.dia_process = Process(target=start_test_integration_server, args=(self.host, self.port, example_manager))
+        self.dia_process.start()
+
+        # Give it some time to start.
+        sleep(1)
+
+    def tearDown(self):
+        self.dia_process.terminate()
+        sleep(0.5)
+
+        os.kill(self.dia_process.pid, signal.SIGINT)
+
+        # Wait for the server to die.
+        sleep(1)
+
+    def run_coroutine(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def test_method_surface(self):
+        sync_methods = {name for name in dir(DetectorIntegrationClient) if not name.startswith("_")}
+        async_methods = {name for name in dir(AsyncDetectorIntegrationClient) if not name.startswith("_")}
+
+        # ping has no route on the server.
+        self.assertSetEqual(sync_methods - async_methods, {"ping"})
+
+    def test_async_client(self):
+        detector_config = {"frames": 10000, "dr": 16, "period": 0.001, "exptime": 0.0001}
+        backend_config = {"n_frames": 10000, "bit_depth": 16}
+        writer_config = {"user_id": 16371, "output_file": "something", "n_frames": 10000}
+
+        configuration = {"detector": detector_config,
+                         "backend": backend_config,
+                         "writer": writer_config}
+
+        async def acquisition():
+            async with AsyncDetectorIntegrationClient() as client:
+                await client.reset()
+                await client.set_config(configuration)
+                await client.start()
+
+                await client.wait_for_status("IntegrationStatus.RUNNING", timeout=1)
+
+                with self.assertRaisesRegex(ValueError, "Timeout exceeded"):
+                    await client.wait_for_status("IntegrationStatus.FINISHED", timeout=0.5)
+
+                await client.stop()
+
+                return (await client.get_status())["status"]
+
+        self.assertEqual(self.run_coroutine(acquisition()), "IntegrationStatus.INITIALIZED")
+
+    def test_monitoring(self):
+
+        async def monitoring():
+            async with AsyncDetectorIntegrationClient() as client:
+                control_panel_info = await client.get_control_panel_info()
+
+                await client.set_profiler(True, sample_fraction=1, clear=True)
+                await client.get_status()
+                profiler = await client.set_profiler(False)
+                stacks = await client.get_profiler_stacks()
+
+                finalization = await client.wait_for_finalization(timeout=1)
+
+                return control_panel_info, profiler, stacks, finalization
+
+        control_panel_info, profiler, stacks, finalization = self.run_coroutine(monitoring())
+
+        self.assertIn("status", control_panel_info)
+        self.assertFalse(profiler["enabled"])
+        self.assertIsInstance(stacks, str)
+        self.assertIsNone(finalization)
@@ -0,0 +1,74 @@
+import unittest
+from threading import Thread
+from time import sleep
+from unittest.mock import patch
+
+import bottle
+
+from detector_integration_api import config
+from detector_integration_api.client.backend_rest_client import BackendClient
+from detector_integration_api.utils import execute_in_parallel
+
+
+class TestBackendClient(unittest.TestCase):
+    backend_port = 10040
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = bottle.Bottle()
+        cls.metrics_requests = []
+
+        @cls.app.get("/v1/metrics")
+        def get_metrics():
+            cls.metrics_requests.append(bottle.request.query.get("metrics"))
+            # Slow enough for concurrent requests to overlap.
+            sleep(0.1)
+
+            return {"value": {"backend": {"received_frames": 10, "sent_frames": 9, "missed_frames": 1}}}
+
+        @cls.app.post("/v1/state/reset")
+        def reset():
+            return "INITIALIZED"
+
+        Thread(target=bottle.run, kwargs={"app": cls.app, "host": "localhost", "port": cls.backend_port,
+                                          "quiet": True}, daemon=True).start()
+        sleep(0.5)
+
+    def setUp(self):
+        self.metrics_requests.clear()
+        self.client = BackendClient("http://localhost:%d" % self.backend_port)
+
+    @patch.object(config, "BACKEND_METRICS_SELECTION_PARAMETER", "metrics")
+    def test_metrics_selection(self):
+        self.assertDictEqual(self.client.get_metrics(), {"received_frames": 10, "sent_frames": 9})
+        self.assertEqual(self.metrics_requests, ["received_frames,sent_frames"])
+
+        # Cached subsets do not query the backend.
+        self.assertDictEqual(self.client.get_metrics(["sent_frames"]), {"sent_frames": 9})
+        self.assertEqual(len(self.metrics_requests), 1)
+
+        self.assertDictEqual(self.client.get_metrics([]), {"received_frames": 10, "sent_frames": 9,
+                                                           "missed_frames": 1})
+        self.assertEqual(self.metrics_requests[1], None)
+
+        self.client.reset()
+        self.client.get_metrics()
+        self.assertEqual(len(self.metrics_requests), 3)
+
+    def test_no_metrics_selection(self):
+        # By default the backend is not asked for a selection.
+        self.assertDictEqual(self.client.get_metrics(), {"received_frames": 10, "sent_frames": 9})
+        self.assertEqual(self.metrics_requests, [None])
+
+        self.assertDictEqual(self.client.get_metrics([]), {"received_frames": 10, "sent_frames": 9,
+                                                           "missed_frames": 1})
+        self.assertEqual(len(self.metrics_requests), 1)
+
+    def test_concurrent_requests(self):
+        results, errors = execute_in_parallel({index: self.client.get_metrics for index in range(5)})
+
+        self.assertEqual(errors, {})
+        self.assertTrue(all(result == {"received_frames": 10, "sent_frames": 9} for result in results.values()))
+
+        # Only one request reaches the backend.
+        self.assertEqual(len(self.metrics_requests), 1)
@@ -6,8 +6,11 @@ from threading import Thread
 from time import sleep, time
 
 import os
+import requests
 
 from detector_integration_api import DetectorIntegrationClient
+from detector_integration_api import config
+from detector_integration_api.config import ROUTES
 from detector_integration_api.example import example_manager
 from tests.utils import start_test_integration_server
 
@@ -274,6 +277,72 @@ class TestRestClient(unittest.TestCase):
         self.assertFalse(clients_enabled["backend"])
         self.assertFalse(clients_enabled["detector"])
 
+    def test_batch(self):
+        client = DetectorIntegrationClient()
+
+        detector_config = {"frames": 10000, "dr": 16, "period": 0.001, "exptime": 0.0001}
+        backend_config = {"n_frames": 10000, "bit_depth": 16}
+        writer_config = {"user_id": 16371, "output_file": "something", "n_frames": 10000}
+
+        configuration = {"detector": detector_config,
+                         "backend": backend_config,
+                         "writer": writer_config}
+
+        response = client.batch(["reset", ("set_config", configuration), "start"])
+
+        self.assertEqual(response["status"], "IntegrationStatus.RUNNING")
+        self.assertEqual([result["operation"] for result in response["results"]], ["reset", "set_config", "start"])
+        self.assertEqual(response["results"][1]["status"], "IntegrationStatus.CONFIGURED")
+        self.assertTrue(all("time" in result for result in response["results"]))
+
+        with self.assertRaisesRegex(Exception, "Batch operation 1 'start' failed"):
+            client.batch(["stop", "start", "reset"])
+
+        with self.assertRaisesRegex(Exception, "Unknown batch operations"):
+            client.batch(["reset", "not_an_operation"])
+
+    def test_msgpack_client(self):
+        client = DetectorIntegrationClient(use_msgpack=True)
+
+        client.reset()
+
+        self.assertEqual(client.get_status()["status"], "IntegrationStatus.INITIALIZED")
+        self.assertDictEqual(client.get_config()["config"], DetectorIntegrationClient().get_config()["config"])
+
+        # Errors are still reported in JSON.
+        with self.assertRaisesRegex(Exception, "Cannot start acquisition"):
+            client.start()
+
+    def test_conditional_get(self):
+        client = DetectorIntegrationClient()
+        client.reset()
+
+        config_url = client.api_address + ROUTES["get_config"]
+
+        etag = requests.get(config_url).headers["ETag"]
+        not_modified_response = requests.get(config_url, headers={"If-None-Match": etag})
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(not_modified_response.headers["Vary"], "Accept")
+
+        # The cached status is too old to answer without querying the components.
+        sleep(config.STATUS_CACHE_TIME + 0.1)
+        self.assertEqual(requests.get(config_url, headers={"If-None-Match": etag}).status_code, 200)
+
+        # The status did not change, so the ETag is valid again after a status query.
+        client.get_status()
+        self.assertEqual(requests.get(config_url, headers={"If-None-Match": etag}).status_code, 304)
+
+        server_config = client.get_config()
+        self.assertDictEqual(client.get_config(), server_config)
+
+        client.update_config({"detector": {"frames": 10000, "dr": 16, "period": 0.001, "exptime": 0.0001},
+                              "backend": {"n_frames": 10000, "bit_depth": 16},
+                              "writer": {"user_id": 16371, "output_file": "something", "n_frames": 10000}})
+
+        # The config changed, so the old ETag is not valid anymore.
+        self.assertEqual(requests.get(config_url, headers={"If-None-Match": etag}).status_code, 200)
+        self.assertEqual(client.get_config()["config"]["detector"]["frames"], 10000)
+
     def test_daq_test(self):
         client = DetectorIntegrationClient()
 
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+
+from detector_integration_api.client.detector_client import DetectorClient
+
+
+class FakeDetector(object):
+    """
+    Stand-in for the sls_detector detector, recording the commands sent to it.
+    """
+
+    def __init__(self):
+        self.commands = []
+
+        self.exposure_time = 0.001
+        self.n_frames = 1
+        self.status = "idle"
+        self.power_chip = False
+        self.high_voltage = 0
+
+    def __setattr__(self, name, value):
+        if name != "commands":
+            self.commands.append(name)
+
+        object.__setattr__(self, name, value)
+
+    def stop_detector(self):
+        self.commands.append("stop_detector")
+
+    def free_shared_memory(self):
+        self.commands.append("free_shared_memory")
+
+    def load_config(self, config_file):
+        self.commands.append("load_config")
+
+
+class TestDetectorClient(unittest.TestCase):
+    def setUp(self):
+        self.detector = FakeDetector()
+        self.client = DetectorClient(detector=self.detector)
+
+        self.config_file = tempfile.NamedTemporaryFile("w", suffix=".config", delete=False)
+        self.config_file.write("hostname jungfrau01\n")
+        self.config_file.close()
+
+    def tearDown(self):
+        os.remove(self.config_file.name)
+
+    def test_value_cache(self):
+        self.assertEqual(self.client.get_value("frames"), 1)
+
+        self.detector.n_frames = 10
+        self.assertEqual(self.client.get_value("frames"), 1)
+        self.assertEqual(self.client.get_value("frames", fresh=True), 10)
+
+        # The read back value is cached.
+        self.assertEqual(self.client.set_value("frames", 100), 100)
+        self.detector.n_frames = 5
+        self.assertEqual(self.client.get_value("frames"), 100)
+
+        # The status is never cached.
+        self.client.get_value("status")
+        self.detector.status = "running"
+        self.assertEqual(self.client.get_value("status"), "running")
+
+        self.client.initialise()
+        self.assertEqual(self.client.get_value("frames"), 5)
+
+    def test_bulk_values(self):
+        self.detector.commands.clear()
+
+        values, errors = self.client.set_values({"frames": 100, "exptime": 0.01, "unknown": 1})
+
+        self.assertDictEqual(values, {"frames": 100, "exptime": 0.01})
+        self.assertEqual(list(errors), ["unknown"])
+
+        # The detector is pinged only once.
+        self.assertEqual(self.detector.commands, ["online", "n_frames", "exposure_time"])
+
+        values, errors = self.client.get_values(["frames", "status", "unknown"], fresh=True)
+        self.assertDictEqual(values, {"frames": 100, "status": "idle"})
+        self.assertEqual(list(errors), ["unknown"])
+
+    def test_initialise(self):
+        report = self.client.initialise(self.config_file.name)
+
+        self.assertTrue(all(action == "executed" for action in report["steps"].values()))
+        self.assertTrue(self.detector.power_chip)
+        self.assertEqual(self.detector.high_voltage, 120)
+
+        # Nothing changed on the detector.
+        self.detector.commands.clear()
+        report = self.client.initialise(self.config_file.name)
+
+        self.assertEqual(self.detector.commands, ["stop_detector"])
+        self.assertDictEqual(report["steps"], {"stop_detector": "executed", "free_shared_memory": "skipped",
+                                               "load_config": "skipped", "power_chip": "skipped",
+                                               "high_voltage": "skipped"})
+        self.assertGreaterEqual(report["time_saved"], 0)
+
+        # The high voltage was changed.
+        self.detector.high_voltage = 0
+        report = self.client.initialise(self.config_file.name)
+        self.assertEqual(report["steps"]["high_voltage"], "executed")
+        self.assertEqual(report["steps"]["load_config"], "skipped")
+
+        # The config file was changed.
+        with open(self.config_file.name, "a") as config_file:
+            config_file.write("detsizechan 1024 512\n")
+
+        report = self.client.initialise(self.config_file.name)
+        self.assertEqual(report["steps"]["load_config"], "executed")
+        self.assertEqual(report["steps"]["power_chip"], "skipped")
+
+        report = self.client.initialise(self.config_file.name, force=True)
+        self.assertTrue(all(action == "executed" for action in report["steps"].values()))
+
+    def test_initialise_after_write(self):
+        self.client.initialise(self.config_file.name)
+
+        # Every write path can change what the config file set.
+        writes = [lambda: self.client.set_value("frames", 10),
+                  lambda: self.client.set_values({"exptime": 0.01}),
+                  lambda: self.client.set_config({"frames": 20})]
+
+        for write in writes:
+            write()
+
+            report = self.client.initialise(self.config_file.name)
+            self.assertEqual(report["steps"]["load_config"], "executed")
+            self.assertEqual(report["steps"]["free_shared_memory"], "executed")
+
+        # A write that fails might have changed the detector as well.
+        with self.assertRaisesRegex(RuntimeError, "Wrong parameters for setbit"):
+            self.client.set_value("setbit", "0x5d")
+
+        report = self.client.initialise(self.config_file.name)
+        self.assertEqual(report["steps"]["load_config"], "executed")
+
+        report = self.client.initialise(self.config_file.name)
+        self.assertEqual(report["steps"]["load_config"], "skipped")
@@ -0,0 +1,20 @@
+import unittest
+
+from detector_integration_api import default_manager
+from tests.utils import get_test_integration_manager
+
+
+class TestDetectorValues(unittest.TestCase):
+    def test_manager_values(self):
+        manager = get_test_integration_manager(default_manager)
+
+        # The mock detector client has no bulk access, the parameters are set one by one.
+        values, errors = manager.detector_client_set_values({"frames": 100, "period": 0.1})
+        self.assertDictEqual(values, {"frames": 100, "period": 0.1})
+        self.assertDictEqual(errors, {})
+
+        self.assertEqual(manager.detector_client_get_value("frames"), 100)
+
+        values, errors = manager.detector_client_get_values(["frames", "period", "exptime"], fresh=True)
+        self.assertDictEqual(values, {"frames": 100, "period": 0.1})
+        self.assertEqual(list(errors), ["exptime"])
@@ -0,0 +1,115 @@
+import unittest
+from types import SimpleNamespace
+
+from detector_integration_api import default_manager
+from detector_integration_api.client.detector_client import DetectorClient
+from detector_integration_api.simulation.fault_injection import Fault, FaultInjector, InjectedFault, \
+    measure_recovery, format_results_table, GARBAGE_VALUE
+from detector_integration_api.simulation.detector_simulator import DetectorSimulator
+from tests.utils import MockBackendClient, MockExternalProcessClient, MockDetectorClient, FakeClock
+
+
+def get_mock_clients():
+    return {"backend": MockBackendClient(),
+            "writer": MockExternalProcessClient(),
+            "detector": MockDetectorClient()}
+
+
+def get_simulated_detector_clients():
+    return {"backend": MockBackendClient(),
+            "writer": MockExternalProcessClient(),
+            "detector": DetectorClient(detector=DetectorSimulator(boot_time=0.2))}
+
+
+class FailingKillManager(default_manager.IntegrationManager):
+    def kill(self, timeout=None):
+        raise RuntimeError("Injected kill failure.")
+
+
+class TestFaultInjection(unittest.TestCase):
+
+    def test_fault_schedule(self):
+        clock = FakeClock()
+        backend_client = MockBackendClient()
+
+        injector = FaultInjector({"backend": backend_client}, clock=clock)
+        injector.install()
+
+        injector.inject([Fault("exception", "backend", "exception", methods=("open",), start_time=1, duration=2),
+                         Fault("garbage", "backend", "garbage", start_time=4)])
+
+        backend_client.open()
+
+        clock.advance(1)
+        with self.assertRaises(InjectedFault):
+            backend_client.open()
+        self.assertEqual(backend_client.get_status(), "OPEN")
+
+        clock.advance(3)
+        backend_client.open()
+        self.assertEqual(backend_client.get_status(), GARBAGE_VALUE)
+
+        injector.uninstall()
+        self.assertEqual(backend_client.get_status(), "OPEN")
+        self.assertNotIn("get_status", vars(backend_client))
+
+        with self.assertRaisesRegex(ValueError, "Unknown fault type"):
+            Fault("unknown", "backend", "explode")
+
+    def test_measure_recovery(self):
+        faults = [Fault("backend_exception", "backend", "exception"),
+                  Fault("backend_hang", "backend", "hang", value=0.2),
+                  Fault("writer_wrong_state", "writer", "wrong_state", value="stopped"),
+                  Fault("backend_restart", "backend", "restart", start_time=0.1),
+                  Fault("writer_exception_during_reset", "writer", "exception", duration=0.5)]
+
+        results = [measure_recovery(default_manager, fault, get_mock_clients, detection_timeout=2, recovery_timeout=2)
+                   for fault in faults]
+
+        for result in results:
+            self.assertIsNotNone(result["time_to_detect"], result)
+            self.assertIsNotNone(result["time_to_recover"], result)
+
+        self.assertEqual(results[0]["detected_status"], "status request failed")
+        self.assertGreaterEqual(results[1]["time_to_detect"], 0.2)
+        self.assertEqual(results[2]["detected_status"], "IntegrationStatus.ERROR")
+
+        # The writer keeps failing after the detection, so the first resets fail.
+        self.assertGreater(results[4]["n_reset_attempts"], 1)
+
+        table = format_results_table(results)
+        self.assertEqual(len(table.splitlines()), len(faults) + 2)
+        self.assertIn("backend_hang", table)
+
+    def test_detector_restart(self):
+        fault = Fault("detector_restart", "detector", "restart", start_time=0.1)
+
+        result = measure_recovery(default_manager, fault, get_simulated_detector_clients, detection_timeout=2,
+                                  recovery_timeout=2)
+
+        self.assertEqual(result["detected_status"], "status request failed")
+        self.assertIsNotNone(result["time_to_recover"], result)
+
+        # Stopping the mock detector would be the legitimate DETECTOR_STOPPED state, not a restart.
+        with self.assertRaisesRegex(ValueError, "DetectorSimulator"):
+            measure_recovery(default_manager, fault, get_mock_clients, detection_timeout=2, recovery_timeout=2)
+
+    def test_failing_kill(self):
+        # The writer keeps failing, so the manager does not recover and the components are killed.
+        fault = Fault("writer_exception", "writer", "exception", duration=10)
+
+        result = measure_recovery(SimpleNamespace(IntegrationManager=FailingKillManager), fault, get_mock_clients,
+                                  detection_timeout=1, recovery_timeout=0.2)
+
+        self.assertIsNotNone(result["time_to_detect"])
+        self.assertIsNone(result["time_to_recover"])
+        self.assertIn("Could not reset components writer", result["error"])
+
+    def test_undetected_fault(self):
+        result = measure_recovery(default_manager, Fault("backend_delay", "backend", "delay", value=0.01),
+                                  get_mock_clients, detection_timeout=0.2, recovery_timeout=2)
+
+        self.assertIsNone(result["time_to_detect"])
+        self.assertEqual(result["detected_status"], "IntegrationStatus.RUNNING")
+        self.assertIsNotNone(result["time_to_recover"])
+        self.assertIn(" - ", format_results_table([result]))
@@ -0,0 +1,172 @@
+import unittest
+from threading import Event
+from time import sleep, time
+
+from detector_integration_api import default_manager
+from detector_integration_api.common.jobs import Job, JobManager
+from detector_integration_api.default_validator import IntegrationStatus
+from tests.utils import get_test_integration_manager
+
+
+class TestJobs(unittest.TestCase):
+    def test_job_steps(self):
+        executed_steps = []
+
+        job = Job("test", [("first", lambda: executed_steps.append("first")),
+                           ("second", lambda: "result")])
+
+        self.assertEqual(job.get_info()["state"], "pending")
+        self.assertIsNone(job.get_info()["run_time"])
+
+        job.run()
+
+        job_info = job.get_info()
+        self.assertEqual(job_info["state"], "finished")
+        self.assertEqual(job_info["result"], "result")
+        self.assertEqual([step["name"] for step in job_info["steps"]], ["first", "second"])
+        self.assertTrue(all(step["state"] == "finished" and step["time"] >= 0 for step in job_info["steps"]))
+        self.assertEqual(executed_steps, ["first"])
+
+        def failing_step():
+            raise RuntimeError("Writer did not stop.")
+
+        job = Job("test", [("fail", failing_step), ("never", lambda: executed_steps.append("never"))])
+        job.run()
+
+        job_info = job.get_info()
+        self.assertEqual(job_info["state"], "failed")
+        self.assertEqual(job_info["error"], "Writer did not stop.")
+        self.assertEqual([step["state"] for step in job_info["steps"]], ["failed", "pending"])
+        self.assertEqual(executed_steps, ["first"])
+
+    def test_job_manager(self):
+        cleanups = []
+        job_manager = JobManager(on_cancel=lambda: cleanups.append("reset"))
+
+        executed_steps = []
+        step_started = Event()
+        step_released = Event()
+
+        def blocking_step():
+            step_started.set()
+            step_released.wait(timeout=5)
+            executed_steps.append("blocking")
+
+        first_job = job_manager.submit("first", [("blocking", blocking_step),
+                                                 ("after_blocking", lambda: executed_steps.append("after_blocking"))])
+        second_job = job_manager.submit("second", [("second", lambda: executed_steps.append("second"))])
+
+        self.assertTrue(step_started.wait(timeout=5))
+        self.assertEqual(job_manager.get_job(first_job.job_id).state, "running")
+        self.assertEqual(job_manager.get_job(second_job.job_id).state, "pending")
+
+        # The running step completes, the rest of the job is skipped.
+        job_manager.cancel_job(first_job.job_id)
+        # The second job did not start, so no cleanup is needed for it.
+        job_manager.cancel_job(second_job.job_id)
+        step_released.set()
+
+        while not second_job.is_done():
+            sleep(0.01)
+
+        self.assertEqual(executed_steps, ["blocking"])
+        self.assertEqual(first_job.state, "cancelled")
+        self.assertEqual([step["state"] for step in first_job.get_info()["steps"]], ["finished", "skipped"])
+        self.assertEqual(second_job.state, "cancelled")
+        self.assertEqual(cleanups, ["reset"])
+
+        self.assertEqual([job["name"] for job in job_manager.get_jobs_info()], ["first", "second"])
+
+        with self.assertRaisesRegex(ValueError, "does not exist"):
+            job_manager.get_job("not_a_job")
+
+    def test_non_exclusive_job(self):
+        job_manager = JobManager()
+        step_released = Event()
+
+        blocking_job = job_manager.submit("blocking", [("blocking", lambda: step_released.wait(timeout=5))])
+
+        # The non exclusive job does not wait for the running job.
+        kill_job = job_manager.submit("kill", [("kill", lambda: "killed")], exclusive=False)
+
+        while not kill_job.is_done():
+            sleep(0.01)
+
+        self.assertEqual(kill_job.result, "killed")
+        self.assertFalse(blocking_job.is_done())
+
+        step_released.set()
+
+    def test_manager_jobs(self):
+        manager = get_test_integration_manager(default_manager)
+
+        configuration = {"writer": {"output_file": "/tmp/test.h5", "n_frames": 10, "user_id": -1},
+                         "backend": {"bit_depth": 16},
+                         "detector": {"period": 0.1, "frames": 10, "dr": 16, "timing": "auto"}}
+
+        set_config_job = manager.submit_job("set_config", configuration)
+        start_job = manager.submit_job("start")
+
+        while not manager.jobs.get_job(start_job["job_id"]).is_done():
+            sleep(0.01)
+
+        self.assertEqual(manager.get_job(set_config_job["job_id"])["result"], "IntegrationStatus.CONFIGURED")
+        self.assertEqual([step["name"] for step in manager.get_job(set_config_job["job_id"])["steps"]],
+                         ["check_status", "backend_config", "writer_config", "detector_config", "wait_for_status"])
+
+        self.assertEqual(manager.get_job(start_job["job_id"])["state"], "finished")
+        self.assertEqual(manager.get_acquisition_status(), IntegrationStatus.RUNNING)
+
+        # Starting again is not possible, the job reports the error.
+        failed_job = manager.submit_job("start")
+        while not manager.jobs.get_job(failed_job["job_id"]).is_done():
+            sleep(0.01)
+
+        failed_job = manager.get_job(failed_job["job_id"])
+        self.assertEqual(failed_job["state"], "failed")
+        self.assertIn("Cannot start acquisition", failed_job["error"])
+        self.assertEqual(failed_job["steps"][1]["state"], "pending")
+
+        with self.assertRaisesRegex(ValueError, "cannot be executed as a job"):
+            manager.submit_job("not_an_operation")
+
+    def test_asynchronous_stop(self):
+        manager = get_test_integration_manager(default_manager)
+
+        manager.set_acquisition_config({"writer": {"output_file": "/tmp/test.h5", "n_frames": 10, "user_id": -1},
+                                        "backend": {"bit_depth": 16},
+                                        "detector": {"period": 0.1, "frames": 10, "dr": 16, "timing": "auto"}})
+        manager.start_acquisition()
+        self.assertEqual(manager.get_acquisition_status(), IntegrationStatus.RUNNING)
+
+        # The writer needs time to finalize the file.
+        writer_finalizing = Event()
+        writer_client = manager.writer_client.client
+        original_writer_stop = writer_client.stop
+
+        def slow_writer_stop():
+            writer_finalizing.wait(timeout=5)
+            original_writer_stop()
+
+        writer_client.stop = slow_writer_stop
+
+        start_time = time()
+        manager.stop_acquisition(asynchronous=True)
+        self.assertLess(time() - start_time, 1)
+
+        self.assertEqual(manager.detector_client.status, "idle")
+        self.assertTrue(manager.is_finalization_running())
+
+        # A second asynchronous stop does not block on the running finalization.
+        manager.stop_acquisition(asynchronous=True)
+
+        writer_finalizing.set()
+
+        while manager.is_finalization_running():
+            sleep(0.01)
+
+        finalization = manager.get_finalization_job()
+        self.assertEqual(finalization["state"], "finished")
+        self.assertEqual([step["name"] for step in finalization["steps"]], ["backend_close", "writer_stop", "reset"])
+        self.assertEqual(finalization["result"], "IntegrationStatus.INITIALIZED")
+        self.assertEqual(manager.get_acquisition_status(), IntegrationStatus.INITIALIZED)
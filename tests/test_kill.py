@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from threading import Thread, Event
+from time import sleep, time
+
+from detector_integration_api import default_manager
+from detector_integration_api.common.detector_pipeline import DetectorPipeline
+from detector_integration_api.default_validator import IntegrationStatus
+from tests.test_process_supervisor import LocalProcessClient
+from tests.utils import get_test_integration_manager, MockBackendClient, MockDetectorClient, \
+    MockExternalProcessClient
+
+
+class TestKill(unittest.TestCase):
+    def setUp(self):
+        self.log_folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for filename in os.listdir(self.log_folder):
+            os.remove(os.path.join(self.log_folder, filename))
+        os.rmdir(self.log_folder)
+
+    def test_manager_kill_deadline(self):
+        manager = get_test_integration_manager(default_manager)
+
+        # The backend does not respond.
+        manager.backend_client.client.reset = lambda: sleep(3)
+
+        # Kill does not wait for the operation in progress.
+        lock_released = Event()
+
+        def hold_lock():
+            with manager.lock:
+                lock_released.wait(timeout=5)
+
+        Thread(target=hold_lock).start()
+
+        start_time = time()
+        report = manager.kill(timeout=0.5)
+        self.assertLess(time() - start_time, 1)
+
+        lock_released.set()
+
+        self.assertEqual(report["detector"]["action"], "killed")
+        self.assertEqual(report["writer"]["action"], "killed")
+        self.assertEqual(report["writer"]["result"], "kill_request")
+        self.assertEqual(report["backend"]["action"], "timeout")
+        self.assertIn("error", report["backend"])
+
+    def test_manager_asynchronous_kill(self):
+        manager = get_test_integration_manager(default_manager)
+
+        # A hanging job holds the manager lock.
+        job_released = Event()
+        manager.jobs.submit("hanging", [("hanging", lambda: job_released.wait(timeout=5))])
+
+        kill_job = manager.submit_job("kill")
+
+        start_time = time()
+        while manager.get_job(kill_job["job_id"])["state"] != "finished" and time() - start_time < 2:
+            sleep(0.01)
+
+        job_released.set()
+
+        self.assertEqual(manager.get_job(kill_job["job_id"])["result"]["writer"]["action"], "killed")
+
+    def test_manager_kill_status(self):
+        manager = get_test_integration_manager(default_manager)
+        manager.kill()
+
+        self.assertEqual(manager.get_acquisition_status_string(timeout=1), str(manager.get_acquisition_status()))
+
+        manager.detector_client.client.get_status = lambda: sleep(1)
+        self.assertEqual(manager.get_acquisition_status_string(timeout=0.1),
+                         str(IntegrationStatus.COMPONENT_NOT_RESPONDING))
+
+    def test_detector_pipeline_kill(self):
+        detector_client = MockDetectorClient()
+        detector_client.status = "running"
+
+        pipeline = DetectorPipeline(detector_client, MockBackendClient(), MockExternalProcessClient())
+
+        report = pipeline.kill(timeout=1)
+
+        self.assertTrue(all(component["action"] == "killed" for component in report.values()))
+        self.assertEqual(detector_client.status, "idle")
+
+    def test_writer_kill_escalation(self):
+        client = LocalProcessClient("import time; time.sleep(30)", self.log_folder)
+        client.set_parameters({"output_file": "/tmp/test.h5"})
+        client.start()
+
+        # There is no REST interface to receive the kill request.
+        self.assertEqual(client.kill(step_timeout=0.2), "sigterm")
+        self.assertFalse(client.is_running())
+        self.assertFalse(client.get_last_exit()["crashed"])
+
+        client.reset()
+
+        client.script = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(30)"
+        client.set_parameters({"output_file": "/tmp/test.h5"})
+        client.start()
+
+        self.assertEqual(client.kill(step_timeout=0.2), "sigkill")
+        self.assertFalse(client.is_running())
+
+        client.reset()
+        self.assertEqual(client.kill(), "not_running")
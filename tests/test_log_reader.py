@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from threading import Thread
+from time import sleep, time
+
+from detector_integration_api.client.external_process_client import ExternalProcessClient
+from detector_integration_api.common.log_reader import read_log_range, follow_log_range, align_to_characters
+
+
+class TestLogReader(unittest.TestCase):
+    def setUp(self):
+        self.log_folder = tempfile.mkdtemp()
+        self.log_filename = os.path.join(self.log_folder, "writer-20180101-120000.log")
+
+        with open(self.log_filename, "wb") as log_file:
+            log_file.write(b"0123456789")
+
+    def tearDown(self):
+        for filename in os.listdir(self.log_folder):
+            os.remove(os.path.join(self.log_folder, filename))
+        os.rmdir(self.log_folder)
+
+    def test_read_log_range(self):
+        self.assertEqual(read_log_range(self.log_filename), (b"0123456789", 0, 10))
+        self.assertEqual(read_log_range(self.log_filename, 2, 3), (b"234", 2, 10))
+        self.assertEqual(read_log_range(self.log_filename, -4), (b"6789", 6, 10))
+        self.assertEqual(read_log_range(self.log_filename, 20), (b"", 10, 10))
+
+        empty_log_filename = os.path.join(self.log_folder, "empty.log")
+        open(empty_log_filename, "w").close()
+        self.assertEqual(read_log_range(empty_log_filename), (b"", 0, 0))
+
+    def test_align_to_characters(self):
+        data = "a\u00e9b\u20acc".encode()
+
+        self.assertEqual(align_to_characters(data, 0), (data, 0))
+        # Partial characters at the start are skipped, at the end they are left for the next read.
+        self.assertEqual(align_to_characters(data[2:], 2), (data[3:], 3))
+        self.assertEqual(align_to_characters(data[:6], 0), (data[:4], 0))
+        self.assertEqual(align_to_characters(data[5:7], 5), (b"", 7))
+
+    def test_read_log_range_characters(self):
+        with open(self.log_filename, "wb") as log_file:
+            log_file.write("\u00e9t\u00e9 \u20ac".encode())
+
+        data, offset, _ = read_log_range(self.log_filename, 1, 5)
+        self.assertEqual((data.decode(), offset), ("t\u00e9 ", 2))
+
+        data, offset, _ = read_log_range(self.log_filename, -2)
+        self.assertEqual((data, offset), (b"", 9))
+
+        # A character still being written is returned by a later read.
+        with open(self.log_filename, "ab") as log_file:
+            log_file.write(b"\xe2\x82")
+
+        self.assertEqual(read_log_range(self.log_filename, 9), (b"", 9, 11))
+
+        # A range shorter than a character is returned as it is.
+        self.assertEqual(read_log_range(self.log_filename, 0, 1), (b"\xc3", 0, 11))
+
+    def test_follow_log_range(self):
+        def append_to_log():
+            sleep(0.3)
+            with open(self.log_filename, "ab") as log_file:
+                log_file.write(b"abc")
+
+        Thread(target=append_to_log).start()
+
+        start_time = time()
+        self.assertEqual(follow_log_range(self.log_filename, 10, timeout=2), (b"abc", 10, 13))
+        self.assertLess(time() - start_time, 2)
+
+        self.assertEqual(follow_log_range(self.log_filename, 13, timeout=0.2), (b"", 13, 13))
+
+    def test_process_client_logs(self):
+        client = ExternalProcessClient("tcp://localhost:40000", "writer.sh", 10001, log_folder=self.log_folder)
+        client.PROCESS_NAME = "writer"
+
+        with open(os.path.join(self.log_folder, "writer-20180101-130000.log"), "wb") as log_file:
+            log_file.write(b"latest log")
+
+        self.assertEqual(client.get_log_names(), ["writer-20180101-120000.log", "writer-20180101-130000.log"])
+
+        log = client.read_log()
+        self.assertEqual(log["log_name"], "writer-20180101-130000.log")
+        self.assertEqual(log["data"], "latest log")
+        self.assertEqual(log["next_offset"], 10)
+
+        log = client.read_log("writer-20180101-120000.log", offset=5)
+        self.assertEqual(log["data"], "56789")
+
+        with self.assertRaisesRegex(ValueError, "not available"):
+            client.read_log("../../etc/passwd")
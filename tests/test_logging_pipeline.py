@@ -0,0 +1,116 @@
+import logging
+import unittest
+from threading import Event
+
+from detector_integration_api.common.logging_pipeline import DeduplicationFilter, LoggingPipeline, DEDUPLICATE
+from tests.utils import FakeClock
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, blocked=None):
+        super(RecordingHandler, self).__init__()
+        self.messages = []
+        self.blocked = blocked
+
+    def emit(self, record):
+        if self.blocked is not None:
+            self.blocked.wait(timeout=5)
+
+        self.messages.append(self.format(record))
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("test_logging_pipeline")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def test_deduplication(self):
+        clock = FakeClock()
+        deduplication_filter = DeduplicationFilter(interval=10, clock=clock)
+
+        def log(level, message, *args, extra=DEDUPLICATE):
+            return deduplication_filter.filter(self.logger.makeRecord(self.logger.name, level, "", 0, message,
+                                                                      args, None, extra=extra))
+
+        self.assertTrue(log(logging.INFO, "Status %s", "idle"))
+        self.assertFalse(log(logging.INFO, "Status %s", "idle"))
+        self.assertTrue(log(logging.INFO, "Status %s", "running"))
+        self.assertTrue(log(logging.INFO, "Details %s", {"writer": "stopped"}))
+        self.assertFalse(log(logging.INFO, "Details %s", {"writer": "stopped"}))
+
+        # Warnings, errors and records not marked for the deduplication are never suppressed.
+        self.assertTrue(log(logging.WARNING, "Status %s", "error"))
+        self.assertTrue(log(logging.WARNING, "Status %s", "error"))
+        self.assertTrue(log(logging.ERROR, "Status %s", "error"))
+        self.assertTrue(log(logging.ERROR, "Status %s", "error"))
+        self.assertTrue(log(logging.INFO, "Starting acquisition.", extra=None))
+        self.assertTrue(log(logging.INFO, "Starting acquisition.", extra=None))
+
+        self.assertEqual(deduplication_filter.n_deduplicated, 2)
+
+        clock.advance(10)
+        record = self.logger.makeRecord(self.logger.name, logging.INFO, "", 0, "Status %s", ("idle",), None,
+                                        extra=DEDUPLICATE)
+        self.assertTrue(deduplication_filter.filter(record))
+        self.assertEqual(record.getMessage(), "Status idle (1 identical messages suppressed)")
+
+    def test_queue(self):
+        handler_blocked = Event()
+        handler = RecordingHandler(handler_blocked)
+        self.logger.addHandler(handler)
+
+        pipeline = LoggingPipeline(queue_size=2, deduplication_interval=10)
+        pipeline.start(self.logger)
+
+        # The handler is blocked, but logging does not wait for it.
+        for index in range(5):
+            self.logger.info("Message %d", index, extra=DEDUPLICATE)
+
+        self.logger.info("Message %d", 4, extra=DEDUPLICATE)
+
+        try:
+            raise ValueError("Invalid value.")
+        except ValueError:
+            self.logger.exception("Failed.")
+
+        handler_blocked.set()
+        pipeline.stop()
+
+        statistics = pipeline.get_statistics()
+        self.assertEqual(statistics["n_deduplicated"], 1)
+        self.assertGreater(statistics["n_dropped"], 0)
+        self.assertEqual(len(handler.messages) + statistics["n_dropped"], 6)
+
+        # The handlers are back on the logger.
+        self.assertIn(handler, self.logger.handlers)
+        self.assertNotIn(pipeline.queue_handler, self.logger.handlers)
+
+        self.logger.removeHandler(handler)
+
+    def test_message_formatted_when_logged(self):
+        handler_blocked = Event()
+        handler = RecordingHandler(handler_blocked)
+        self.logger.addHandler(handler)
+
+        pipeline = LoggingPipeline()
+        pipeline.start(self.logger)
+
+        # The argument is modified before the listener thread writes the record.
+        writer_config = {"n_frames": 10}
+        self.logger.info("Writer config %s", writer_config)
+        writer_config["n_frames"] = 20
+
+        try:
+            raise ValueError("Invalid value.")
+        except ValueError:
+            self.logger.exception("Failed.")
+
+        handler_blocked.set()
+        pipeline.stop()
+
+        self.assertEqual(handler.messages[0], "Writer config {'n_frames': 10}")
+        self.assertTrue(handler.messages[1].startswith("Failed.\nTraceback"))
+        self.assertIn("ValueError: Invalid value.", handler.messages[1])
+
+        self.logger.removeHandler(handler)
@@ -151,6 +151,8 @@ class TestIntegrationManager(unittest.TestCase):
 
         self.assertEqual(manager.get_acquisition_status_string(), "IntegrationStatus.INITIALIZED")
 
-        self.assertDictEqual(writer_config, manager.writer_client.config)
+        # The reset clears the parameters of the stopped writer, the config is kept.
+        self.assertIsNone(manager.writer_client.config)
+        self.assertDictEqual(writer_config, manager.get_acquisition_config()["writer"])
         self.assertDictEqual(backend_config, manager.backend_client.config)
         self.assertDictEqual(detector_config, manager.detector_client.config)
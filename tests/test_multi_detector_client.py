@@ -0,0 +1,83 @@
+import unittest
+
+from detector_integration_api.client.multi_detector_client import MultiDetectorClient, aggregate_detector_status
+from tests.utils import MockDetectorClient
+
+
+class TestMultiDetectorClient(unittest.TestCase):
+    def test_aggregate_status(self):
+        self.assertEqual(aggregate_detector_status({"JF01": "idle", "JF02": "idle"}), "idle")
+        self.assertEqual(aggregate_detector_status({"JF01": "running", "JF02": "idle"}), "running")
+        self.assertEqual(aggregate_detector_status({"JF01": "idle", "JF02": "finished"}), "idle")
+        self.assertEqual(aggregate_detector_status({"JF01": "error", "JF02": "running"}), "error")
+        self.assertEqual(aggregate_detector_status({"JF01": "idle", "JF02": "unknown"}), "error")
+
+    def test_workflow(self):
+        detectors = {"JF01": MockDetectorClient(), "JF02": MockDetectorClient()}
+        client = MultiDetectorClient(detectors)
+
+        self.assertEqual(client.get_status(), "idle")
+
+        client.set_config({"frames": 100, "period": 0.1, "detectors": {"JF02": {"period": 0.2}}})
+
+        self.assertDictEqual(detectors["JF01"].config, {"frames": 100, "period": 0.1})
+        self.assertDictEqual(detectors["JF02"].config, {"frames": 100, "period": 0.2})
+
+        self.assertEqual(client.get_value("frames"), 100)
+        self.assertDictEqual(client.get_value("period"), {"JF01": 0.1, "JF02": 0.2})
+
+        with self.assertRaisesRegex(ValueError, "unknown detectors"):
+            client.set_config({"frames": 100, "detectors": {"JF03": {}}})
+
+        client.start()
+
+        self.assertEqual(client.get_status(), "running")
+        self.assertIsNotNone(client.last_start_skew)
+
+        details = client.get_detectors_details()
+        self.assertEqual(details["JF01"]["status"], "running")
+        self.assertTrue("start" in details["JF02"]["timing"])
+
+        client.stop()
+        self.assertEqual(client.get_status(), "idle")
+
+    def test_failed_arm_aborts_start(self):
+        class FailingDetectorClient(MockDetectorClient):
+            def arm(self):
+                raise ValueError("Detector not responding.")
+
+        detectors = {"JF01": MockDetectorClient(), "JF02": FailingDetectorClient()}
+        client = MultiDetectorClient(detectors)
+
+        with self.assertRaisesRegex(RuntimeError, "JF02: Detector not responding"):
+            client.start()
+
+        # No detector should start if one of them cannot be armed.
+        self.assertEqual(detectors["JF01"].status, "idle")
+        self.assertEqual(detectors["JF02"].status, "idle")
+
+    def test_bulk_values(self):
+        class BulkDetectorClient(MockDetectorClient):
+            def get_values(self, parameter_names, fresh=False):
+                values = {name: self.config[name] for name in parameter_names if name in self.config}
+                errors = {name: "Unknown parameter." for name in parameter_names if name not in self.config}
+
+                return values, errors
+
+            def set_values(self, parameters):
+                self.config.update(parameters)
+
+                return dict(parameters), {}
+
+        detectors = {"JF01": BulkDetectorClient(), "JF02": BulkDetectorClient()}
+        client = MultiDetectorClient(detectors)
+
+        self.assertEqual(client.set_values({"frames": 100, "period": 0.1}), ({"frames": 100, "period": 0.1}, {}))
+
+        detectors["JF02"].config["period"] = 0.2
+        del detectors["JF02"].config["frames"]
+
+        values, errors = client.get_values(["frames", "period"])
+
+        self.assertDictEqual(values, {"period": {"JF01": 0.1, "JF02": 0.2}})
+        self.assertDictEqual(errors, {"frames": "JF02: Unknown parameter."})
@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import unittest
+from threading import Event
+
+from detector_integration_api import default_manager
+from detector_integration_api.client.external_process_client import ExternalProcessClient, get_executable_command
+from detector_integration_api.default_validator import IntegrationStatus
+from tests.utils import MockBackendClient, MockDetectorClient
+
+
+class LocalProcessClient(ExternalProcessClient):
+    """
+    Process client for a process without the REST interface of the writer.
+    """
+    PROCESS_NAME = "writer"
+
+    def __init__(self, script, log_folder):
+        super(LocalProcessClient, self).__init__("tcp://localhost:40000", sys.executable, 10001, log_folder)
+        self.script = script
+
+    def get_execution_command(self):
+        return [sys.executable, "-c", self.script]
+
+    def _send_request_to_process(self, requests_method, url, request_json=None, return_response=False):
+        return url.endswith("/parameters")
+
+
+class TestProcessSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.log_folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for filename in os.listdir(self.log_folder):
+            os.remove(os.path.join(self.log_folder, filename))
+        os.rmdir(self.log_folder)
+
+    def start_process(self, script):
+        client = LocalProcessClient(script, self.log_folder)
+        client.set_parameters({"output_file": "/tmp/test.h5"})
+
+        process_exited = Event()
+        client.add_exit_callback(lambda exit_info: process_exited.set())
+
+        client.start()
+        self.assertTrue(process_exited.wait(timeout=5))
+
+        return client
+
+    def test_process_crash(self):
+        client = self.start_process("import sys; print('Cannot open output file.', flush=True); sys.exit(3)")
+
+        exit_info = client.get_last_exit()
+        self.assertEqual(exit_info["exit_code"], 3)
+        self.assertTrue(exit_info["crashed"])
+        self.assertGreater(exit_info["run_time"], 0)
+        self.assertIn("Cannot open output file.", exit_info["log_tail"])
+
+        self.assertEqual(client.get_status(), "error")
+
+        client.reset()
+        self.assertEqual(client.get_status(), "stopped")
+        self.assertEqual(client.get_last_exit()["exit_code"], 3)
+
+    def test_process_finished(self):
+        client = self.start_process("print('Writing completed.')")
+
+        self.assertEqual(client.get_last_exit()["exit_code"], 0)
+        self.assertFalse(client.get_last_exit()["crashed"])
+        self.assertEqual(client.get_status(), "stopped")
+
+    def test_manager_writer_crash(self):
+        writer_client = LocalProcessClient("import sys, time; time.sleep(0.5); sys.exit(3)", self.log_folder)
+        manager = default_manager.IntegrationManager(MockBackendClient(), writer_client, MockDetectorClient())
+
+        manager.set_acquisition_config({"writer": {"output_file": "/tmp/test.h5", "n_frames": 10, "user_id": -1},
+                                        "backend": {"bit_depth": 16},
+                                        "detector": {"period": 0.1, "frames": 10, "dr": 16, "timing": "auto"}})
+
+        process_exited = Event()
+        writer_client.add_exit_callback(lambda exit_info: process_exited.set())
+
+        writer_client.start()
+        status_version = manager.status_version
+
+        self.assertTrue(process_exited.wait(timeout=5))
+        self.assertGreater(manager.status_version, status_version)
+
+        self.assertEqual(manager.get_acquisition_status(), IntegrationStatus.ERROR)
+        self.assertEqual(manager.get_status_details()["writer_exit"]["exit_code"], 3)
+
+    def test_executable_command(self):
+        script_filename = os.path.join(self.log_folder, "writer.sh")
+
+        with open(script_filename, "w") as script_file:
+            script_file.write("echo writer\n")
+
+        self.assertEqual(get_executable_command(script_filename), ["sh", script_filename])
+
+        # Executable scripts without a shebang still need sh.
+        os.chmod(script_filename, 0o755)
+        self.assertEqual(get_executable_command(script_filename), ["sh", script_filename])
+
+        with open(script_filename, "w") as script_file:
+            script_file.write("#!/bin/sh\necho writer\n")
+
+        self.assertEqual(get_executable_command(script_filename), [script_filename])
+
+        self.assertEqual(get_executable_command("writer"), ["writer"])
+        self.assertEqual(get_executable_command("python '%s' --debug" % script_filename),
+                         ["python", script_filename, "--debug"])
@@ -0,0 +1,58 @@
+import unittest
+from threading import Thread
+from time import sleep
+
+import bottle
+import requests
+
+from detector_integration_api.rest_api.request_profiler import RequestProfiler
+
+
+def slow_status_query():
+    sleep(0.05)
+    return "idle"
+
+
+class TestRequestProfiler(unittest.TestCase):
+    server_port = 10050
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = bottle.Bottle()
+        cls.profiler = RequestProfiler(sampling_interval=0.001)
+        cls.profiler.install(cls.app)
+
+        @cls.app.get("/status")
+        def get_status():
+            return {"status": slow_status_query()}
+
+        Thread(target=bottle.run, kwargs={"app": cls.app, "host": "localhost", "port": cls.server_port,
+                                          "quiet": True}, daemon=True).start()
+        sleep(0.5)
+
+    def get_status(self, n_requests):
+        for _ in range(n_requests):
+            requests.get("http://localhost:%d/status" % self.server_port).raise_for_status()
+
+    def test_sampling(self):
+        # Nothing is sampled while the profiler is disabled.
+        self.get_status(2)
+        self.assertEqual(self.profiler.get_status()["n_profiled_requests"], 0)
+
+        self.profiler.set_enabled(True, sample_fraction=1)
+        self.get_status(3)
+        self.profiler.set_enabled(False)
+
+        status = self.profiler.get_status()
+        self.assertEqual(status["n_profiled_requests"], 3)
+        self.assertGreater(status["n_samples"], 0)
+
+        stacks = self.profiler.get_collapsed_stacks().splitlines()
+        self.assertTrue(all(stack.startswith("GET /status;") for stack in stacks))
+        self.assertTrue(any("slow_status_query" in stack for stack in stacks))
+
+        self.profiler.clear()
+        self.assertEqual(self.profiler.get_collapsed_stacks(), "")
+
+        with self.assertRaisesRegex(ValueError, "between 0 and 1"):
+            self.profiler.set_enabled(True, sample_fraction=2)
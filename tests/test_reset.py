@@ -0,0 +1,114 @@
+import unittest
+from concurrent import futures
+from time import sleep, time
+
+from detector_integration_api import default_manager
+from detector_integration_api.common.detector_pipeline import DetectorPipeline
+from detector_integration_api.default_validator import IntegrationStatus
+from detector_integration_api.utils import execute_in_parallel, reset_components
+from tests.utils import get_test_integration_manager, MockBackendClient, MockDetectorClient, \
+    MockExternalProcessClient
+
+
+def count_calls(client, method_names, delay=0):
+    """
+    Record the calls of the given client methods in client.calls, and make each call take delay seconds.
+    """
+    client.calls = []
+
+    def counted(name, method):
+        def counted_method(*args, **kwargs):
+            client.calls.append(name)
+            sleep(delay)
+            return method(*args, **kwargs)
+
+        return counted_method
+
+    for name in method_names:
+        setattr(client, name, counted(name, getattr(client, name)))
+
+    return client
+
+
+class TestReset(unittest.TestCase):
+    def test_execute_in_parallel_timeout(self):
+        start_time = time()
+        results, errors = execute_in_parallel({"fast": lambda: 1,
+                                               "slow": lambda: sleep(1)},
+                                              timeout={"fast": 0.5, "slow": 0.2})
+
+        self.assertLess(time() - start_time, 0.5)
+        self.assertEqual(results, {"fast": 1})
+        self.assertIsInstance(errors["slow"], futures.TimeoutError)
+
+    def test_reset_components(self):
+        calls = []
+
+        def failing_reset():
+            raise RuntimeError("Backend not reachable.")
+
+        report, errors = reset_components({"detector": lambda: calls.append("detector"),
+                                           "backend": failing_reset,
+                                           "writer": lambda: calls.append("writer")},
+                                          {"detector": "idle", "backend": "OPEN", "writer": "writing"})
+
+        self.assertEqual(calls, ["writer"])
+        self.assertEqual(report["detector"]["action"], "skipped")
+        self.assertEqual(report["writer"]["action"], "reset")
+        self.assertEqual(report["backend"]["action"], "failed")
+        self.assertEqual(list(errors), ["backend"])
+
+        # Components with unknown status are reset.
+        report, _ = reset_components({"writer": lambda: calls.append("writer")}, {})
+        self.assertEqual(report["writer"]["action"], "reset")
+
+        calls.clear()
+        report, _ = reset_components({"writer": lambda: calls.append("writer")}, {"writer": "stopped"},
+                                     skip_functions={"writer": lambda: calls.append("writer skipped")})
+        self.assertEqual(report["writer"]["action"], "skipped")
+        self.assertEqual(calls, ["writer skipped"])
+
+    def test_manager_reset(self):
+        manager = get_test_integration_manager(default_manager)
+
+        detector_client = count_calls(manager.detector_client.client, ["stop"], delay=0.2)
+        backend_client = count_calls(manager.backend_client.client, ["reset"], delay=0.2)
+        writer_client = count_calls(manager.writer_client.client, ["reset"], delay=0.2)
+
+        # Nothing to reset, but the parameters of the stopped writer are cleared.
+        writer_client.config = {"output_file": "/tmp/old.h5"}
+        self.assertEqual(manager.reset(), IntegrationStatus.INITIALIZED)
+        self.assertEqual(detector_client.calls + backend_client.calls + writer_client.calls, [])
+        self.assertTrue(all(component["action"] == "skipped" for component in manager.last_reset_report.values()))
+        self.assertIsNone(writer_client.config)
+
+        manager.set_acquisition_config({"writer": {"output_file": "/tmp/test.h5", "n_frames": 10, "user_id": -1},
+                                        "backend": {"bit_depth": 16},
+                                        "detector": {"period": 0.1, "frames": 10, "dr": 16, "timing": "auto"}})
+        manager.start_acquisition()
+
+        for client in (detector_client, backend_client, writer_client):
+            client.calls.clear()
+
+        # All components are reset at the same time.
+        start_time = time()
+        self.assertEqual(manager.reset(), IntegrationStatus.INITIALIZED)
+        self.assertLess(time() - start_time, 0.5)
+
+        self.assertEqual(detector_client.calls, ["stop"])
+        self.assertEqual(backend_client.calls, ["reset"])
+        self.assertEqual(writer_client.calls, ["reset"])
+
+    def test_detector_pipeline_reset(self):
+        detector_client = count_calls(MockDetectorClient(), ["stop"])
+        backend_client = count_calls(MockBackendClient(), ["reset"])
+        writer_client = count_calls(MockExternalProcessClient(), ["reset"])
+
+        pipeline = DetectorPipeline(detector_client, backend_client, writer_client)
+
+        backend_client.status = "CONFIGURED"
+        report = pipeline.reset()
+
+        self.assertEqual(backend_client.calls, ["reset"])
+        self.assertEqual(detector_client.calls + writer_client.calls, [])
+        self.assertEqual(report["backend"]["action"], "reset")
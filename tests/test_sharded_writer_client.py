@@ -0,0 +1,110 @@
+import unittest
+
+from detector_integration_api.client.sharded_writer_client import ShardedWriterClient, aggregate_writer_status, \
+    aggregate_writer_statistics, get_shard_output_file
+from tests.utils import MockExternalProcessClient
+
+
+class MockShardClient(MockExternalProcessClient):
+    PROCESS_NAME = "writer"
+
+    def __init__(self, stream_url, writer_executable, writer_port, log_folder=None):
+        super().__init__()
+        self.process_url = "http://localhost:%d" % writer_port
+        self.process_parameters = None
+
+    def set_parameters(self, writer_parameters):
+        super().set_parameters(writer_parameters)
+        self.process_parameters = writer_parameters
+
+    def get_statistics(self):
+        return {"n_written_frames": 10, "output_file": self.config["output_file"]}
+
+    def kill(self, step_timeout=None):
+        self.kill_step_timeout = step_timeout
+        return super().kill(step_timeout)
+
+
+class TestShardedWriterClient(unittest.TestCase):
+    def setUp(self):
+        shards = [{"stream_url": "tcp://localhost:40000", "writer_port": 10001},
+                  {"stream_url": "tcp://localhost:40001", "writer_port": 10002, "output_suffix": "_second"}]
+
+        self.client = ShardedWriterClient(shards, "writer.sh", writer_client_class=MockShardClient)
+
+    def test_aggregation(self):
+        self.assertEqual(get_shard_output_file("/tmp/test.h5", "_0"), "/tmp/test_0.h5")
+
+        self.assertEqual(aggregate_writer_status({"shard_0": "writing", "shard_1": "writing"}), "writing")
+        self.assertEqual(aggregate_writer_status({"shard_0": "writing", "shard_1": "receiving"}), "writing")
+        self.assertEqual(aggregate_writer_status({"shard_0": "writing", "shard_1": "stopped"}), "writing")
+        self.assertEqual(aggregate_writer_status({"shard_0": "writing", "shard_1": "error"}), "error")
+
+        self.assertDictEqual(aggregate_writer_statistics({"shard_0": {}, "shard_1": {}}), {})
+
+    def test_workflow(self):
+        self.client.set_parameters({"output_file": "/tmp/test.h5", "n_frames": 100})
+
+        clients = self.client.writer_clients
+        self.assertEqual(clients["shard_0"].config["output_file"], "/tmp/test_0.h5")
+        self.assertEqual(clients["shard_1"].config["output_file"], "/tmp/test_second.h5")
+        self.assertEqual(clients["shard_1"].config["n_frames"], 100)
+
+        self.client.start()
+        self.assertEqual(self.client.get_status(), "writing")
+
+        statistics = self.client.get_statistics()
+        self.assertEqual(statistics["n_written_frames"], 20)
+        self.assertEqual(statistics["shards"]["shard_1"]["output_file"], "/tmp/test_second.h5")
+
+        self.client.stop()
+        self.assertEqual(self.client.get_status(), "stopped")
+
+        self.assertEqual(self.client.kill(step_timeout=0.5), {"shard_0": "kill_request", "shard_1": "kill_request"})
+        self.assertTrue(all(client.kill_step_timeout == 0.5 for client in clients.values()))
+
+        self.client.set_parameters(None)
+        self.assertTrue(all(client.process_parameters is None for client in clients.values()))
+
+    def test_shards_finish_with_skew(self):
+        self.client.set_parameters({"output_file": "/tmp/test.h5", "n_frames": 100})
+        self.client.start()
+
+        clients = self.client.writer_clients
+
+        clients["shard_0"].stop()
+        self.assertEqual(self.client.get_status(), "writing")
+
+        clients["shard_1"].status = "receiving"
+        self.assertEqual(self.client.get_status(), "receiving")
+
+        clients["shard_1"].stop()
+        self.assertEqual(self.client.get_status(), "stopped")
+
+        clients["shard_1"].status = "error"
+        self.assertEqual(self.client.get_status(), "error")
+
+    def test_failing_shard(self):
+        def failing_get_status():
+            raise ValueError("Process writer is running but cannot get status.")
+
+        self.client.writer_clients["shard_1"].get_status = failing_get_status
+
+        self.assertEqual(self.client.get_status(), "error")
+
+        details = self.client.get_shards_details()
+        self.assertEqual(details["shard_0"]["status"], "stopped")
+        self.assertEqual(details["shard_1"]["status"], "error")
+        self.assertTrue("cannot get status" in details["shard_1"]["error"])
+
+    def test_failed_start_kills_started_shards(self):
+        def failing_start():
+            raise RuntimeError("Could not start writer process in time.")
+
+        self.client.set_parameters({"output_file": "/tmp/test.h5", "n_frames": 100})
+        self.client.writer_clients["shard_0"].start = failing_start
+
+        with self.assertRaisesRegex(RuntimeError, "shard_0: Could not start"):
+            self.client.start()
+
+        self.assertEqual(self.client.writer_clients["shard_1"].status, "stopped")
@@ -0,0 +1,208 @@
+import json
+import os
+import tempfile
+import unittest
+from threading import Thread
+from time import sleep, time
+from unittest.mock import patch
+
+import requests
+
+from detector_integration_api import config
+from detector_integration_api.client.backend_rest_client import BackendClient
+from detector_integration_api.client.cpp_writer_client import CppWriterClient
+from detector_integration_api.client.detector_client import DetectorClient
+from detector_integration_api.simulation import writer_simulator
+from detector_integration_api.simulation.backend_simulator import BackendSimulator
+from detector_integration_api.simulation.detector_simulator import DetectorSimulator
+from detector_integration_api.simulation.simulated_service import ScriptedFailures, make_simulator_server
+from tests.utils import FakeClock
+
+WRITER_SIMULATOR = os.path.abspath(writer_simulator.__file__)
+
+
+class TestScriptedFailures(unittest.TestCase):
+    def test_actions_in_order(self):
+        failures = ScriptedFailures({"open": ["error", "hang"], "close": "garbage"})
+
+        self.assertEqual(failures.next_action("open"), "error")
+        self.assertEqual(failures.get_remaining(), {"open": ["hang"], "close": ["garbage"]})
+        self.assertEqual(failures.next_action("open"), "hang")
+        self.assertEqual(failures.next_action("open"), "ok")
+        self.assertEqual(failures.next_action("metrics"), "ok")
+
+        with self.assertRaisesRegex(ValueError, "Unknown failure action"):
+            failures.add("open", ["explode"])
+
+
+class TestBackendSimulator(unittest.TestCase):
+    backend_port = 10070
+
+    @classmethod
+    def setUpClass(cls):
+        cls.clock = FakeClock()
+        cls.simulator = BackendSimulator(frame_rate=10, hang_time=0.5, clock=cls.clock)
+
+        cls.server = make_simulator_server(cls.simulator.get_app(), "localhost", cls.backend_port)
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.simulator.restart()
+        self.simulator.failures.clear()
+        self.simulator.latency = 0
+
+        self.client = BackendClient("http://localhost:%d" % self.backend_port)
+        self.simulation_url = "http://localhost:%d/simulation" % self.backend_port
+
+    def test_acquisition(self):
+        self.assertEqual(self.client.get_status(), "INITIALIZED")
+
+        with self.assertRaisesRegex(ValueError, "Cannot start backend"):
+            self.client.open()
+
+        self.client.set_config({"bit_depth": 16, "n_frames": 50})
+        self.client.open()
+        self.assertEqual(self.client.get_status(), "OPEN")
+
+        self.clock.advance(2)
+        self.client.metrics_cache.invalidate()
+        self.assertDictEqual(self.client.get_metrics(), {"received_frames": 20, "sent_frames": 20})
+
+        # The counters stop at n_frames.
+        self.clock.advance(10)
+        self.client.metrics_cache.invalidate()
+        self.assertEqual(self.client.get_metrics([])["received_frames"], 50)
+
+        self.client.close()
+        self.assertEqual(self.client.get_status(), "CLOSED")
+
+        self.client.reset()
+        self.assertEqual(self.client.get_status(), "INITIALIZED")
+
+    def test_scripted_failures(self):
+        response = requests.post(self.simulation_url, json={"failures": {"configure": ["error", "garbage"],
+                                                                         "state": ["hang"]}})
+        self.assertEqual(response.json()["failures"]["configure"], ["error", "garbage"])
+
+        with self.assertRaisesRegex(ValueError, "Cannot setup backend parameters"):
+            self.client.set_config({"bit_depth": 16})
+
+        with self.assertRaisesRegex(ValueError, "simulated garbage"):
+            self.client.set_config({"bit_depth": 16})
+
+        self.client.set_config({"bit_depth": 16})
+
+        with patch.object(config, "BACKEND_COMMUNICATION_TIMEOUT", 0.1):
+            with self.assertRaises(requests.exceptions.Timeout):
+                self.client.get_status()
+
+        # A restart loses the configuration.
+        self.simulator.failures.add("open", "restart")
+        with self.assertRaisesRegex(ValueError, "state INITIALIZED"):
+            self.client.open()
+
+        self.assertEqual(requests.post(self.simulation_url, json={"failures": {"open": ["explode"]}}).status_code,
+                         400)
+
+    def test_latency(self):
+        requests.post(self.simulation_url, json={"latency": {"state": 0.2}})
+
+        start_time = time()
+        self.client.get_status()
+        self.assertGreaterEqual(time() - start_time, 0.2)
+
+        start_time = time()
+        self.client.reset()
+        self.assertLess(time() - start_time, 0.2)
+
+
+class TestDetectorSimulator(unittest.TestCase):
+    def test_acquisition(self):
+        clock = FakeClock()
+        client = DetectorClient(detector=DetectorSimulator(clock=clock))
+
+        client.set_config({"frames": 100, "period": 0.01, "exptime": 0.001, "timing": "auto", "dr": 16})
+        self.assertEqual(client.get_value("frames"), 100)
+
+        client.start()
+        self.assertEqual(client.get_status(), "running")
+
+        # The acquisition ends after frames * period.
+        clock.advance(1)
+        self.assertEqual(client.get_status(), "idle")
+
+        client.start()
+        client.stop()
+        self.assertEqual(client.get_status(), "idle")
+
+    def test_restart(self):
+        clock = FakeClock()
+        client = DetectorClient(detector=DetectorSimulator(clock=clock, boot_time=1))
+
+        client.set_config({"frames": 100, "period": 0.01, "exptime": 0.001, "timing": "auto", "dr": 16})
+        client.start()
+
+        client.detector.restart()
+
+        # The detector does not answer while it boots, and then it lost its parameters.
+        with self.assertRaisesRegex(RuntimeError, "booting"):
+            client.get_status()
+
+        clock.advance(1)
+        self.assertEqual(client.get_status(), "idle")
+        self.assertEqual(client.get_value("frames"), 1)
+
+
+class TestWriterSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.log_folder = tempfile.mkdtemp()
+        self.writer_client = None
+
+    def tearDown(self):
+        if self.writer_client is not None and self.writer_client.is_running():
+            self.writer_client.kill()
+
+        for filename in os.listdir(self.log_folder):
+            os.remove(os.path.join(self.log_folder, filename))
+        os.rmdir(self.log_folder)
+
+    def start_writer(self, writer_port, options):
+        self.writer_client = CppWriterClient(stream_url="tcp://localhost:40000", writer_executable=WRITER_SIMULATOR,
+                                             writer_port=writer_port, log_folder=self.log_folder)
+        self.writer_client.set_parameters({"output_file": "/tmp/test.h5", "n_frames": 1000, "user_id": -1})
+
+        with patch.dict(os.environ, {config.WRITER_SIMULATOR_OPTIONS_ENV_VARIABLE: json.dumps(options)}):
+            self.writer_client.start()
+
+        return self.writer_client
+
+    def get_simulation_status(self, writer_port):
+        return requests.get("http://localhost:%d/simulation" % writer_port).json()
+
+    def test_acquisition(self):
+        writer_client = self.start_writer(10071, {"frame_rate": 100, "failures": {"status": ["error"]}})
+
+        # The client retries the failed status request.
+        self.assertEqual(writer_client.get_status(), "writing")
+        self.assertEqual(self.get_simulation_status(10071)["n_requests"]["status"], 2)
+
+        sleep(0.2)
+        self.assertGreater(writer_client.get_statistics()["n_written_frames"], 0)
+
+        writer_client.stop()
+        self.assertFalse(writer_client.is_running())
+        self.assertEqual(writer_client.get_status(), "stopped")
+
+    def test_crash(self):
+        writer_client = self.start_writer(10072, {"failures": {"statistics": ["restart"]}})
+
+        # The process crashes without answering, the client reports the crash once it noticed the exit.
+        self.assertEqual(writer_client.get_statistics(), {})
+        self.assertFalse(writer_client.is_running())
+        self.assertEqual(writer_client.get_status(), "error")
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import bottle
+
+from detector_integration_api.common.startup_profiler import StartupProfiler
+
+PACKAGE_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_imported_modules(code):
+    """
+    Run the code in a new interpreter and return the names of the modules it imported.
+    """
+    output = subprocess.check_output([sys.executable, "-c", code + "\nimport sys; print(' '.join(sys.modules))"],
+                                     cwd=PACKAGE_FOLDER)
+
+    return set(output.decode().split())
+
+
+class TestStartup(unittest.TestCase):
+    def test_lazy_imports(self):
+        modules = get_imported_modules("import detector_integration_api.default_validator\n"
+                                       "import detector_integration_api.client.detector_client")
+
+        self.assertNotIn("requests", modules)
+        self.assertNotIn("bottle", modules)
+        self.assertNotIn("sls_detector", modules)
+
+        modules = get_imported_modules("from detector_integration_api import DetectorIntegrationClient")
+        self.assertNotIn("requests", modules)
+
+        modules = get_imported_modules("from detector_integration_api import DetectorIntegrationClient\n"
+                                       "DetectorIntegrationClient()")
+        self.assertIn("requests", modules)
+
+    def test_startup_profiler(self):
+        profiler = StartupProfiler()
+
+        profiler.import_module("json")
+        self.assertEqual(profiler.get_profile()["imports"][0]["module"], "json")
+        self.assertIsNone(profiler.get_profile()["time_to_first_request"])
+
+        app = bottle.Bottle()
+        profiler.install(app)
+        app.trigger_hook("before_request")
+
+        first_request_time = profiler.get_profile()["time_to_first_request"]
+        self.assertGreaterEqual(first_request_time, 0)
+        self.assertIn("Time to first request", profiler.get_report())
+
+        # Only the first request is recorded.
+        app.trigger_hook("before_request")
+        self.assertEqual(profiler.get_profile()["time_to_first_request"], first_request_time)
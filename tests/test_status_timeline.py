@@ -0,0 +1,87 @@
+import unittest
+
+from detector_integration_api import default_manager
+from detector_integration_api.common.status_timeline import StatusTimeline
+from detector_integration_api.default_validator import IntegrationStatus
+from tests.utils import get_test_integration_manager, FakeClock
+
+
+class TestStatusTimeline(unittest.TestCase):
+    def test_ring_buffer(self):
+        clock = FakeClock()
+        timeline = StatusTimeline(size=3, clock=clock)
+
+        for status in ("idle", "idle", "running", "idle", "running"):
+            clock.advance(1)
+            timeline.record("detector", status)
+
+        # Repeated statuses are not recorded, and the oldest changes are overwritten.
+        self.assertEqual(timeline.get_changes(), [(3.0, "detector", "running"),
+                                                  (4.0, "detector", "idle"),
+                                                  (5.0, "detector", "running")])
+
+        # Status names are stored only once.
+        self.assertEqual(timeline.status_names, ["idle", "running"])
+
+    def test_status_names_limit(self):
+        timeline = StatusTimeline(size=10, clock=FakeClock(), max_status_names=2)
+
+        for status in ("idle", "error: frame 1 lost", "error: frame 2 lost", "idle", "error: frame 3 lost"):
+            timeline.record("writer", {"status": status})
+
+        # Statuses with varying text do not grow the status names without limit.
+        self.assertEqual(len(timeline.status_names), 3)
+        self.assertEqual([status for _, _, status in timeline.get_changes()][2:], ["other", "{'status': 'idle'}",
+                                                                                  "other"])
+
+        with self.assertRaisesRegex(ValueError, "maximum number of status names"):
+            StatusTimeline(max_status_names=2 ** 16)
+
+    def test_acquisitions(self):
+        clock = FakeClock()
+        timeline = StatusTimeline(clock=clock)
+
+        timeline.record("integration", IntegrationStatus.INITIALIZED)
+
+        for _ in range(2):
+            clock.advance(1)
+            timeline.record("integration", IntegrationStatus.CONFIGURED)
+            clock.advance(2)
+            timeline.record("detector", "running")
+            timeline.record("integration", IntegrationStatus.RUNNING)
+            clock.advance(5)
+            timeline.record("integration", IntegrationStatus.INITIALIZED)
+
+        acquisitions = timeline.get_acquisitions()
+
+        # The changes before the first acquisition form an incomplete acquisition.
+        self.assertEqual(len(acquisitions), 3)
+        self.assertEqual(acquisitions[0]["time_in_status"], {"IntegrationStatus.INITIALIZED": 1})
+
+        acquisition = acquisitions[1]
+        self.assertEqual(acquisition["duration"], 8)
+        self.assertEqual(acquisition["time_in_status"], {"IntegrationStatus.CONFIGURED": 2,
+                                                         "IntegrationStatus.RUNNING": 5,
+                                                         "IntegrationStatus.INITIALIZED": 1})
+        self.assertEqual(acquisition["changes"][1], {"time": 2, "source": "detector", "status": "running"})
+
+        # The last acquisition lasts until now.
+        clock.advance(10)
+        self.assertEqual(timeline.get_acquisitions(1)[0]["time_in_status"]["IntegrationStatus.INITIALIZED"], 10)
+
+    def test_manager_timeline(self):
+        manager = get_test_integration_manager(default_manager)
+
+        manager.set_acquisition_config({"writer": {"output_file": "/tmp/test.h5", "n_frames": 10, "user_id": -1},
+                                        "backend": {"bit_depth": 16},
+                                        "detector": {"period": 0.1, "frames": 10, "dr": 16, "timing": "auto"}})
+        manager.start_acquisition()
+        manager.stop_acquisition()
+
+        acquisition = manager.get_status_timeline(1)[0]
+        integration_statuses = [change["status"] for change in acquisition["changes"]
+                                if change["source"] == "integration"]
+
+        self.assertEqual(integration_statuses, ["IntegrationStatus.CONFIGURED", "IntegrationStatus.RUNNING",
+                                                "IntegrationStatus.INITIALIZED"])
+        self.assertIn("detector", {change["source"] for change in acquisition["changes"]})
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import unittest
+from threading import Thread
+from time import sleep
+from unittest.mock import patch
+
+import bottle
+import requests
+
+from detector_integration_api import default_manager
+from detector_integration_api.client.backend_rest_client import BackendClient
+from detector_integration_api.common import tracing
+from detector_integration_api.config import ROUTES, TRACE_HEADER
+from detector_integration_api.rest_api.rest_server import register_rest_interface
+from tests.utils import MockExternalProcessClient, MockDetectorClient
+
+
+def read_trace_file(filename):
+    with open(filename) as trace_file:
+        content = trace_file.read()
+
+    # The closing bracket is not written, as allowed by the trace event format.
+    return json.loads(content.rstrip(",\n") + "]")
+
+
+class TestTracing(unittest.TestCase):
+    backend_port = 10060
+    server_port = 10061
+
+    @classmethod
+    def setUpClass(cls):
+        cls.backend_app = bottle.Bottle()
+        cls.backend_trace_ids = []
+
+        @cls.backend_app.get("/v1/state")
+        def get_state():
+            cls.backend_trace_ids.append(bottle.request.headers.get(TRACE_HEADER))
+            return {"global_state": "INITIALIZED"}
+
+        manager = default_manager.IntegrationManager(BackendClient("http://localhost:%d" % cls.backend_port),
+                                                     MockExternalProcessClient(), MockDetectorClient())
+
+        cls.app = bottle.Bottle()
+        register_rest_interface(app=cls.app, integration_manager=manager)
+
+        for app, port in ((cls.backend_app, cls.backend_port), (cls.app, cls.server_port)):
+            Thread(target=bottle.run, kwargs={"app": app, "host": "localhost", "port": port, "quiet": True},
+                   daemon=True).start()
+        sleep(0.5)
+
+    def setUp(self):
+        self.trace_folder = tempfile.mkdtemp()
+        self.trace_filename = os.path.join(self.trace_folder, "trace.json")
+
+    def tearDown(self):
+        tracing.setup_tracing(None)
+
+        for filename in os.listdir(self.trace_folder):
+            os.remove(os.path.join(self.trace_folder, filename))
+        os.rmdir(self.trace_folder)
+
+    def test_trace_propagation(self):
+        tracing.setup_tracing(self.trace_filename)
+
+        response = requests.get("http://localhost:%d%s" % (self.server_port, ROUTES["get_status_details"]),
+                                headers={TRACE_HEADER: "trace-1"})
+
+        self.assertEqual(response.headers[TRACE_HEADER], "trace-1")
+        self.assertEqual(self.backend_trace_ids[-1], "trace-1")
+
+        # Requests without trace id get a new one.
+        response = requests.get("http://localhost:%d%s" % (self.server_port, ROUTES["get_status_details"]))
+        self.assertNotEqual(response.headers[TRACE_HEADER], "trace-1")
+        self.assertEqual(self.backend_trace_ids[-1], response.headers[TRACE_HEADER])
+
+        spans = [span for span in read_trace_file(self.trace_filename) if span["args"]["trace_id"] == "trace-1"]
+        span_names = [span["name"] for span in spans]
+
+        self.assertIn("BackendClient.get_status", span_names)
+        self.assertIn("MockDetectorClient.get_status", span_names)
+        self.assertIn("GET /api/v1/status_details", span_names)
+        self.assertTrue(all(span["ph"] == "X" and span["dur"] >= 0 for span in spans))
+
+    def test_trace_file_rotation(self):
+        writer = tracing.TraceFileWriter(self.trace_filename, max_size=200, backup_count=2)
+
+        for index in range(10):
+            writer.write({"name": "span %d" % index, "ph": "X", "ts": index, "dur": 1})
+
+        writer.close()
+
+        self.assertEqual(sorted(os.listdir(self.trace_folder)), ["trace.json", "trace.json.1", "trace.json.2"])
+        self.assertEqual(read_trace_file(self.trace_filename)[-1]["name"], "span 9")
+
+    def test_existing_trace_file(self):
+        for _ in range(2):
+            writer = tracing.TraceFileWriter(self.trace_filename, backup_count=2)
+            writer.write({"name": "span", "ph": "X", "ts": 0, "dur": 1})
+            writer.close()
+
+        # The trace of the previous run is kept.
+        self.assertEqual(sorted(os.listdir(self.trace_folder)), ["trace.json", "trace.json.1"])
+        self.assertEqual(len(read_trace_file(self.trace_filename + ".1")), 1)
+
+        # Without old files, the trace is continued.
+        writer = tracing.TraceFileWriter(self.trace_filename, backup_count=0)
+        writer.write({"name": "continued", "ph": "X", "ts": 1, "dur": 1})
+        writer.close()
+
+        self.assertEqual([span["name"] for span in read_trace_file(self.trace_filename)], ["span", "continued"])
+
+    def test_thread_local_trace_id(self):
+        # Without the contextvars module (Python < 3.7), the trace id is passed to the other threads explicitly.
+        with patch.object(tracing, "_trace_id", tracing.ThreadLocalVariable("trace_id")), \
+                patch.object(tracing, "copy_context", None):
+            token = tracing.set_trace_id("trace-2")
+            trace_ids = []
+
+            thread = Thread(target=tracing.bind_context(lambda: trace_ids.append(tracing.get_trace_id())))
+            thread.start()
+            thread.join()
+
+            tracing.reset_trace_id(token)
+
+            self.assertEqual(trace_ids, ["trace-2"])
+            self.assertIsNone(tracing.get_trace_id())
+
+    def test_disabled_tracing(self):
+        with tracing.span("not recorded"):
+            pass
+
+        self.assertFalse(os.path.exists(self.trace_filename))
+        self.assertEqual(tracing.get_trace_headers(), {})
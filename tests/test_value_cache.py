@@ -0,0 +1,44 @@
+import unittest
+
+from detector_integration_api.common.value_cache import ValueCache
+from tests.utils import FakeClock
+
+
+class TestValueCache(unittest.TestCase):
+    def test_time_to_live(self):
+        clock = FakeClock()
+        cache = ValueCache({"exptime": 10, "vhighvoltage": 1}, clock=clock)
+
+        cache.set("exptime", 0.001)
+        cache.set("vhighvoltage", 120)
+        cache.set("status", "idle")
+
+        self.assertEqual(cache.lookup("exptime"), (True, 0.001))
+        self.assertEqual(cache.lookup("vhighvoltage"), (True, 120))
+
+        # Keys without a time to live are not cached.
+        self.assertEqual(cache.lookup("status"), (False, None))
+
+        clock.advance(5)
+        self.assertEqual(cache.lookup("exptime"), (True, 0.001))
+        self.assertEqual(cache.lookup("vhighvoltage"), (False, None))
+
+        clock.advance(5)
+        self.assertEqual(cache.lookup("exptime"), (False, None))
+
+    def test_invalidate(self):
+        cache = ValueCache({"exptime": 10, "frames": 10})
+
+        cache.set("exptime", 0.001)
+        cache.set("frames", 100)
+
+        cache.invalidate("exptime")
+        self.assertEqual(cache.lookup("exptime"), (False, None))
+        self.assertEqual(cache.lookup("frames"), (True, 100))
+
+        cache.invalidate()
+        self.assertEqual(cache.lookup("frames"), (False, None))
+
+        # None is a valid cached value.
+        cache.set("frames", None)
+        self.assertEqual(cache.lookup("frames"), (True, None))
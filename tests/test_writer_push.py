@@ -0,0 +1,134 @@
+import os
+import sys
+import tempfile
+import unittest
+from threading import Thread
+from time import sleep
+from wsgiref.util import setup_testing_defaults
+
+import bottle
+import requests
+
+from detector_integration_api import default_manager
+from detector_integration_api.client.cpp_writer_client import CppWriterClient
+from detector_integration_api.config import ROUTES
+from detector_integration_api.default_validator import IntegrationStatus
+from detector_integration_api.rest_api.rest_server import register_rest_interface
+from detector_integration_api.simulation import writer_simulator
+from tests.utils import MockBackendClient, MockDetectorClient
+
+WRITER_SIMULATOR = os.path.abspath(writer_simulator.__file__)
+
+
+class SimulatedWriterClient(CppWriterClient):
+    """
+    Writer client for the simulated writer, recording the requests sent to the writer.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SimulatedWriterClient, self).__init__(*args, **kwargs)
+        self.requested_urls = []
+
+    def get_execution_command(self):
+        return [sys.executable, self.process_executable] + self.get_process_arguments()
+
+    def _send_request_to_process(self, requests_method, url, request_json=None, return_response=False):
+        self.requested_urls.append(url)
+
+        return super(SimulatedWriterClient, self)._send_request_to_process(requests_method, url, request_json,
+                                                                           return_response)
+
+    def get_polled_urls(self):
+        return [url for url in self.requested_urls if url.endswith(("/status", "/statistics"))]
+
+
+class TestWriterPush(unittest.TestCase):
+    server_port = 10020
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = bottle.Bottle()
+        cls.manager = None
+
+        # The REST interface is bound to the manager of the current test.
+        class ManagerProxy(object):
+            def __getattr__(self, name):
+                return getattr(cls.manager, name)
+
+        register_rest_interface(app=cls.app, integration_manager=ManagerProxy())
+
+        Thread(target=bottle.run, kwargs={"app": cls.app, "host": "localhost", "port": cls.server_port,
+                                          "quiet": True}, daemon=True).start()
+        sleep(0.5)
+
+    def setUp(self):
+        self.log_folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for filename in os.listdir(self.log_folder):
+            os.remove(os.path.join(self.log_folder, filename))
+        os.rmdir(self.log_folder)
+
+    def start_acquisition(self, writer_port, callback_url):
+        writer_client = SimulatedWriterClient(stream_url="tcp://localhost:40000", writer_executable=WRITER_SIMULATOR,
+                                              writer_port=writer_port, log_folder=self.log_folder,
+                                              callback_url=callback_url)
+
+        manager = default_manager.IntegrationManager(MockBackendClient(), writer_client, MockDetectorClient())
+        TestWriterPush.manager = manager
+
+        manager.set_acquisition_config({"writer": {"output_file": "/tmp/test.h5", "n_frames": 100, "user_id": -1},
+                                        "backend": {"bit_depth": 16},
+                                        "detector": {"period": 0.1, "frames": 100, "dr": 16, "timing": "auto"}})
+
+        self.assertEqual(manager.start_acquisition(), IntegrationStatus.RUNNING)
+
+        # Let the writer write some frames.
+        sleep(0.5)
+
+        return writer_client, manager
+
+    def test_pushed_values(self):
+        callback_url = "http://localhost:%d%s" % (self.server_port, ROUTES["push_writer_values"])
+        writer_client, manager = self.start_acquisition(10021, callback_url)
+
+        # The status can be polled once on start, before the writer pushed anything.
+        n_polled_urls = len(writer_client.get_polled_urls())
+
+        self.assertEqual(manager.get_acquisition_status(), IntegrationStatus.RUNNING)
+        self.assertGreater(manager.get_metrics()["writer"]["n_written_frames"], 0)
+        self.assertEqual(len(writer_client.get_polled_urls()), n_polled_urls)
+
+        with self.assertRaisesRegex(ValueError, "uses port"):
+            writer_client.push_values(10022, {"status": "writing"})
+
+        with self.assertRaisesRegex(ValueError, "Unknown values"):
+            writer_client.push_values(10021, {"n_frames": 10})
+
+        manager.stop_acquisition()
+        self.assertEqual(manager.get_acquisition_status(), IntegrationStatus.INITIALIZED)
+
+    def test_push_from_remote_host(self):
+        push_url = "http://localhost:%d%s" % (self.server_port, ROUTES["push_writer_values"])
+
+        response = requests.post(push_url + "/not_a_port", json={"status": "writing"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["state"], "error")
+
+        environ = {"REQUEST_METHOD": "POST",
+                   "PATH_INFO": ROUTES["push_writer_values"] + "/10021",
+                   "REMOTE_ADDR": "192.168.1.10",
+                   "HTTP_X_FORWARDED_FOR": "127.0.0.1"}
+        setup_testing_defaults(environ)
+
+        response_statuses = []
+        self.app(environ, lambda status, headers, exc_info=None: response_statuses.append(status))
+        self.assertEqual(response_statuses, ["403 Forbidden"])
+
+    def test_polling_fallback(self):
+        writer_client, manager = self.start_acquisition(10023, None)
+
+        self.assertGreater(manager.get_metrics()["writer"]["n_written_frames"], 0)
+        self.assertIn("http://localhost:10023/statistics", writer_client.get_polled_urls())
+
+        manager.stop_acquisition()
@@ -38,7 +38,8 @@ class MockDetectorClient(object):
         return self.status
 
     def set_config(self, configuration):
-        self.config = configuration
+        # Like a real detector, previously set parameters are kept.
+        self.config.update(configuration)
 
     def start(self):
         self.status = "running"
@@ -46,7 +47,7 @@ class MockDetectorClient(object):
     def stop(self):
         self.status = "idle"
 
-    def get_value(self, name):
+    def get_value(self, name, fresh=False):
         return self.config[name]
 
     def set_value(self, name, value, no_verification=False):
@@ -97,6 +98,10 @@ class MockExternalProcessClient(object):
     def reset(self):
         self.status = "stopped"
 
+    def kill(self, step_timeout=None):
+        self.status = "stopped"
+        return "kill_request"
+
     def get_statistics(self):
         return {}
 
@@ -123,3 +128,14 @@ def start_test_integration_server(host, port, manager_module):
     register_rest_interface(app=app, integration_manager=integration_manager)
 
     bottle.run(app=app, host=host, port=port)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.current_time = 0.0
+
+    def __call__(self):
+        return self.current_time
+
+    def advance(self, seconds):
+        self.current_time += seconds